@@ -1,26 +1,139 @@
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
 from core.data_models import Ambassador
+from core.stores import AmbassadorStore, AmbassadorView
+from core.expertise_index import ExpertiseIndex
+from core.metrics import metrics
 
 class AmbassadorProfilingAgent:
     def __init__(self):
         self.ambassador_profiles: Dict[str, Dict] = {}
-
-    def analyze_conversation_history(self, ambassadors: List[Ambassador]) -> Dict[str, Dict]:
-        """Analyze conversation history and create profiles for each ambassador."""
+        self._ambassadors: Dict[str, Ambassador] = {}
+        self._source: Optional[List[Ambassador]] = None  # Ambassador list the cache was built from
+        self.version = 0  # Bumped whenever a profile is rebuilt rather than updated in place
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.expertise_index: Optional[ExpertiseIndex] = None  # Fills past_products and expertise scores
+
+    @metrics.timed()
+    def analyze_conversation_history(self, ambassadors: Union[List[Ambassador], AmbassadorStore],
+                                     refresh: bool = False) -> Dict[str, Dict]:
+        """Analyze conversation history and create profiles for each ambassador.
+
+        Profiles are cached: calling again with the same ambassador list reuses them,
+        builds profiles for ambassadors added or replaced since and drops those of
+        ambassadors removed from it. A different list, or
+        refresh=True, rebuilds everything. Use the update_* methods when a single
+        ambassador's data changes. For an AmbassadorStore the profiles are views over
+        the store rows rather than copies."""
+        if refresh or ambassadors is not self._source:
+            self.ambassador_profiles = {}
+            self._ambassadors = {}
+            self._source = ambassadors
+
+        current = set()
         for ambassador in ambassadors:
-            profile = {
-                'id': ambassador.id,
-                'name': ambassador.name,
-                'languages': ambassador.languages,
-                'line_of_business': ambassador.line_of_business,
-                'csat_score': ambassador.csat_score,
-                'current_tickets': ambassador.current_tickets,
-                'max_active_tickets': ambassador.max_active_tickets,
-                'performance_metrics': self._calculate_performance_metrics(ambassador)
-            }
-            self.ambassador_profiles[ambassador.id] = profile
+            current.add(ambassador.id)
+            cached = self._ambassadors.get(ambassador.id)
+            # Store views are created per iteration, so only their ids can be compared
+            if cached is ambassador or (cached is not None and isinstance(ambassador, AmbassadorView)):
+                self.cache_hits += 1
+                continue
+            self._build_profile(ambassador)
+
+        if len(self.ambassador_profiles) != len(current):
+            # Ambassadors removed from the list since their profiles were built
+            for ambassador_id in [i for i in self.ambassador_profiles if i not in current]:
+                del self.ambassador_profiles[ambassador_id]
+                del self._ambassadors[ambassador_id]
+            self.version += 1
         return self.ambassador_profiles
 
+    def use_expertise_index(self, expertise_index: Optional[ExpertiseIndex]):
+        """Use a case-history expertise index (see DataLoader.expertise_index).
+        Cached profiles are rebuilt on the next analysis so they pick up past_products."""
+        self.expertise_index = expertise_index
+        self._source = None
+
+    def _past_products(self, ambassador_id: str) -> List[str]:
+        if self.expertise_index is None:
+            return []
+        return self.expertise_index.past_products(ambassador_id)
+
+    def _build_profile(self, ambassador: Ambassador) -> Dict:
+        """(Re)build the profile of one ambassador."""
+        self.cache_misses += 1
+        self.version += 1
+        if isinstance(ambassador, AmbassadorView):
+            profile = ambassador.profile(self._calculate_performance_metrics(ambassador))
+            profile['past_products'] = self._past_products(ambassador.id)
+            self._ambassadors[ambassador.id] = ambassador
+            self.ambassador_profiles[ambassador.id] = profile
+            return profile
+
+        profile = {
+            'id': ambassador.id,
+            'name': ambassador.name,
+            'languages': ambassador.languages,
+            'line_of_business': ambassador.line_of_business,
+            'language_mask': ambassador.language_mask,
+            'lob_mask': ambassador.lob_mask,
+            'csat_score': ambassador.csat_score,
+            'case_history': ambassador.case_history,
+            'current_tickets': ambassador.current_tickets,
+            'max_active_tickets': ambassador.max_active_tickets,
+            'past_products': self._past_products(ambassador.id),
+            'performance_metrics': self._calculate_performance_metrics(ambassador)
+        }
+        self._ambassadors[ambassador.id] = ambassador
+        self.ambassador_profiles[ambassador.id] = profile
+        return profile
+
+    def update_ambassador(self, ambassador: Ambassador) -> Dict:
+        """Rebuild one ambassador's profile after its data changed (e.g. languages or lines of business)."""
+        if self.expertise_index is not None:
+            self.expertise_index.set_history(ambassador.id, ambassador.case_history or [])
+        return self._build_profile(ambassador)
+
+    def update_workload(self, ambassador_id: str, current_tickets: int):
+        """Record an ambassador's current number of active tickets."""
+        profile = self.ambassador_profiles.get(ambassador_id)
+        if profile is not None:
+            profile['current_tickets'] = current_tickets
+
+    def update_csat(self, ambassador_id: str, csat_score: float):
+        """Record a new CSAT score for an ambassador."""
+        profile = self.ambassador_profiles.get(ambassador_id)
+        if profile is None:
+            return
+        ambassador = self._ambassadors[ambassador_id]
+        ambassador.csat_score = csat_score
+        profile['csat_score'] = csat_score
+        profile['performance_metrics'] = self._calculate_performance_metrics(ambassador)
+
+    def record_case(self, ambassador_id: str, case_number: str):
+        """Add a handled case to an ambassador's history."""
+        profile = self.ambassador_profiles.get(ambassador_id)
+        if profile is None:
+            return
+        ambassador = self._ambassadors[ambassador_id]
+        if ambassador.case_history is None:
+            ambassador.case_history = []
+        ambassador.case_history.append(case_number)
+        profile['case_history'] = ambassador.case_history
+        if self.expertise_index is not None and self.expertise_index.add_case(ambassador_id, case_number):
+            profile['past_products'] = self.expertise_index.past_products(ambassador_id)
+        profile['performance_metrics'] = self._calculate_performance_metrics(ambassador)
+
+    def cache_stats(self) -> Dict:
+        """Profile cache hit/miss counters."""
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            'hits': self.cache_hits,
+            'misses': self.cache_misses,
+            'hit_ratio': self.cache_hits / lookups if lookups else 0.0,
+            'profiles': len(self.ambassador_profiles)
+        }
+
     def _calculate_performance_metrics(self, ambassador: Ambassador) -> Dict:
         """Calculate performance metrics based on conversation history."""
         return {
@@ -82,15 +195,8 @@ class AmbassadorProfilingAgent:
         return total_score
 
     def get_expertise_score(self, ambassador_id: str, product: str) -> float:
-        """Calculate expertise score based on case history."""
-        ambassador = self.ambassador_profiles.get(ambassador_id)
-        if not ambassador or not ambassador.get('case_history'):
+        """Calculate expertise score based on case history.
+        Needs an expertise index (use_expertise_index); without one every score is 0."""
+        if self.expertise_index is None or ambassador_id not in self.ambassador_profiles:
             return 0.0
-
-        # Count cases related to the product
-        product_cases = sum(1 for case in ambassador.get('case_history', []) if product.lower() in case.lower())
-        
-        # Normalize score (0-1)
-        expertise_score = min(1.0, product_cases / 10)  # Cap at 10 cases
-        
-        return expertise_score
\ No newline at end of file
+        return self.expertise_index.get_expertise_score(ambassador_id, product)
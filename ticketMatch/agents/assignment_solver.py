@@ -0,0 +1,148 @@
+"""Capacity-constrained global assignment of tickets to ambassadors.
+
+Maximises the total match score over the whole batch instead of letting early
+tickets take the best ambassadors. Tickets with identical score rows are
+interchangeable, so they are grouped into classes first:
+
+- with few classes (the usual case, scores only depend on a handful of ticket
+  fields) the problem is a small transportation problem, solved as a linear
+  program whose vertex solutions are integral;
+- otherwise each ambassador is expanded into one column per free ticket slot and
+  the rectangular assignment problem is solved with the Hungarian method.
+
+Both give an exact optimum."""
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+from scipy import sparse
+from scipy.optimize import linear_sum_assignment, linprog
+
+# Largest number of (class, ambassador) variables solved as a transportation problem
+MAX_TRANSPORT_VARIABLES = 2_000_000
+
+def greedy_assignment(scores: np.ndarray, capacity: np.ndarray) -> np.ndarray:
+    """Baseline: tickets in list order take the best ambassador with capacity left.
+    Returns the chosen column per ticket, -1 when unassigned."""
+    remaining = capacity.astype(np.int64).copy()
+    columns = np.full(scores.shape[0], -1, dtype=np.int64)
+    if scores.shape[1] == 0:
+        return columns
+
+    for row in range(scores.shape[0]):
+        candidate_scores = np.where(remaining > 0, scores[row], -np.inf)
+        column = int(np.argmax(candidate_scores))
+        if candidate_scores[column] > 0.0:
+            columns[row] = column
+            remaining[column] -= 1
+    return columns
+
+def optimal_assignment(scores: np.ndarray, capacity: np.ndarray) -> np.ndarray:
+    """Assignment with the highest total score such that no ambassador exceeds capacity.
+    Only positive scores are assigned. Returns the chosen column per ticket, -1 when unassigned."""
+    capacity = np.maximum(capacity.astype(np.int64), 0)
+    if scores.shape[0] == 0 or scores.shape[1] == 0 or capacity.sum() == 0:
+        return np.full(scores.shape[0], -1, dtype=np.int64)
+
+    classes, members = _ticket_classes(scores)
+    if len(classes) < scores.shape[0] and len(classes) * scores.shape[1] <= MAX_TRANSPORT_VARIABLES:
+        return _transport_assignment(scores, capacity, classes, members)
+    return _hungarian_assignment(scores, capacity)
+
+def _ticket_classes(scores: np.ndarray) -> Tuple[List[int], List[List[int]]]:
+    """Group tickets with byte-identical score rows.
+    Returns one representative row per class and the member rows of each class, in ticket order."""
+    class_of: Dict[bytes, int] = {}
+    classes: List[int] = []
+    members: List[List[int]] = []
+    for row in range(scores.shape[0]):
+        key = scores[row].tobytes()
+        index = class_of.get(key)
+        if index is None:
+            index = class_of[key] = len(classes)
+            classes.append(row)
+            members.append([])
+        members[index].append(row)
+    return classes, members
+
+def _transport_assignment(scores: np.ndarray, capacity: np.ndarray,
+                          classes: List[int], members: List[List[int]]) -> np.ndarray:
+    """Solve the class x ambassador transportation problem as a linear program."""
+    class_scores = scores[classes]
+    class_rows, ambassador_columns = np.nonzero(class_scores > 0.0)
+    columns = np.full(scores.shape[0], -1, dtype=np.int64)
+    if class_rows.size == 0:
+        return columns
+
+    n_variables = class_rows.size
+    variables = np.arange(n_variables)
+    ones = np.ones(n_variables)
+    constraints = sparse.vstack([
+        sparse.csr_matrix((ones, (class_rows, variables)), shape=(len(classes), n_variables)),
+        sparse.csr_matrix((ones, (ambassador_columns, variables)), shape=(scores.shape[1], n_variables))
+    ]).tocsr()
+    limits = np.concatenate([[len(m) for m in members], capacity])
+
+    result = linprog(-class_scores[class_rows, ambassador_columns], A_ub=constraints, b_ub=limits,
+                     bounds=(0, None), method='highs-ipm')
+    if result.status != 0:
+        return _hungarian_assignment(scores, capacity)
+
+    # Transportation vertices are integral; rounding only removes solver noise
+    flows = np.rint(result.x).astype(np.int64)
+    next_member = [0] * len(classes)
+    remaining = capacity.copy()
+    for variable in np.flatnonzero(flows > 0).tolist():
+        ticket_class, column = int(class_rows[variable]), int(ambassador_columns[variable])
+        for _ in range(min(flows[variable], remaining[column])):
+            if next_member[ticket_class] >= len(members[ticket_class]):
+                break
+            columns[members[ticket_class][next_member[ticket_class]]] = column
+            next_member[ticket_class] += 1
+            remaining[column] -= 1
+    return columns
+
+def _hungarian_assignment(scores: np.ndarray, capacity: np.ndarray) -> np.ndarray:
+    """Expand ambassadors into capacity slots and solve the rectangular assignment problem."""
+    n_tickets = scores.shape[0]
+    columns = np.full(n_tickets, -1, dtype=np.int64)
+
+    # An ambassador never needs more slots than there are tickets
+    slot_owner = np.repeat(np.arange(scores.shape[1]), np.minimum(capacity, n_tickets))
+
+    # Non-positive scores cost the same as leaving the ticket unassigned
+    cost = -np.maximum(scores[:, slot_owner], 0.0)
+    rows, slot_columns = linear_sum_assignment(cost)
+    owners = slot_owner[slot_columns]
+    assigned = scores[rows, owners] > 0.0
+    columns[rows[assigned]] = owners[assigned]
+    return columns
+
+def total_score(scores: np.ndarray, columns: np.ndarray) -> float:
+    """Sum of the scores of the assigned (ticket, ambassador) pairs."""
+    rows = np.flatnonzero(columns >= 0)
+    return float(scores[rows, columns[rows]].sum())
+
+def solve_with_report(scores: np.ndarray, capacity: np.ndarray) -> Tuple[np.ndarray, Dict]:
+    """Solve the global assignment and compare it with the greedy baseline."""
+    start = time.perf_counter()
+    columns = optimal_assignment(scores, capacity)
+    solve_seconds = time.perf_counter() - start
+
+    greedy_columns = greedy_assignment(scores, capacity)
+    optimal_total = total_score(scores, columns)
+    greedy_total = total_score(scores, greedy_columns)
+
+    report = {
+        'tickets': int(scores.shape[0]),
+        'ambassadors': int(scores.shape[1]),
+        'capacity': int(np.maximum(capacity, 0).sum()),
+        'assigned': int((columns >= 0).sum()),
+        'total_score': optimal_total,
+        'greedy_assigned': int((greedy_columns >= 0).sum()),
+        'greedy_total_score': greedy_total,
+        'gain': optimal_total - greedy_total,
+        'gain_pct': (optimal_total - greedy_total) / greedy_total if greedy_total else 0.0,
+        'solve_seconds': solve_seconds
+    }
+    return columns, report
@@ -1,15 +1,39 @@
-from typing import List, Dict
+from typing import List, Dict, Optional, Union
 from datetime import datetime
 from core.data_models import Ambassador, Shift, Ticket
+from core.shift_index import ShiftIndex
+from core.workload_tracker import WorkloadTracker
+from core.metrics import metrics
 
 class AvailabilityAgent:
     def __init__(self):
         self.available_ambassadors: Dict[str, Dict] = {}
+        self._shift_index: Optional[ShiftIndex] = None
 
-    def check_availability(self, ticket: Ticket, ambassadors: List[Ambassador], shifts: List[Shift]) -> Dict[str, Dict]:
-        """Check which ambassadors are available for the ticket based on their shifts."""
-        current_time = datetime.now()
+    @metrics.timed()
+    def check_availability(self, ticket: Ticket, ambassadors: List[Ambassador],
+                           shifts: Union[List[Shift], ShiftIndex],
+                           current_time: Optional[datetime] = None,
+                           workload: Optional[WorkloadTracker] = None) -> Dict[str, Dict]:
+        """Check which ambassadors are available for the ticket based on their shifts.
+        Working days and shifts crossing midnight are taken into account. With a workload
+        tracker, only on-shift ambassadors with free capacity are visited."""
+        current_time = current_time or datetime.now()
+        weekly_index = self._get_shift_index(shifts).weekly()
+        on_shift = weekly_index.on_shift(current_time)
         self.available_ambassadors = {}
+        if not on_shift:
+            return self.available_ambassadors
+
+        # Group the shifts covering current_time by ambassador
+        shifts_now: Dict[str, List[Shift]] = {}
+        for shift in weekly_index.shifts_at(current_time):
+            shifts_now.setdefault(shift.ambassador_id, []).append(shift)
+
+        if workload is not None:
+            # Full ambassadors are already out of the tracker's open set
+            candidate_ids = on_shift & workload.open_ids()
+            ambassadors = [workload.ambassador(i) for i in sorted(candidate_ids, key=workload.position.__getitem__)]
 
         for ambassador in ambassadors:
             # Check if ambassador has reached their ticket limit
@@ -17,12 +41,7 @@ class AvailabilityAgent:
                 continue
 
             # Find ambassador's active shifts
-            active_shifts = [
-                shift for shift in shifts
-                if shift.ambassador_id == ambassador.id
-                and shift.is_active
-                and shift.shift_start <= current_time.time() <= shift.shift_end
-            ]
+            active_shifts = shifts_now.get(ambassador.id, [])
 
             if active_shifts:
                 availability = {
@@ -37,6 +56,15 @@ class AvailabilityAgent:
 
         return self.available_ambassadors
 
+    def _get_shift_index(self, shifts: Union[List[Shift], ShiftIndex]) -> ShiftIndex:
+        """Reuse the shift index across calls, rebuilding it only when given a different shift list."""
+        if isinstance(shifts, ShiftIndex):
+            self._shift_index = shifts
+        elif (self._shift_index is None or self._shift_index.shifts is not shifts
+              or len(self._shift_index) != len(shifts)):
+            self._shift_index = ShiftIndex(shifts)
+        return self._shift_index
+
     def get_available_ambassadors(self) -> Dict[str, Dict]:
         """Return the list of available ambassadors."""
         return self.available_ambassadors
@@ -0,0 +1,63 @@
+import heapq
+from typing import Callable, Container, Dict, List, Optional, Set, Tuple
+from core.data_models import Ticket
+
+class CandidateIndex:
+    """Inverted index from language and line of business to ambassador IDs.
+
+    Tickets are only scored against ambassadors who share both their language and
+    line of business. When nobody does, the candidate set is widened step by step:
+    language only, then line of business only, then everyone. This is a pruning
+    heuristic: an ambassador matching only one of the two can occasionally outscore
+    one matching both on the remaining terms."""
+
+    def __init__(self, profiles: Dict[str, Dict], score_fn: Callable[[Ticket, Dict], float]):
+        self.score_fn = score_fn
+        self.profiles: Dict[str, Dict] = {}
+        self.by_language: Dict[str, Set[str]] = {}
+        self.by_line_of_business: Dict[str, Set[str]] = {}
+        self.position: Dict[str, int] = {}
+        for ambassador_id, profile in profiles.items():
+            self.update(ambassador_id, profile)
+
+    def update(self, ambassador_id: str, profile: Dict):
+        """Add or re-index a single ambassador's profile."""
+        self.remove(ambassador_id)
+        self.profiles[ambassador_id] = profile
+        self.position.setdefault(ambassador_id, len(self.position))
+        for language in profile['languages']:
+            self.by_language.setdefault(language, set()).add(ambassador_id)
+        for line_of_business in profile['line_of_business']:
+            self.by_line_of_business.setdefault(line_of_business, set()).add(ambassador_id)
+
+    def remove(self, ambassador_id: str):
+        """Drop an ambassador from the index."""
+        profile = self.profiles.pop(ambassador_id, None)
+        if profile is None:
+            return
+        for language in profile['languages']:
+            self.by_language.get(language, set()).discard(ambassador_id)
+        for line_of_business in profile['line_of_business']:
+            self.by_line_of_business.get(line_of_business, set()).discard(ambassador_id)
+
+    def candidates(self, ticket: Ticket, available: Optional[Container[str]] = None) -> List[str]:
+        """Ambassador IDs worth scoring for a ticket, in index order.
+        available restricts the result, e.g. to the ambassadors currently on shift."""
+        by_language = self.by_language.get(ticket.language, set())
+        by_line_of_business = self.by_line_of_business.get(ticket.line_of_business, set())
+
+        for candidate_set in (by_language & by_line_of_business, by_language, by_line_of_business, self.profiles.keys()):
+            if available is None:
+                selected = list(candidate_set)
+            else:
+                selected = [ambassador_id for ambassador_id in candidate_set if ambassador_id in available]
+            if selected:
+                return sorted(selected, key=self.position.__getitem__)
+        return []
+
+    def top_k(self, ticket: Ticket, k: int, available: Optional[Container[str]] = None) -> List[Tuple[str, float]]:
+        """Best k candidates for a ticket as (ambassador_id, score), highest score first.
+        Equal scores keep index order."""
+        scored = [(ambassador_id, self.score_fn(ticket, self.profiles[ambassador_id]))
+                  for ambassador_id in self.candidates(ticket, available)]
+        return heapq.nlargest(k, scored, key=lambda item: item[1])
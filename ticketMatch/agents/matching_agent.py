@@ -1,8 +1,22 @@
-from typing import Dict, List, Optional, Tuple
+import heapq
+import numpy as np
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Union
 from core.data_models import Ticket, Ambassador, Shift
+from core.shift_index import ShiftIndex
+from core.workload_tracker import WorkloadTracker
+from core.vocabulary import has_code
+from core.semantic_index import SemanticIndex
+from core.metrics import metrics
 from agents.ticket_analysis_agent import TicketAnalysisAgent
 from agents.ambassador_profiling_agent import AmbassadorProfilingAgent
 from agents.availability_agent import AvailabilityAgent
+from agents.score_matrix import MatchMatrices, ProfileArrays, TicketArrays, score_encoded
+from agents.assignment_solver import solve_with_report
+from agents.candidate_index import CandidateIndex
+from agents.sharded_matching import ShardedMatcher
+
+MATCHING_MODES = ('scalar', 'vectorized', 'optimal', 'sharded')
 
 class MatchingAgent:
     def __init__(self):
@@ -10,19 +24,75 @@ class MatchingAgent:
         self.profiling_agent = AmbassadorProfilingAgent()
         self.availability_agent = AvailabilityAgent()
         self.assigned_tickets: Dict[str, Tuple[str, str]] = {}  # ticket_id -> (ambassador_id, explanation)
+        self.chunk_size = 4096  # Tickets scored per matrix block in vectorized mode
+        self.last_assignment_report: Optional[Dict] = None  # Optimal vs greedy totals of the last optimal run
+        self.workload: Optional[WorkloadTracker] = None  # Live ambassador load, kept across calls
+        self.lazy_explanations = True  # Score numerically, render text only for the winner (or top-k)
+        self.explain_top_k = 0  # When > 0, keep rendered alternatives in top_matches
+        self.top_matches: Dict[str, List[Tuple[str, float, str]]] = {}  # ticket_id -> [(ambassador_id, score, explanation)]
+        self.use_candidate_index = False  # Only score ambassadors sharing the ticket's language / line of business
+        self.candidate_index: Optional[CandidateIndex] = None
+        self._candidate_index_version = -1  # Profile store version the candidate index was built from
+        self.semantic_index: Optional[SemanticIndex] = None  # Text similarity to ambassadors' past cases
+        self.similarity_weight = 0.0  # Weight of the semantic similarity term; 0 leaves scores unchanged
+        self._similarity_row: Tuple[Optional[str], Optional[np.ndarray]] = (None, None)  # Last scalar ticket's similarities
+        self.capacity_limits: Optional[Dict[str, int]] = None  # Batch modes: at most this many new tickets per ambassador
+        self.workers: Optional[int] = None  # Sharded mode: worker processes (default: CPU count)
+        self.shard_size = 5000  # Sharded mode: larger line of business shards are split by case number hash
+        self.sharded_matcher: Optional[ShardedMatcher] = None
+        self.metrics = metrics  # Registry for match timings and counters
 
-    def process_tickets(self, tickets: List[Ticket], ambassadors: List[Ambassador], shifts: List[Shift]) -> Dict[str, Tuple[str, str]]:
+    def process_tickets(self, tickets: List[Ticket], ambassadors: List[Ambassador],
+                        shifts: Union[List[Shift], ShiftIndex],
+                        current_time: Optional[datetime] = None, mode: str = 'scalar') -> Dict[str, Tuple[str, str]]:
         """Process all tickets and make assignment decisions.
+        mode='vectorized' scores all tickets against all available ambassadors with array operations.
+        mode='optimal' maximises the total score of the batch within each ambassador's remaining capacity.
+        mode='sharded' splits the batch by line of business and matches the shards in worker processes.
         Returns a dict of ticket_id -> (ambassador_id, explanation)"""
+        if mode not in MATCHING_MODES:
+            raise ValueError(f"Unknown matching mode '{mode}', expected one of {MATCHING_MODES}")
+        with self.metrics.timer('duration_seconds', operation='MatchingAgent.process_tickets'):
+            unassigned_tickets = self._process(tickets, ambassadors, shifts, current_time, mode)
+        if self.metrics.enabled:
+            matched = sum(1 for ticket in unassigned_tickets if self.assigned_tickets.get(ticket.case_number, (None,))[0])
+            self.metrics.inc('tickets_matched_total', matched, mode=mode)
+            self.metrics.inc('tickets_unmatched_total', len(unassigned_tickets) - matched, mode=mode)
+        return self.assigned_tickets
+
+    def _process(self, tickets: List[Ticket], ambassadors: List[Ambassador], shifts: Union[List[Shift], ShiftIndex],
+                 current_time: Optional[datetime], mode: str) -> List[Ticket]:
+        """Match the batch in the given mode; returns the tickets that were considered."""
         # Analyze tickets (they are already filtered for unassigned only)
         unassigned_tickets = self.ticket_agent.analyze_tickets(tickets)
         
+        # Track workload of this ambassador list across calls
+        if self.workload is None or not self.workload.tracks(ambassadors):
+            self.workload = WorkloadTracker(ambassadors)
+
         # Get ambassador profiles
         ambassador_profiles = self.profiling_agent.analyze_conversation_history(ambassadors)
+        if self.use_candidate_index:
+            self._refresh_candidate_index()
 
-        for ticket in unassigned_tickets:
+        if mode == 'vectorized':
+            self._process_vectorized(unassigned_tickets, ambassadors, shifts, ambassador_profiles, current_time)
+        elif mode == 'optimal':
+            self._process_optimal(unassigned_tickets, ambassadors, shifts, ambassador_profiles, current_time)
+        elif mode == 'sharded':
+            self._process_sharded(unassigned_tickets, ambassadors, shifts, current_time)
+        else:
+            self._process_scalar(unassigned_tickets, ambassadors, shifts, ambassador_profiles, current_time)
+        return unassigned_tickets
+
+    def _process_scalar(self, tickets: List[Ticket], ambassadors: List[Ambassador],
+                        shifts: Union[List[Shift], ShiftIndex], ambassador_profiles: Dict[str, Dict],
+                        current_time: Optional[datetime]):
+        """Check availability and score every candidate, one ticket at a time."""
+        for ticket in tickets:
             # Get available ambassadors
-            available_ambassadors = self.availability_agent.check_availability(ticket, ambassadors, shifts)
+            available_ambassadors = self.availability_agent.check_availability(
+                ticket, ambassadors, shifts, current_time, self.workload)
             
             if not available_ambassadors:
                 self.assigned_tickets[ticket.case_number] = (None, "No available ambassadors")
@@ -37,15 +107,171 @@ class MatchingAgent:
             else:
                 self.assigned_tickets[ticket.case_number] = (None, explanation)
 
-        return self.assigned_tickets
+    def _process_vectorized(self, tickets: List[Ticket], ambassadors: List[Ambassador],
+                            shifts: Union[List[Shift], ShiftIndex], ambassador_profiles: Dict[str, Dict],
+                            current_time: Optional[datetime]):
+        """Score tickets in blocks of the tickets x ambassadors matrix and take the per-row argmax.
+
+        Tickets are still assigned in list order with live workload, like the scalar path.
+        An assignment can only lower its ambassador's column, so a ticket's precomputed
+        argmax stays valid unless that column has changed since."""
+        available_ambassadors = self._batch_availability(tickets, ambassadors, shifts, current_time)
+        if not available_ambassadors:
+            return
+
+        ambassador_ids = self._batch_candidates(available_ambassadors, ambassador_profiles)
+        profile_arrays = ProfileArrays(ambassador_ids, ambassador_profiles)
+        remaining = self._limit_capacity(profile_arrays.max_active_tickets - profile_arrays.current_tickets, ambassador_ids)
+        open_columns = int((remaining > 0).sum())
+
+        for start in range(0, len(tickets), self.chunk_size):
+            block = tickets[start:start + self.chunk_size]
+            self.metrics.inc('tickets_scored_total', len(block), mode='vectorized')
+            self.metrics.inc('candidates_scored_total', len(block) * len(ambassador_ids), mode='vectorized')
+            matches = MatchMatrices(TicketArrays(block), profile_arrays, self._semantic_term(block, ambassador_ids))
+            scores = matches.scores()
+            scores[:, remaining <= 0] = -np.inf
+            columns = np.argmax(scores, axis=1) if ambassador_ids else np.zeros(len(block), dtype=np.int64)
+            changed = np.zeros(len(ambassador_ids), dtype=bool)
+
+            for row, ticket in enumerate(block):
+                if not open_columns:
+                    self.assigned_tickets[ticket.case_number] = (None, "No available ambassadors")
+                    continue
+
+                column = int(columns[row])
+                if changed[column]:
+                    column = int(np.argmax(scores[row]))
+                if scores[row, column] <= 0.0:
+                    self.assigned_tickets[ticket.case_number] = (None, "No suitable match found")
+                    continue
+
+                self._record_match(ticket, ambassador_ids[column], ambassador_profiles)
+                profile_arrays.add_ticket(column)
+                remaining[column] -= 1
+                if remaining[column] <= 0:
+                    scores[row + 1:, column] = -np.inf
+                    open_columns -= 1
+                else:
+                    scores[row + 1:, column] = matches.column_scores(column, row + 1)
+                changed[column] = True
+
+    def _process_optimal(self, tickets: List[Ticket], ambassadors: List[Ambassador],
+                         shifts: Union[List[Shift], ShiftIndex], ambassador_profiles: Dict[str, Dict],
+                         current_time: Optional[datetime]):
+        """Solve the whole batch as one capacity-constrained assignment problem."""
+        self.last_assignment_report = None
+        available_ambassadors = self._batch_availability(tickets, ambassadors, shifts, current_time)
+        if not available_ambassadors:
+            return
+
+        ambassador_ids = self._batch_candidates(available_ambassadors, ambassador_profiles)
+        capacity = self._limit_capacity(np.array([available_ambassadors[ambassador_id]['max_active_tickets']
+                                                  - available_ambassadors[ambassador_id]['current_tickets']
+                                                  for ambassador_id in ambassador_ids], dtype=np.int64), ambassador_ids)
+        scores = self.score_matrix(tickets, ambassador_ids, ambassador_profiles)
+        self.metrics.inc('tickets_scored_total', len(tickets), mode='optimal')
+        self.metrics.inc('candidates_scored_total', scores.size, mode='optimal')
+        columns, self.last_assignment_report = solve_with_report(scores, capacity)
+
+        has_candidate = (scores > 0.0).any(axis=1) if scores.shape[1] else np.zeros(len(tickets), dtype=bool)
+        for ticket, column, candidate in zip(tickets, columns.tolist(), has_candidate.tolist()):
+            if column >= 0:
+                self._record_match(ticket, ambassador_ids[column], ambassador_profiles)
+            elif candidate:
+                self.assigned_tickets[ticket.case_number] = (None, "No ambassador capacity left")
+            else:
+                self.assigned_tickets[ticket.case_number] = (None, "No suitable match found")
 
+    def _process_sharded(self, tickets: List[Ticket], ambassadors: List[Ambassador],
+                         shifts: Union[List[Shift], ShiftIndex], current_time: Optional[datetime]):
+        """Match line of business shards in worker processes, then apply the merged
+        results here in ticket order."""
+        if self.sharded_matcher is None or not self.sharded_matcher.serves(self, ambassadors, shifts):
+            self.close()
+            self.sharded_matcher = ShardedMatcher(self, ambassadors, shifts, self.workers)
+        results = self.sharded_matcher.match(tickets, current_time or datetime.now(), self.shard_size)
+        for ticket in tickets:
+            ambassador_id, explanation = results[ticket.case_number]
+            if ambassador_id:
+                self._assign_ticket(ticket, ambassador_id)
+            self.assigned_tickets[ticket.case_number] = (ambassador_id, explanation)
+
+    def close(self):
+        """Stop the worker processes of sharded mode, if any."""
+        if self.sharded_matcher is not None:
+            self.sharded_matcher.close()
+            self.sharded_matcher = None
+
+    def _batch_candidates(self, available_ambassadors: Dict[str, Dict], ambassador_profiles: Dict[str, Dict]) -> List[str]:
+        """Available, profiled ambassadors, restricted to capacity_limits when set."""
+        limits = self.capacity_limits
+        return [ambassador_id for ambassador_id, availability in available_ambassadors.items()
+                if availability['is_available'] and ambassador_id in ambassador_profiles
+                and (limits is None or limits.get(ambassador_id, 0) > 0)]
+
+    def _limit_capacity(self, remaining: np.ndarray, ambassador_ids: List[str]) -> np.ndarray:
+        if self.capacity_limits is None:
+            return remaining
+        return np.minimum(remaining, np.array([self.capacity_limits[ambassador_id] for ambassador_id in ambassador_ids],
+                                              dtype=remaining.dtype))
+
+    def _batch_availability(self, tickets: List[Ticket], ambassadors: List[Ambassador],
+                            shifts: Union[List[Shift], ShiftIndex], current_time: Optional[datetime]) -> Dict[str, Dict]:
+        """Availability shared by a whole batch, since it only depends on time and workload.
+        Records every ticket as unmatched when nobody is available."""
+        if not tickets:
+            return {}
+        available_ambassadors = self.availability_agent.check_availability(
+            tickets[0], ambassadors, shifts, current_time, self.workload)
+        if not available_ambassadors:
+            for ticket in tickets:
+                self.assigned_tickets[ticket.case_number] = (None, "No available ambassadors")
+        return available_ambassadors
+
+    def _record_match(self, ticket: Ticket, ambassador_id: str, ambassador_profiles: Dict[str, Dict]):
+        """Assign a batch-matched ticket, rendering the explanation with the scalar scorer."""
+        score, explanation = self._calculate_match_score(ticket, ambassador_profiles[ambassador_id])
+        self._assign_ticket(ticket, ambassador_id)
+        self.assigned_tickets[ticket.case_number] = (ambassador_id, f"Match score: {score:.2%} - {explanation}")
+
+    def score_matrix(self, tickets: List[Ticket], ambassador_ids: List[str],
+                     ambassador_profiles: Dict[str, Dict]) -> np.ndarray:
+        """Return the (tickets x ambassadors) match score matrix for the given ambassador order."""
+        return score_encoded(TicketArrays(tickets), ProfileArrays(ambassador_ids, ambassador_profiles),
+                             self._semantic_term(tickets, ambassador_ids))
+
+    def _semantic_enabled(self) -> bool:
+        return self.semantic_index is not None and self.similarity_weight != 0.0
+
+    def _semantic_term(self, tickets: List[Ticket], ambassador_ids: List[str]) -> Optional[np.ndarray]:
+        """Weighted (tickets x ambassadors) similarity term, or None when disabled."""
+        if not self._semantic_enabled():
+            return None
+        return self.similarity_weight * self.semantic_index.similarity_matrix(tickets, ambassador_ids)
+
+    def _semantic_similarity(self, ticket: Ticket, ambassador_id: str) -> float:
+        """Similarity of a ticket to an ambassador's past cases; the ticket's row is computed once."""
+        case_number, row = self._similarity_row
+        if case_number != ticket.case_number:
+            row = self.semantic_index.similarity_matrix([ticket])[0]
+            self._similarity_row = (ticket.case_number, row)
+        position = self.semantic_index.position.get(ambassador_id)
+        return 0.0 if position is None else float(row[position])
+
+    @metrics.timed()
     def _find_best_match(self, ticket: Ticket, available_ambassadors: Dict[str, Dict], 
                         ambassador_profiles: Dict[str, Dict]) -> Tuple[Optional[str], str]:
         """Find the best matching ambassador for a ticket.
         Returns a tuple of (ambassador_id, explanation)"""
+        if self.lazy_explanations:
+            return self._find_best_match_lazy(ticket, available_ambassadors, ambassador_profiles)
+
         best_score = 0.0
         best_ambassador_id = None
         best_explanation = "No suitable match found"
+        self.metrics.inc('tickets_scored_total', mode='scalar')
+        self.metrics.inc('candidates_scored_total', len(available_ambassadors), mode='scalar')
 
         for ambassador_id, availability in available_ambassadors.items():
             if not availability['is_available']:
@@ -65,6 +291,103 @@ class MatchingAgent:
 
         return best_ambassador_id, best_explanation
 
+    def _find_best_match_lazy(self, ticket: Ticket, available_ambassadors: Dict[str, Dict],
+                              ambassador_profiles: Dict[str, Dict]) -> Tuple[Optional[str], str]:
+        """Same result as the eager loop, but explanations are only rendered for the
+        winner, plus the top explain_top_k candidates when requested."""
+        best_score = 0.0
+        best_ambassador_id = None
+        scored: Optional[List[Tuple[float, str]]] = [] if self.explain_top_k > 0 else None
+
+        if self.use_candidate_index and self.candidate_index is not None:
+            ambassador_ids = self.candidate_index.candidates(ticket, available_ambassadors)
+        else:
+            ambassador_ids = available_ambassadors
+        self.metrics.inc('tickets_scored_total', mode='scalar')
+        self.metrics.inc('candidates_scored_total', len(ambassador_ids), mode='scalar')
+
+        for ambassador_id in ambassador_ids:
+            availability = available_ambassadors[ambassador_id]
+            if not availability['is_available']:
+                continue
+
+            profile = ambassador_profiles.get(ambassador_id)
+            if not profile:
+                continue
+
+            score = self._score_match(ticket, profile)
+            if scored is not None:
+                scored.append((score, ambassador_id))
+
+            if score > best_score:
+                best_score = score
+                best_ambassador_id = ambassador_id
+
+        if scored:
+            # Stable: equally scored candidates keep availability order
+            self.top_matches[ticket.case_number] = [
+                (ambassador_id, score, self._calculate_match_score(ticket, ambassador_profiles[ambassador_id])[1])
+                for score, ambassador_id in heapq.nlargest(self.explain_top_k, scored, key=lambda item: item[0])
+            ]
+
+        if best_ambassador_id is None:
+            return None, "No suitable match found"
+        _, explanation = self._calculate_match_score(ticket, ambassador_profiles[best_ambassador_id])
+        return best_ambassador_id, f"Match score: {best_score:.2%} - {explanation}"
+
+    def top_k(self, ticket: Ticket, k: int, available_ambassadors: Optional[Dict[str, Dict]] = None) -> List[Tuple[str, float]]:
+        """Ranked (ambassador_id, score) alternates for a ticket from the candidate index,
+        optionally restricted to the given available ambassadors."""
+        self._refresh_candidate_index()
+        return self.candidate_index.top_k(ticket, k, available_ambassadors)
+
+    def _refresh_candidate_index(self):
+        """Rebuild the candidate index only when profiles were rebuilt since it was built."""
+        if self.candidate_index is None or self._candidate_index_version != self.profiling_agent.version:
+            self.candidate_index = CandidateIndex(self.profiling_agent.ambassador_profiles, self._score_match)
+            self._candidate_index_version = self.profiling_agent.version
+
+    def _score_contributions(self, ticket: Ticket, profile: Dict) -> Tuple[float, float, float, float, float, float]:
+        """Numeric contribution of each term of _calculate_match_score, without any text:
+        (language, line of business, proficiency, urgency, past experience, semantic similarity)."""
+        language = 0.3 if self._language_match(ticket, profile) else 0.0
+        line_of_business = 0.25 if self._lob_match(ticket, profile) else 0.0
+
+        performance = profile['performance_metrics']
+        workload_ratio = profile['current_tickets'] / profile['max_active_tickets']
+        if ticket.technical_proficiency.lower() in ['expert', 'advanced']:
+            proficiency = 0.2 * (performance['customer_satisfaction'] / 5.0)
+        else:
+            proficiency = 0.2 * (1 - workload_ratio)
+
+        if ticket.urgency.lower() == 'high':
+            urgency = 0.15 * performance['success_rate']
+        else:
+            urgency = 0.15 * (1 - workload_ratio)
+
+        experience = 0.1 if ticket.primary_product in profile.get('past_products', []) else 0.0
+        similarity = 0.0
+        if self._semantic_enabled():
+            similarity = self.similarity_weight * self._semantic_similarity(ticket, profile['id'])
+        return language, line_of_business, proficiency, urgency, experience, similarity
+
+    def _language_match(self, ticket: Ticket, profile: Dict) -> bool:
+        """Bitset test on interned codes, falling back to string membership for unencoded data."""
+        match = has_code(profile.get('language_mask'), ticket.language_code)
+        return ticket.language in profile['languages'] if match is None else match
+
+    def _lob_match(self, ticket: Ticket, profile: Dict) -> bool:
+        """Bitset test on interned codes, falling back to string membership for unencoded data."""
+        match = has_code(profile.get('lob_mask'), ticket.lob_code)
+        return ticket.line_of_business in profile['line_of_business'] if match is None else match
+
+    def _score_match(self, ticket: Ticket, profile: Dict) -> float:
+        """Match score only; sums the contributions in the same order as _calculate_match_score."""
+        score = 0.0
+        for contribution in self._score_contributions(ticket, profile):
+            score += contribution
+        return score
+
     def _calculate_match_score(self, ticket: Ticket, profile: Dict) -> Tuple[float, str]:
         """Calculate a match score between ticket and ambassador profile.
         Returns a tuple of (score, explanation)"""
@@ -72,14 +395,14 @@ class MatchingAgent:
         explanations = []
 
         # Language match (30%)
-        if ticket.language in profile['languages']:
+        if self._language_match(ticket, profile):
             score += 0.3
             explanations.append(f"Language match: {ticket.language}")
         else:
             explanations.append(f"Language mismatch: {ticket.language} not in {profile['languages']}")
 
         # Line of business match (25%)
-        if ticket.line_of_business in profile['line_of_business']:
+        if self._lob_match(ticket, profile):
             score += 0.25
             explanations.append(f"Line of business match: {ticket.line_of_business}")
         else:
@@ -113,9 +436,33 @@ class MatchingAgent:
             score += 0.1
             explanations.append(f"Past experience with product: {ticket.primary_product}")
 
+        # Similar past cases (optional, similarity_weight)
+        if self._semantic_enabled():
+            similarity = self._semantic_similarity(ticket, profile['id'])
+            score += self.similarity_weight * similarity
+            explanations.append(f"Similar past cases: {similarity:.2%}")
+
         return score, " | ".join(explanations)
 
     def _assign_ticket(self, ticket: Ticket, ambassador_id: str):
         """Assign a ticket to an ambassador."""
         ticket.assigned = True
-        ticket.assigned_ambassador_id = ambassador_id
\ No newline at end of file
+        ticket.assigned_ambassador_id = ambassador_id
+        if self.workload is not None and self.workload.ambassador(ambassador_id):
+            self.workload.assign(ticket.case_number, ambassador_id)
+            self._sync_profile_workload(ambassador_id)
+
+    def release_ticket(self, ticket_id: str, ambassador_id: Optional[str] = None) -> Optional[str]:
+        """Free the ambassador slot of a closed ticket. ambassador_id is only needed for
+        tickets assigned before this agent started tracking workload.
+        Returns the ambassador the ticket was released from."""
+        if self.workload is None:
+            return None
+        ambassador_id = self.workload.release(ticket_id, ambassador_id)
+        if ambassador_id:
+            self._sync_profile_workload(ambassador_id)
+        return ambassador_id
+
+    def _sync_profile_workload(self, ambassador_id: str):
+        """Keep the cached profile's workload in line with the tracker."""
+        self.profiling_agent.update_workload(ambassador_id, self.workload.ambassador(ambassador_id).current_tickets)
\ No newline at end of file
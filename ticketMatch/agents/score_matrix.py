@@ -0,0 +1,164 @@
+"""Vectorised scoring of many tickets against many ambassador profiles.
+
+Mirrors MatchingAgent._calculate_match_score term for term, so the matrix entries
+equal the scalar scores up to floating-point rounding."""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.data_models import Ticket
+
+# Same weights as MatchingAgent._calculate_match_score
+LANGUAGE_WEIGHT = 0.3
+LOB_WEIGHT = 0.25
+PROFICIENCY_WEIGHT = 0.2
+URGENCY_WEIGHT = 0.15
+PRODUCT_WEIGHT = 0.1
+
+TECHNICAL_LEVELS = ['expert', 'advanced']
+
+def _membership(values_per_profile: List[List[str]], vocabulary: Dict[str, int]) -> np.ndarray:
+    """Boolean (profiles x vocabulary) matrix of which profile lists contain which value."""
+    matrix = np.zeros((len(values_per_profile), len(vocabulary)), dtype=bool)
+    for row, values in enumerate(values_per_profile):
+        for value in values or []:
+            column = vocabulary.get(value)
+            if column is not None:
+                matrix[row, column] = True
+    return matrix
+
+def _mask_bits(masks: List[int], width: int) -> np.ndarray:
+    """Boolean (profiles x width) matrix of the low `width` bits of each profile's bitset."""
+    # Profiles may hold codes the tickets never use, so bits above `width` are dropped first
+    low = (1 << width) - 1
+    if width <= 64:
+        array = np.array([mask & low for mask in masks], dtype=np.uint64)
+        return ((array[:, None] >> np.arange(width, dtype=np.uint64)) & np.uint64(1)).astype(bool)
+    # Wider vocabularies: unpack the bytes of the arbitrary-width Python ints
+    nbytes = (width + 7) // 8
+    raw = np.frombuffer(b''.join((mask & low).to_bytes(nbytes, 'little') for mask in masks), dtype=np.uint8)
+    return np.unpackbits(raw.reshape(len(masks), nbytes), axis=1, bitorder='little')[:, :width].astype(bool)
+
+def _flags(values: List[str], test) -> np.ndarray:
+    """Apply a string test once per distinct value instead of once per ticket."""
+    codes, vocabulary = _codes(values)
+    return np.array([test(value) for value in vocabulary], dtype=bool)[codes] if values else np.zeros(0, dtype=bool)
+
+def _codes(values: List[str]) -> Tuple[np.ndarray, Dict[str, int]]:
+    """Encode a list of strings as integer codes into a vocabulary built from them."""
+    vocabulary: Dict[str, int] = {}
+    codes = np.fromiter((vocabulary.setdefault(v, len(vocabulary)) for v in values), dtype=np.int64, count=len(values))
+    return codes, vocabulary
+
+class ProfileArrays:
+    """Column arrays of the profile fields used for scoring, in a fixed ambassador order."""
+
+    def __init__(self, ambassador_ids: List[str], profiles: Dict[str, Dict]):
+        self.ambassador_ids = ambassador_ids
+        selected = [profiles[ambassador_id] for ambassador_id in ambassador_ids]
+        self.languages = [p['languages'] for p in selected]
+        self.lines_of_business = [p['line_of_business'] for p in selected]
+        self.language_masks = [p.get('language_mask') for p in selected]
+        self.lob_masks = [p.get('lob_mask') for p in selected]
+        self.past_products = [p.get('past_products', []) for p in selected]
+        self.csat = np.array([p['performance_metrics']['customer_satisfaction'] for p in selected], dtype=np.float64)
+        self.success_rate = np.array([p['performance_metrics']['success_rate'] for p in selected], dtype=np.float64)
+        self.current_tickets = np.array([p['current_tickets'] for p in selected], dtype=np.float64)
+        self.max_active_tickets = np.array([p['max_active_tickets'] for p in selected], dtype=np.float64)
+        self.workload = self.current_tickets / self.max_active_tickets
+
+    def add_ticket(self, column: int):
+        """Account for one more active ticket of the ambassador in this column."""
+        self.current_tickets[column] += 1
+        self.workload[column] = self.current_tickets[column] / self.max_active_tickets[column]
+
+class TicketArrays:
+    """Column arrays of the ticket fields used for scoring.
+
+    Interned language and line of business codes (set by CategoricalEncoder) are kept
+    as they are, so matching against profile bitsets needs no string work; tickets
+    that were never encoded fall back to vocabularies built from their strings."""
+
+    def __init__(self, tickets: List[Ticket]):
+        self.languages = [t.language for t in tickets]
+        self.lines_of_business = [t.line_of_business for t in tickets]
+        self.language_codes = self._interned([t.language_code for t in tickets])
+        self.lob_codes = self._interned([t.lob_code for t in tickets])
+        self.product_codes, self.product_vocabulary = _codes([t.primary_product for t in tickets])
+        self.technical = _flags([t.technical_proficiency for t in tickets], lambda v: v.lower() in TECHNICAL_LEVELS)
+        self.high_urgency = _flags([t.urgency for t in tickets], lambda v: v.lower() == 'high')
+
+    @staticmethod
+    def _interned(codes: List[Optional[int]]) -> Optional[np.ndarray]:
+        """Interned codes, or None unless every ticket has one."""
+        return np.array(codes, dtype=np.int64) if None not in codes else None
+
+class MatchMatrices:
+    """Boolean (tickets x ambassadors) matches on language, line of business and past products,
+    plus the optional weighted semantic similarity term.
+    These do not depend on workload, so a column can be rescored after an assignment."""
+
+    def __init__(self, tickets: TicketArrays, profiles: ProfileArrays, semantic: Optional[np.ndarray] = None):
+        self.tickets = tickets
+        self.profiles = profiles
+        self.semantic = semantic
+        self.language = self._category(tickets.language_codes, profiles.language_masks,
+                                       tickets.languages, profiles.languages)
+        self.lob = self._category(tickets.lob_codes, profiles.lob_masks,
+                                  tickets.lines_of_business, profiles.lines_of_business)
+        self.product = _membership(profiles.past_products, tickets.product_vocabulary)[:, tickets.product_codes].T
+
+    @staticmethod
+    def _category(codes: Optional[np.ndarray], masks: List[Optional[int]],
+                  ticket_values: List[str], profile_values: List[List[str]]) -> np.ndarray:
+        """(tickets x ambassadors) matches: bit tests of the interned codes against the
+        profile bitsets, or string membership when either side was not encoded."""
+        if codes is not None and None not in masks:
+            width = int(codes.max()) + 1 if len(codes) else 0
+            return _mask_bits(masks, width)[:, codes].T
+        string_codes, vocabulary = _codes(ticket_values)
+        return _membership(profile_values, vocabulary)[:, string_codes].T
+
+    def scores(self) -> np.ndarray:
+        """The full score matrix."""
+        return _combine(self.language, self.lob, self.product,
+                        self.tickets.technical[:, None], self.tickets.high_urgency[:, None],
+                        self.profiles.csat, self.profiles.success_rate, self.profiles.workload, self.semantic)
+
+    def column_scores(self, column: int, first_row: int = 0) -> np.ndarray:
+        """Scores of one ambassador for tickets first_row onwards, with its current workload."""
+        rows = slice(first_row, None)
+        return _combine(self.language[rows, column], self.lob[rows, column], self.product[rows, column],
+                        self.tickets.technical[rows], self.tickets.high_urgency[rows],
+                        self.profiles.csat[column], self.profiles.success_rate[column],
+                        self.profiles.workload[column],
+                        None if self.semantic is None else self.semantic[rows, column])
+
+def _combine(language_match, lob_match, product_match, technical, high_urgency, csat, success_rate, workload,
+             semantic=None):
+    """Weighted sum of the score terms; arguments only need to broadcast together."""
+    # Terms are added in the same order as the scalar path to keep rounding identical
+    free_capacity = 1 - workload
+    scores = np.where(language_match, LANGUAGE_WEIGHT, 0.0)
+    scores = scores + np.where(lob_match, LOB_WEIGHT, 0.0)
+    scores = scores + np.where(technical, PROFICIENCY_WEIGHT * (csat / 5.0), PROFICIENCY_WEIGHT * free_capacity)
+    scores = scores + np.where(high_urgency, URGENCY_WEIGHT * success_rate, URGENCY_WEIGHT * free_capacity)
+    scores = scores + np.where(product_match, PRODUCT_WEIGHT, 0.0)
+    if semantic is not None:
+        scores = scores + semantic
+    return scores
+
+def score_encoded(tickets: TicketArrays, profiles: ProfileArrays, semantic: Optional[np.ndarray] = None) -> np.ndarray:
+    """Score already-encoded tickets against already-encoded profiles."""
+    return MatchMatrices(tickets, profiles, semantic).scores()
+
+def best_matches(scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-ticket argmax over ambassadors.
+
+    Returns (column, score) arrays; column is -1 where no ambassador scores above zero.
+    Ties go to the first column, like the strict '>' comparison of the scalar path."""
+    if scores.shape[1] == 0:
+        return np.full(scores.shape[0], -1, dtype=np.int64), np.zeros(scores.shape[0])
+    columns = np.argmax(scores, axis=1)
+    best = scores[np.arange(scores.shape[0]), columns]
+    return np.where(best > 0.0, columns, -1), best
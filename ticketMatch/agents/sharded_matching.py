@@ -0,0 +1,186 @@
+import os
+import pickle
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Union
+from core.data_models import Ticket, Ambassador, Shift
+from core.metrics import Metrics, metrics
+from core.shift_index import ShiftIndex
+from core.vocabulary import Vocabulary
+
+# (positions of the shard's tickets in the batch, ambassador_id -> capacity in the shard)
+Shard = Tuple[List[int], Dict[str, int]]
+# (case number, ambassador_id, explanation)
+ShardResult = List[Tuple[str, Optional[str], str]]
+
+UNSERVED = None  # Shard key of tickets whose line of business no ambassador works
+
+def _lob_key(value: Optional[str]) -> Optional[str]:
+    return Vocabulary.normalize(value).casefold() if value is not None else None
+
+def _allocate(total: int, weights: List[int], rotation: int) -> List[int]:
+    """Split total units in proportion to weights (largest remainder). Ties go to the
+    entry after `rotation`, so small capacities are spread over shards."""
+    weight_sum = sum(weights)
+    exact = [total * weight / weight_sum for weight in weights]
+    units = [int(share) for share in exact]
+    count = len(weights)
+    order = sorted(range(count), key=lambda i: (units[i] - exact[i], (i - rotation) % count))
+    for i in order[:total - sum(units)]:
+        units[i] += 1
+    return units
+
+def plan_shards(tickets: List[Ticket], ambassadors: List[Ambassador], shard_size: int) -> List[Shard]:
+    """Partition a batch by line of business, splitting lines larger than shard_size by a
+    hash of the case number.
+
+    Ambassadors take part in the shards of the lines they work; tickets of lines nobody
+    works form one shard open to every ambassador. An ambassador in several shards has
+    their remaining capacity divided between them in proportion to the shards' sizes,
+    so no ambassador can be given more tickets in total than they have room for."""
+    served: Dict[Optional[str], List[str]] = {}
+    for ambassador in ambassadors:
+        for key in dict.fromkeys(_lob_key(lob) for lob in ambassador.line_of_business):
+            served.setdefault(key, []).append(ambassador.id)
+
+    groups: Dict[Optional[str], List[int]] = {}
+    for position, ticket in enumerate(tickets):
+        key = _lob_key(ticket.line_of_business)
+        groups.setdefault(key if key in served else UNSERVED, []).append(position)
+
+    keyed_shards: List[Tuple[Optional[str], List[int]]] = []
+    for key, positions in groups.items():
+        parts = -(-len(positions) // shard_size)
+        if parts <= 1:
+            keyed_shards.append((key, positions))
+            continue
+        buckets: List[List[int]] = [[] for _ in range(parts)]
+        for position in positions:
+            # crc32 rather than hash(): the split must not depend on the process
+            buckets[zlib.crc32(tickets[position].case_number.encode('utf-8')) % parts].append(position)
+        keyed_shards.extend((key, bucket) for bucket in buckets if bucket)
+
+    memberships: Dict[str, List[int]] = {}
+    all_ids = [ambassador.id for ambassador in ambassadors]
+    for index, (key, _) in enumerate(keyed_shards):
+        for ambassador_id in (all_ids if key is UNSERVED else served[key]):
+            memberships.setdefault(ambassador_id, []).append(index)
+
+    capacities: List[Dict[str, int]] = [{} for _ in keyed_shards]
+    for rank, ambassador in enumerate(ambassadors):
+        remaining = ambassador.max_active_tickets - ambassador.current_tickets
+        indexes = memberships.get(ambassador.id)
+        if remaining <= 0 or not indexes:
+            continue
+        sizes = [len(keyed_shards[index][1]) for index in indexes]
+        for index, units in zip(indexes, _allocate(remaining, sizes, rank)):
+            if units:
+                capacities[index][ambassador.id] = units
+    return [(positions, capacity) for (_, positions), capacity in zip(keyed_shards, capacities)]
+
+class _ShardWorker:
+    """A private MatchingAgent over a copy of the read-only state, matching one shard at a time."""
+
+    def __init__(self, state: Dict):
+        from agents.matching_agent import MatchingAgent
+        self.ambassadors: List[Ambassador] = state['ambassadors']
+        self.shifts = state['shifts']
+        self.agent = MatchingAgent()
+        self.agent.metrics = Metrics()  # Shard outcomes are counted once, by the parent agent
+        self.agent.profiling_agent.use_expertise_index(state['expertise_index'])
+        self.agent.semantic_index = state['semantic_index']
+        self.agent.similarity_weight = state['similarity_weight']
+
+    def run(self, tickets: List[Ticket], capacity: Dict[str, int], current_tickets: List[int],
+            current_time: datetime) -> ShardResult:
+        for ambassador, count in zip(self.ambassadors, current_tickets):
+            ambassador.current_tickets = count
+        agent = self.agent
+        agent.workload = None  # Rebuilt from the ambassadors' current workload
+        agent.assigned_tickets = {}
+        agent.capacity_limits = capacity
+        agent.profiling_agent.analyze_conversation_history(self.ambassadors)
+        for ambassador in self.ambassadors:
+            agent.profiling_agent.update_workload(ambassador.id, ambassador.current_tickets)
+        agent.process_tickets(tickets, self.ambassadors, self.shifts, current_time, mode='vectorized')
+        return [(ticket.case_number,) + agent.assigned_tickets.get(ticket.case_number, (None, "No available ambassadors"))
+                for ticket in tickets]
+
+_worker: Optional[_ShardWorker] = None
+
+def _init_worker(state: bytes):
+    """Process pool initializer: unpickle the shared state once per worker process."""
+    global _worker
+    _worker = _ShardWorker(pickle.loads(state))
+
+def _run_shard(task: Tuple) -> ShardResult:
+    return _worker.run(*task)
+
+class ShardedMatcher:
+    """Runs line of business shards of a batch through vectorized matching in a process pool.
+
+    Ambassadors, shifts and the expertise and semantic indexes are pickled once and
+    handed to each worker by the pool initializer; a task only carries its tickets, its
+    capacities and the current workload. Results are merged in ticket order and do not
+    depend on the number of workers, only on shard_size. The state is a snapshot: after
+    changing ambassador data, call MatchingAgent.close() so the next batch starts fresh
+    workers."""
+
+    def __init__(self, agent, ambassadors: List[Ambassador], shifts: Union[List[Shift], ShiftIndex],
+                 workers: Optional[int] = None):
+        self.ambassadors = ambassadors
+        self.shifts = shifts
+        self.workers = workers or os.cpu_count() or 1
+        self._signature = self._agent_signature(agent)
+        self._state = pickle.dumps({
+            'ambassadors': ambassadors,
+            'shifts': shifts,
+            'expertise_index': agent.profiling_agent.expertise_index,
+            'semantic_index': agent.semantic_index,
+            'similarity_weight': agent.similarity_weight
+        }, protocol=pickle.HIGHEST_PROTOCOL)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._inline: Optional[_ShardWorker] = None
+        self.last_shards: List[int] = []  # Ticket count of each shard of the last batch
+
+    @staticmethod
+    def _agent_signature(agent) -> Tuple:
+        return (id(agent.profiling_agent.expertise_index), id(agent.semantic_index), agent.similarity_weight)
+
+    def serves(self, agent, ambassadors: List[Ambassador], shifts: Union[List[Shift], ShiftIndex]) -> bool:
+        """Whether this matcher's workers hold the state the agent would send now."""
+        return (ambassadors is self.ambassadors and shifts is self.shifts
+                and self._agent_signature(agent) == self._signature)
+
+    def match(self, tickets: List[Ticket], current_time: datetime, shard_size: int) -> Dict[str, Tuple[Optional[str], str]]:
+        """Match a batch; returns ticket_id -> (ambassador_id, explanation)."""
+        shards = plan_shards(tickets, self.ambassadors, shard_size)
+        self.last_shards = [len(positions) for positions, _ in shards]
+        metrics.inc('tickets_scored_total', len(tickets), mode='sharded')
+        metrics.inc('candidates_scored_total', sum(len(positions) * len(capacity) for positions, capacity in shards),
+                    mode='sharded')
+        current_tickets = [ambassador.current_tickets for ambassador in self.ambassadors]
+        tasks = [([tickets[position] for position in positions], capacity, current_tickets, current_time)
+                 for positions, capacity in shards]
+
+        if len(tasks) <= 1 or self.workers <= 1:
+            if self._inline is None:
+                self._inline = _ShardWorker(pickle.loads(self._state))
+            outputs = [self._inline.run(*task) for task in tasks]
+        else:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                                 initargs=(self._state,))
+            outputs = list(self._pool.map(_run_shard, tasks))
+
+        results = {}
+        for output in outputs:
+            for case_number, ambassador_id, explanation in output:
+                results[case_number] = (ambassador_id, explanation)
+        return results
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
@@ -0,0 +1,138 @@
+import json
+import time
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, IO, Iterable, List, Optional, Union
+import numpy as np
+from core.data_models import Ticket, Ambassador, Shift
+from core.metrics import metrics
+from core.shift_index import ShiftIndex
+from core.ticket_stream import StreamItem, ticket_from_record
+from core.vocabulary import CategoricalEncoder
+from agents.matching_agent import MatchingAgent, MATCHING_MODES
+
+class StreamMatcher:
+    """Matches micro-batches of streamed tickets against warm ambassador and shift state.
+
+    The ambassadors, shift index, profiles and live workload stay in memory between
+    batches; only the batch's tickets are encoded and scored. Results are taken out of
+    the matching agent after each batch, so memory does not grow with the stream.
+    Records with "event": "close" release the ambassador slot of that case number.
+    Latency is measured from when a ticket was read to when its assignment is emitted."""
+
+    def __init__(self, ambassadors: List[Ambassador], shifts: Union[List[Shift], ShiftIndex],
+                 encoder: Optional[CategoricalEncoder] = None, matching_agent: Optional[MatchingAgent] = None,
+                 mode: str = 'vectorized', latency_window: int = 10_000):
+        if mode not in MATCHING_MODES:
+            raise ValueError(f"Unknown matching mode '{mode}', expected one of {MATCHING_MODES}")
+        self.ambassadors = ambassadors
+        self.shifts = shifts
+        self.encoder = encoder  # Encoder of the loaded data, so streamed codes match the ambassadors' bitsets
+        self.matching_agent = matching_agent or MatchingAgent()
+        self.mode = mode
+        self.latencies: Deque[float] = deque(maxlen=latency_window)  # Most recent per-ticket latencies (ms)
+        self.tickets = 0
+        self.batches = 0
+        self.assigned = 0
+        self.released = 0
+        self.rejected = 0
+        self.max_latency = 0.0
+        self._started: Optional[float] = None
+
+    def match_batch(self, batch: List[StreamItem], current_time: Optional[datetime] = None) -> List[Dict]:
+        """Match one micro-batch and return one result record per ticket, in arrival order."""
+        if self._started is None:
+            self._started = time.monotonic()
+        entries = []  # (arrival, ticket or None, case number, explanation if not matched)
+        pending: List[Ticket] = []
+        queued = set()  # Case numbers matched in this batch; results are keyed by case number
+        assignments: Dict[str, tuple] = {}
+        for arrival, record in batch:
+            if record.get('event') == 'close':
+                # Tickets that arrived before the close are matched before the slot is freed
+                assignments.update(self._match(pending, current_time))
+                pending = []
+                case_number = str(record.get('case_number', '')).strip()
+                if self.matching_agent.release_ticket(case_number, record.get('ambassador_id')):
+                    self.released += 1
+                continue
+            try:
+                ticket = ticket_from_record(record)
+            except ValueError as e:
+                self.rejected += 1
+                entries.append((arrival, None, record.get('case_number'), str(e)))
+                continue
+            if ticket.assigned:
+                entries.append((arrival, None, ticket.case_number, "Already assigned"))
+                continue
+            if ticket.case_number in queued:
+                self.rejected += 1
+                entries.append((arrival, None, ticket.case_number, "Duplicate case number in batch"))
+                continue
+            queued.add(ticket.case_number)
+            if self.encoder is not None:
+                self.encoder.encode_ticket(ticket)
+            pending.append(ticket)
+            entries.append((arrival, ticket, ticket.case_number, None))
+        assignments.update(self._match(pending, current_time))
+
+        emitted = time.monotonic()
+        results = []
+        for arrival, ticket, case_number, explanation in entries:
+            ambassador_id = None
+            if ticket is not None:
+                ambassador_id, explanation = assignments[case_number]
+                self.assigned += ambassador_id is not None
+            latency = (emitted - arrival) * 1000.0
+            self.latencies.append(latency)
+            self.max_latency = max(self.max_latency, latency)
+            metrics.observe('ticket_latency_seconds', emitted - arrival)
+            results.append({
+                'case_number': case_number,
+                'ambassador_id': ambassador_id,
+                'explanation': explanation,
+                'latency_ms': round(latency, 3)
+            })
+        self.tickets += len(results)
+        self.batches += 1
+        return results
+
+    def _match(self, tickets: List[Ticket], current_time: Optional[datetime]) -> Dict[str, tuple]:
+        """Match tickets and take their results out of the matching agent."""
+        if not tickets:
+            return {}
+        self.matching_agent.process_tickets(tickets, self.ambassadors, self.shifts, current_time, self.mode)
+        assignments = {}
+        for ticket in tickets:
+            assignments[ticket.case_number] = self.matching_agent.assigned_tickets.pop(ticket.case_number, (None, "Not matched"))
+            self.matching_agent.top_matches.pop(ticket.case_number, None)
+        return assignments
+
+    def run(self, batches: Iterable[List[StreamItem]], output: IO, current_time: Optional[datetime] = None) -> Dict:
+        """Match every batch and write the results to output as JSON lines, flushing per batch."""
+        for batch in batches:
+            for result in self.match_batch(batch, current_time):
+                output.write(json.dumps(result) + '\n')
+            output.flush()
+        return self.stats()
+
+    def stats(self) -> Dict:
+        """Counts, throughput and latency percentiles over the latency window."""
+        elapsed = time.monotonic() - self._started if self._started is not None else 0.0
+        latencies = np.fromiter(self.latencies, dtype=np.float64, count=len(self.latencies))
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (0.0, 0.0, 0.0)
+        return {
+            'tickets': self.tickets,
+            'batches': self.batches,
+            'assigned': self.assigned,
+            'released': self.released,
+            'rejected': self.rejected,
+            'seconds': round(elapsed, 3),
+            'tickets_per_second': round(self.tickets / elapsed, 1) if elapsed > 0 else 0.0,
+            'latency_ms': {
+                'p50': round(float(p50), 3),
+                'p95': round(float(p95), 3),
+                'p99': round(float(p99), 3),
+                'max': round(self.max_latency, 3)
+            }
+        }
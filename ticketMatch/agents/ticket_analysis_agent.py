@@ -1,9 +1,38 @@
-from typing import List, Optional
+import asyncio
+import json
+import time
+from typing import Dict, List, Optional
 from core.data_models import Ticket
+from core.llm_cache import AnalysisCache
+from core.rate_limiter import estimate_tokens
+from core.metrics import metrics
+
+DEFAULT_DEPLOYMENT = "gpt-4o-mini"
+TEMPERATURE = 0.2
+MAX_TOKENS = 200
+# Batched analysis: rough token accounting (about four characters per token)
+BATCH_TOKEN_BUDGET = 8000
+MAX_BATCH_SIZE = 50
+OUTPUT_TOKENS_PER_TICKET = 40
+VALID_URGENCY = ("low", "medium", "high")
+VALID_SENTIMENT = ("positive", "neutral", "negative")
+BATCH_SYSTEM_PROMPT = (
+    "You are an assistant that extracts metadata from support tickets. "
+    "The user message is a JSON array of tickets with 'case_number' and 'text'. "
+    "Return only a JSON array with one object per ticket, each with: "
+    "'case_number' (copied from the input), 'topic' (the main issue area), "
+    "'urgency' (low/medium/high) and 'sentiment' (positive/neutral/negative)."
+)
 
 class TicketAnalysisAgent:
-    def __init__(self):
+    def __init__(self, connection=None, cache: Optional[AnalysisCache] = None):
         self.unassigned_tickets: List[Ticket] = []
+        # Optional AzureConnection sending the requests (rate limited, with retries) and naming the deployment
+        self.connection = connection
+        self.deployment = connection.deployment if connection is not None else DEFAULT_DEPLOYMENT
+        self.cache = cache  # Optional AnalysisCache; hits skip the model call entirely
+        self.last_async_stats: Dict = {}
+        self.last_batch_stats: Dict = {}
 
     def analyze_tickets(self, tickets: List[Ticket]) -> List[Ticket]:
         """Analyze all tickets and return unassigned ones."""
@@ -14,8 +43,8 @@ class TicketAnalysisAgent:
         """Return the list of unassigned tickets."""
         return self.unassigned_tickets
 
-    def analyze_ticket(self, ticket_text: str) -> dict:
-        prompt = [
+    def _build_prompt(self, ticket_text: str) -> List[Dict]:
+        return [
             {"role": "system", "content": (
                 "You are an assistant that extracts metadata from support tickets. "
                 "Given a user message, return a JSON with: "
@@ -25,21 +54,232 @@ class TicketAnalysisAgent:
             {"role": "user", "content": f"Ticket: {ticket_text}"}
         ]
 
-        response = self.client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=prompt,
-            temperature=0.2,
-            max_tokens=200
-        )
+    def _default_analysis(self, error: str) -> dict:
+        return {
+            "topic": "unknown",
+            "urgency": "medium",
+            "sentiment": "neutral",
+            "error": error
+        }
 
-        import json
+    def _parse_response(self, response) -> dict:
         try:
             content = response.choices[0].message.content
             return json.loads(content)
         except Exception as e:
-            return {
-                "topic": "unknown",
-                "urgency": "medium",
-                "sentiment": "neutral",
-                "error": f"Could not parse response: {str(e)}"
-            }
\ No newline at end of file
+            return self._default_analysis(f"Could not parse response: {str(e)}")
+
+    def _cache_key(self, prompt: List[Dict]) -> Optional[str]:
+        if self.cache is None:
+            return None
+        return self.cache.make_key(prompt, self.deployment, TEMPERATURE, MAX_TOKENS)
+
+    def _store(self, key: Optional[str], analysis: dict, latency: float):
+        # Fallback analyses are not cached, so the ticket is retried on the next run
+        if key is not None and 'error' not in analysis:
+            self.cache.put(key, analysis, latency)
+
+    @metrics.timed()
+    def analyze_ticket(self, ticket_text: str) -> dict:
+        prompt = self._build_prompt(ticket_text)
+        key = self._cache_key(prompt)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        connection = self._get_connection()
+        start = time.perf_counter()
+        response = connection.chat_completion(prompt, max_tokens=MAX_TOKENS, temperature=TEMPERATURE)
+        analysis = self._parse_response(response)
+        self._store(key, analysis, time.perf_counter() - start)
+        return analysis
+
+    def _lookup(self, keys: List[Optional[str]]) -> Dict[str, dict]:
+        """Cached analyses of the distinct keys that hit."""
+        cached = {}
+        for key in dict.fromkeys(keys):
+            value = self.cache.get(key) if key is not None else None
+            if value is not None:
+                cached[key] = value
+        return cached
+
+    def _get_connection(self):
+        if self.connection is None:
+            raise ValueError("Azure OpenAI client not initialized")
+        return self.connection
+
+    def plan_batches(self, tickets: Dict[str, str], token_budget: int = BATCH_TOKEN_BUDGET,
+                     max_batch_size: int = MAX_BATCH_SIZE) -> List[List[str]]:
+        """Group case numbers into batches whose prompt plus expected answer fits token_budget.
+        A ticket too large for the budget on its own still gets a batch of one."""
+        overhead = estimate_tokens(BATCH_SYSTEM_PROMPT) + 2
+        batches: List[List[str]] = []
+        batch: List[str] = []
+        used = overhead
+        for case_number, ticket_text in tickets.items():
+            cost = estimate_tokens(json.dumps({"case_number": case_number, "text": ticket_text})) + OUTPUT_TOKENS_PER_TICKET
+            if batch and (used + cost > token_budget or len(batch) >= max_batch_size):
+                batches.append(batch)
+                batch, used = [], overhead
+            batch.append(case_number)
+            used += cost
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _build_batch_prompt(self, tickets: Dict[str, str], case_numbers: List[str]) -> List[Dict]:
+        return [
+            {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+            {"role": "user", "content": json.dumps(
+                [{"case_number": case_number, "text": tickets[case_number]} for case_number in case_numbers],
+                ensure_ascii=False)}
+        ]
+
+    def _parse_batch_response(self, response, case_numbers: List[str]) -> Dict[str, dict]:
+        """Per-ticket analyses from a batch answer. Tickets whose element is missing or
+        malformed get the default analysis; the rest of the batch is kept."""
+        try:
+            content = response.choices[0].message.content.strip()
+            if content.startswith("```"):
+                content = content.strip("`").removeprefix("json").strip()
+            elements = json.loads(content)
+            if isinstance(elements, dict):
+                elements = next((value for value in elements.values() if isinstance(value, list)), [elements])
+            if not isinstance(elements, list):
+                raise ValueError("expected a JSON array")
+        except Exception as e:
+            error = f"Could not parse response: {str(e)}"
+            return {case_number: self._default_analysis(error) for case_number in case_numbers}
+
+        expected = set(case_numbers)
+        analyses: Dict[str, dict] = {}
+        for element in elements:
+            if not isinstance(element, dict) or str(element.get("case_number")) not in expected:
+                continue
+            analysis = {key: element.get(key) for key in ("topic", "urgency", "sentiment")}
+            if (isinstance(analysis["topic"], str) and analysis["urgency"] in VALID_URGENCY
+                    and analysis["sentiment"] in VALID_SENTIMENT):
+                analyses[str(element["case_number"])] = analysis
+
+        for case_number in case_numbers:
+            if case_number not in analyses:
+                analyses[case_number] = self._default_analysis("Missing or invalid entry in batch response")
+        return analyses
+
+    @metrics.timed()
+    def analyze_tickets_batched(self, tickets: Dict[str, str], token_budget: int = BATCH_TOKEN_BUDGET,
+                                max_batch_size: int = MAX_BATCH_SIZE) -> Dict[str, dict]:
+        """Analyze tickets (case number -> ticket text) packing several tickets per request.
+
+        Batches are sized to token_budget by plan_batches. Returns case number -> analysis
+        in input order; a ticket the model answered incorrectly gets the default analysis
+        without affecting the rest of its batch. Cached tickets are not sent at all."""
+        results: Dict[str, Optional[dict]] = dict.fromkeys(tickets)
+        keys: Dict[str, Optional[str]] = {}
+        pending: Dict[str, str] = {}
+        for case_number, ticket_text in tickets.items():
+            keys[case_number] = key = self._cache_key(self._build_prompt(ticket_text))
+            cached = self.cache.get(key) if key is not None else None
+            if cached is not None:
+                results[case_number] = cached
+            else:
+                pending[case_number] = ticket_text
+
+        batches = self.plan_batches(pending, token_budget, max_batch_size)
+        connection = self._get_connection() if batches else None
+        fallbacks = 0
+        for case_numbers in batches:
+            start = time.perf_counter()
+            try:
+                response = connection.chat_completion(
+                    self._build_batch_prompt(pending, case_numbers),
+                    max_tokens=OUTPUT_TOKENS_PER_TICKET * len(case_numbers) + 50,
+                    temperature=TEMPERATURE
+                )
+                analyses = self._parse_batch_response(response, case_numbers)
+            except Exception as e:
+                analyses = {case_number: self._default_analysis(f"Request failed: {str(e)}")
+                            for case_number in case_numbers}
+            # Spread the request latency over its tickets for the cache's latency-saved counter
+            latency = (time.perf_counter() - start) / len(case_numbers)
+            for case_number in case_numbers:
+                analysis = analyses[case_number]
+                fallbacks += 'error' in analysis
+                self._store(keys[case_number], analysis, latency)
+                results[case_number] = analysis
+
+        self.last_batch_stats = {
+            'tickets': len(tickets),
+            'cache_hits': len(tickets) - len(pending),
+            'requests': len(batches),
+            'fallbacks': fallbacks
+        }
+        return results
+
+    async def analyze_tickets_async(self, ticket_texts: List[str], max_concurrency: int = 8,
+                                    timeout: Optional[float] = 30.0) -> List[dict]:
+        """Analyze many tickets concurrently, with at most max_concurrency requests in flight.
+
+        Results are returned in input order. A request that fails or takes longer than
+        timeout seconds yields the default analysis with an 'error' key instead of
+        aborting the batch. Cache hits are answered without a request, and tickets
+        sharing a cache key are sent once. Throughput figures are left in last_async_stats."""
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        semaphore = asyncio.Semaphore(max_concurrency)
+        counters = {'errors': 0, 'timeouts': 0, 'cache_hits': 0}
+
+        async def analyze(prompt: List[Dict], key: Optional[str]) -> dict:
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await asyncio.wait_for(connection.chat_completion_async(
+                        prompt, max_tokens=MAX_TOKENS, temperature=TEMPERATURE), timeout)
+                except asyncio.TimeoutError:
+                    counters['timeouts'] += 1
+                    return self._default_analysis(f"Request timed out after {timeout}s")
+                except Exception as e:
+                    counters['errors'] += 1
+                    return self._default_analysis(f"Request failed: {str(e)}")
+            analysis = self._parse_response(response)
+            # The disk cache blocks, so it is written from a worker thread, off the event loop
+            await asyncio.to_thread(self._store, key, analysis, time.perf_counter() - start)
+            return analysis
+
+        start = time.perf_counter()
+        results: List[Optional[dict]] = [None] * len(ticket_texts)
+        ticket_prompts = [self._build_prompt(ticket_text) for ticket_text in ticket_texts]
+        ticket_keys = [self._cache_key(prompt) for prompt in ticket_prompts]
+        cached = await asyncio.to_thread(self._lookup, ticket_keys) if self.cache is not None else {}
+        # Tickets with the same cache key are only sent once
+        pending: Dict[str, List[int]] = {}
+        prompts: Dict[str, List[Dict]] = {}
+        for i, (prompt, key) in enumerate(zip(ticket_prompts, ticket_keys)):
+            if key in cached:
+                counters['cache_hits'] += 1
+                results[i] = dict(cached[key])
+                continue
+            if key is None:
+                key = str(i)
+            pending.setdefault(key, []).append(i)
+            prompts.setdefault(key, prompt)
+
+        if pending:
+            connection = self._get_connection()
+            analyses = await asyncio.gather(*(
+                analyze(prompts[key], key if self.cache is not None else None) for key in pending))
+            for positions, analysis in zip(pending.values(), analyses):
+                for i in positions:
+                    results[i] = dict(analysis)
+
+        elapsed = time.perf_counter() - start
+        self.last_async_stats = {
+            'tickets': len(ticket_texts),
+            'requests': len(pending),
+            'max_concurrency': max_concurrency,
+            'seconds': elapsed,
+            'tickets_per_second': len(ticket_texts) / elapsed if elapsed > 0 else 0.0,
+            **counters
+        }
+        return results
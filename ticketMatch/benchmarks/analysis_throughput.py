@@ -0,0 +1,49 @@
+"""Ticket analysis throughput (tickets/s) as a function of the concurrency limit.
+
+Runs TicketAnalysisAgent.analyze_tickets_async against the local fake completion
+server, so the numbers reflect client-side concurrency rather than model speed:
+
+    python benchmarks/analysis_throughput.py --tickets 400 --latency 0.2
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from agents.ticket_analysis_agent import TicketAnalysisAgent
+from core.azure_connection import AzureConnection
+from tests.fake_completion_server import FakeCompletionServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickets", type=int, default=400)
+    parser.add_argument("--latency", type=float, default=0.2, help="simulated model latency in seconds")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    args = parser.parse_args()
+
+    texts = [f"Ticket{i} Outlook keeps asking for credentials" for i in range(args.tickets)]
+    with FakeCompletionServer(latency=args.latency) as server:
+        os.environ["AZURE_OPENAI_ENDPOINT"] = server.url
+        os.environ["AZURE_OPENAI_KEY"] = "benchmark"
+        agent = TicketAnalysisAgent(AzureConnection())
+        asyncio.run(run(agent, server, texts, args.concurrency))
+
+
+async def run(agent, server, texts, concurrency_levels):
+    print(f"{'concurrency':>11}  {'seconds':>8}  {'tickets/s':>9}  {'max in flight':>13}")
+    try:
+        for concurrency in concurrency_levels:
+            server.reset_counters()
+            await agent.analyze_tickets_async(texts, max_concurrency=concurrency)
+            stats = agent.last_async_stats
+            print(f"{concurrency:>11}  {stats['seconds']:>8.2f}  {stats['tickets_per_second']:>9.1f}  "
+                  f"{server.max_in_flight:>13}")
+    finally:
+        await agent.connection.aclose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Retained memory of tickets and ambassadors as plain dataclasses, slotted dataclasses and column stores.
+
+Builds the same seeded records three ways and measures what each container keeps
+allocated with tracemalloc: dataclass instances with a __dict__ (the models before
+slots), the slotted Ticket and Ambassador models, and TicketStore / AmbassadorStore.
+Each row gets its own case number and issue summary; categories are shared strings,
+as after CategoricalEncoder interning:
+
+    python benchmarks/memory_footprint.py --tickets 1000000 --ambassadors 10000
+"""
+import argparse
+import dataclasses
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from benchmarks.synthetic_data import DESCRIPTIONS, FEATURES, LANGUAGES, LINES_OF_BUSINESS, PRODUCTS, PROFICIENCY, URGENCY
+from core.data_models import Ambassador, Ticket
+from core.stores import AmbassadorStore, TicketStore
+
+
+def _plain(model):
+    """The model as a regular dataclass with a per-instance __dict__."""
+    return dataclasses.make_dataclass(f"Plain{model.__name__}",
+                                      [(field.name, field.type, field) for field in dataclasses.fields(model)])
+
+
+PlainTicket = _plain(Ticket)
+PlainAmbassador = _plain(Ambassador)
+
+
+def tickets(model, count: int, seed: int):
+    rng = random.Random(seed)
+    for i in range(count):
+        product = rng.choice(PRODUCTS)
+        yield model(
+            case_number=f"TCKT{i:07d}",
+            line_of_business=rng.choice(LINES_OF_BUSINESS),
+            primary_product=product,
+            primary_feature=rng.choice(FEATURES),
+            specific_primary_driver=product,
+            secondary_product=None,
+            specific_secondary_feature=None,
+            issue_summary=f"{product} issue reported by user {i}",
+            technical_proficiency=rng.choice(PROFICIENCY),
+            detailed_description=rng.choice(DESCRIPTIONS),
+            urgency=rng.choice(URGENCY),
+            language=rng.choice(LANGUAGES),
+            language_code=rng.randrange(len(LANGUAGES)),
+            lob_code=rng.randrange(len(LINES_OF_BUSINESS)),
+            product_code=rng.randrange(len(PRODUCTS))
+        )
+
+
+def ambassadors(model, count: int, seed: int):
+    rng = random.Random(seed)
+    for i in range(count):
+        yield model(
+            id=f"AMB{i:05d}",
+            name=f"Ambassador {i}",
+            line_of_business=rng.sample(LINES_OF_BUSINESS, rng.randint(1, 2)),
+            languages=rng.sample(LANGUAGES, rng.randint(1, 2)),
+            csat_score=round(rng.uniform(3.0, 5.0), 2),
+            case_history=[f"TCKT{rng.randrange(10_000_000):07d}" for _ in range(5)],
+            language_mask=rng.randrange(1, 1 << len(LANGUAGES)),
+            lob_mask=rng.randrange(1, 1 << len(LINES_OF_BUSINESS))
+        )
+
+
+def measure(build):
+    """(retained bytes, seconds) of the container returned by build()."""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    container = build()
+    seconds = time.perf_counter() - started
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del container
+    gc.collect()
+    return retained, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickets", type=int, default=1_000_000)
+    parser.add_argument("--ambassadors", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    cases = [
+        ("tickets", args.tickets, [
+            ("plain dataclass", lambda: list(tickets(PlainTicket, args.tickets, args.seed))),
+            ("slotted dataclass", lambda: list(tickets(Ticket, args.tickets, args.seed))),
+            ("TicketStore", lambda: TicketStore(tickets(Ticket, args.tickets, args.seed))),
+        ]),
+        ("ambassadors", args.ambassadors, [
+            ("plain dataclass", lambda: list(ambassadors(PlainAmbassador, args.ambassadors, args.seed))),
+            ("slotted dataclass", lambda: list(ambassadors(Ambassador, args.ambassadors, args.seed))),
+            ("AmbassadorStore", lambda: AmbassadorStore(ambassadors(Ambassador, args.ambassadors, args.seed))),
+        ]),
+    ]
+
+    print(f"{'records':<20} {'container':<18} {'MiB':>9} {'bytes/row':>10} {'vs plain':>9} {'build s':>8}")
+    for kind, count, builders in cases:
+        plain = None
+        for label, build in builders:
+            retained, seconds = measure(build)
+            plain = plain or retained
+            print(f"{f'{count} {kind}':<20} {label:<18} {retained / 2**20:>9.1f} {retained / max(1, count):>10.0f} "
+                  f"{retained / plain:>9.2f} {seconds:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""Per-stage timings of the matching pipeline on seeded synthetic data.
+
+Each case generates a dataset in the workbook layout, stores it as an xlsx workbook
+or a SQLite store, and times the stages separately: load, profile, availability (the
+check process_tickets makes for the backlog), scoring (process_tickets on the unassigned
+backlog) and save. Results are written
+as JSON and can be compared against a stored baseline; a stage that got slower than
+the tolerance allows makes the run exit with status 1:
+
+    python benchmarks/pipeline_benchmark.py --preset small --output results.json
+    python benchmarks/pipeline_benchmark.py --preset small --baseline benchmarks/baseline.json
+    python benchmarks/pipeline_benchmark.py --case 100000x1000 --source sqlite --mode sharded
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from agents.matching_agent import MatchingAgent, MATCHING_MODES
+from benchmarks.synthetic_data import NOW, generate_sheets
+from core.data_loader import DataLoader
+from core.results_writer import ResultsWriter, ambassador_names
+from core.sqlite_store import SQLiteStore, write_sheets
+from core.workload_tracker import WorkloadTracker
+
+STAGES = ('load', 'profile', 'availability', 'scoring', 'save')
+PRESETS = {
+    'smoke': [(1_000, 100)],
+    'small': [(1_000, 100), (10_000, 1_000)],
+    'medium': [(100_000, 1_000)],
+    'large': [(1_000_000, 10_000)],
+}
+NOISE_SECONDS = 0.002  # Jitter of sub-millisecond stages between runs of an unchanged tree
+XLSX_MAX_TICKETS = 50_000  # Larger cases are loaded from SQLite unless --source says otherwise
+
+
+def case_name(n_tickets: int, n_ambassadors: int, source: str, mode: str) -> str:
+    return f"{n_tickets}x{n_ambassadors}-{source}-{mode}"
+
+
+def run_case(n_tickets: int, n_ambassadors: int, seed: int, source: str, mode: str, workdir: str) -> Dict:
+    """Generate, store and match one dataset; returns its stage timings in seconds."""
+    started = time.perf_counter()
+    sheets = generate_sheets(n_tickets, n_ambassadors, seed)
+    path = os.path.join(workdir, f"{n_tickets}x{n_ambassadors}.{'xlsx' if source == 'xlsx' else 'sqlite'}")
+    if source == 'xlsx':
+        write_sheets(sheets, path)
+    else:
+        store = SQLiteStore(path)
+        store.import_sheets(sheets)
+        store.close()
+    setup = time.perf_counter() - started
+    timings = {}
+
+    started = time.perf_counter()
+    data_loader = DataLoader(path, use_snapshot=False, unassigned_only=True)
+    backlog, ambassadors, _ = data_loader.load_data()
+    timings['load'] = time.perf_counter() - started
+
+    # Enough capacity for the whole backlog, so every ticket is scored
+    capacity = max(3, math.ceil(len(backlog) / max(1, n_ambassadors)) * 2)
+    for ambassador in ambassadors:
+        ambassador.max_active_tickets = capacity
+
+    matching_agent = MatchingAgent()
+    matching_agent.profiling_agent.use_expertise_index(data_loader.expertise_index)
+    started = time.perf_counter()
+    matching_agent.profiling_agent.analyze_conversation_history(ambassadors)
+    timings['profile'] = time.perf_counter() - started
+
+    # The availability check process_tickets makes: one per ticket in scalar mode, one per
+    # batch otherwise (sharded workers match their shards in vectorized mode)
+    matching_agent.workload = WorkloadTracker(ambassadors)
+    started = time.perf_counter()
+    if mode == 'scalar':
+        available = sum(len(matching_agent.availability_agent.check_availability(
+            ticket, ambassadors, data_loader.shift_index, NOW, matching_agent.workload)) for ticket in backlog)
+        available_per_ticket = available / len(backlog) if backlog else 0.0
+    else:
+        available_per_ticket = len(matching_agent._batch_availability(backlog, ambassadors, data_loader.shift_index, NOW))
+    timings['availability'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    try:
+        assignments = matching_agent.process_tickets(backlog, ambassadors, data_loader.shift_index, NOW, mode=mode)
+    finally:
+        matching_agent.close()
+    timings['scoring'] = time.perf_counter() - started
+
+    names = ambassador_names(ambassadors)
+    results_path = os.path.join(workdir, f"{n_tickets}x{n_ambassadors}.jsonl")
+    if os.path.exists(results_path):
+        os.remove(results_path)  # Left by the previous repeat, whose records would all be skipped
+    started = time.perf_counter()
+    if data_loader.store is not None:
+        data_loader.store.save_assignments(assignments, names)
+        data_loader.store.close()
+    else:
+        ResultsWriter(results_path).save(assignments, names)
+    timings['save'] = time.perf_counter() - started
+
+    return {
+        'case': case_name(n_tickets, n_ambassadors, source, mode),
+        'tickets': n_tickets,
+        'ambassadors': n_ambassadors,
+        'backlog': len(backlog),
+        'available_per_ticket': round(available_per_ticket, 2),
+        'matched': sum(1 for ambassador_id, _ in assignments.values() if ambassador_id),
+        'source': source,
+        'mode': mode,
+        'setup_seconds': round(setup, 4),
+        'stages': {stage: round(timings[stage], 6) for stage in STAGES},
+    }
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float, min_seconds: float,
+            noise_seconds: float = NOISE_SECONDS) -> List[Dict]:
+    """Stage-by-stage comparison with a baseline run. A stage regresses when it is more
+    than `tolerance` (relative) slower and more than `min_seconds` slower. A stage whose
+    baseline is shorter than `min_seconds` could never pass that floor, so it only has to
+    be more than `noise_seconds` slower, which still ignores timer jitter."""
+    baseline_cases = {case['case']: case for case in baseline.get('cases', [])}
+    rows = []
+    for case in results['cases']:
+        previous = baseline_cases.get(case['case'])
+        if previous is None:
+            continue
+        for stage in STAGES:
+            current, before = case['stages'][stage], previous['stages'].get(stage)
+            if before is None:
+                continue
+            ratio = current / before if before > 0 else math.inf
+            floor = min_seconds if before >= min_seconds else min(min_seconds, noise_seconds)
+            rows.append({
+                'case': case['case'],
+                'stage': stage,
+                'baseline': before,
+                'current': current,
+                'ratio': round(ratio, 3),
+                'regression': ratio > 1 + tolerance and current - before > floor
+            })
+    return rows
+
+
+def run(cases, seed: int, source: str, mode: str, repeat: int) -> Dict:
+    """Run every case `repeat` times and keep the fastest time of each stage."""
+    results = {
+        'version': 1,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'seed': seed,
+        'cases': []
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for n_tickets, n_ambassadors in cases:
+            case_source = source if source != 'auto' else ('xlsx' if n_tickets <= XLSX_MAX_TICKETS else 'sqlite')
+            best: Optional[Dict] = None
+            for _ in range(repeat):
+                case = run_case(n_tickets, n_ambassadors, seed, case_source, mode, workdir)
+                if best is None:
+                    best = case
+                else:
+                    best['stages'] = {stage: min(best['stages'][stage], case['stages'][stage]) for stage in STAGES}
+            results['cases'].append(best)
+    return results
+
+
+def parse_case(value: str):
+    tickets, _, ambassadors = value.lower().partition('x')
+    return int(tickets), int(ambassadors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="smoke")
+    parser.add_argument("--case", type=parse_case, action="append", help="TICKETSxAMBASSADORS, e.g. 100000x1000")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--source", choices=("auto", "xlsx", "sqlite"), default="auto")
+    parser.add_argument("--mode", choices=MATCHING_MODES, default="vectorized")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case; the fastest time of each stage is kept")
+    parser.add_argument("--output", help="write the results JSON here")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown per stage")
+    parser.add_argument("--min-seconds", type=float, default=0.05, help="ignore slowdowns smaller than this in stages that take at least this long")
+    parser.add_argument("--noise-seconds", type=float, default=NOISE_SECONDS,
+                        help="ignore slowdowns smaller than this in shorter stages")
+    args = parser.parse_args()
+
+    results = run(args.case or PRESETS[args.preset], args.seed, args.source, args.mode, args.repeat)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    print(f"{'case':<32} " + " ".join(f"{stage:>12}" for stage in STAGES))
+    for case in results['cases']:
+        print(f"{case['case']:<32} " + " ".join(f"{case['stages'][stage]:>12.4f}" for stage in STAGES))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            rows = compare(results, json.load(f), args.tolerance, args.min_seconds, args.noise_seconds)
+        regressions = [row for row in rows if row['regression']]
+        print(f"\n{'case':<32} {'stage':<12} {'baseline':>10} {'current':>10} {'ratio':>7}")
+        for row in rows:
+            flag = "  REGRESSION" if row['regression'] else ""
+            print(f"{row['case']:<32} {row['stage']:<12} {row['baseline']:>10.4f} {row['current']:>10.4f} "
+                  f"{row['ratio']:>7.2f}{flag}")
+        if regressions:
+            print(f"\n{len(regressions)} stage(s) regressed beyond {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
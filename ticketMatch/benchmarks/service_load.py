@@ -0,0 +1,111 @@
+"""Load generator for the matching service: request latency percentiles and throughput.
+
+Starts the service in-process on a free port (or targets --url) and sends match
+requests from concurrent keep-alive clients:
+
+    python benchmarks/service_load.py --clients 8 --requests 200
+    python benchmarks/service_load.py --url http://127.0.0.1:8080 --batch-size 50
+"""
+import argparse
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+import numpy as np
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from service import MatchingService, create_server
+
+LANGUAGES = ["English", "Spanish", "French", "German"]
+LINES_OF_BUSINESS = ["CoPilot Welcome", "Proactive Grace", "Business Advisor Reactive"]
+PRODUCTS = ["Teams", "Outlook", "SharePoint", "Excel"]
+
+
+def ticket_record(client: int, number: int) -> dict:
+    i = client * 1_000_003 + number
+    return {
+        "case_number": f"LOAD{client:03d}-{number:07d}",
+        "line_of_business": LINES_OF_BUSINESS[i % len(LINES_OF_BUSINESS)],
+        "primary_product": PRODUCTS[i % len(PRODUCTS)],
+        "language": LANGUAGES[i % len(LANGUAGES)],
+        "urgency": "High" if i % 3 == 0 else "Low",
+        "technical_proficiency": "Expert" if i % 2 else "Weak",
+        "issue_summary": f"{PRODUCTS[i % len(PRODUCTS)]} keeps failing",
+    }
+
+
+def run_client(host, port, client, requests, batch_size, latencies, errors):
+    connection = http.client.HTTPConnection(host, port, timeout=30)
+    try:
+        for number in range(requests):
+            if batch_size > 1:
+                path = "/match/batch"
+                body = [ticket_record(client, number * batch_size + offset) for offset in range(batch_size)]
+            else:
+                path, body = "/match", ticket_record(client, number)
+            started = time.perf_counter()
+            connection.request("POST", path, json.dumps(body).encode(), {"Content-Type": "application/json"})
+            response = connection.getresponse()
+            response.read()
+            latencies.append((time.perf_counter() - started) * 1000.0)
+            if response.status != 200:
+                errors.append(response.status)
+    finally:
+        connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="running service to target; default starts one in-process")
+    parser.add_argument("--data", default=os.path.join(project_root, "data", "mock_data.xlsx"))
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="requests per client")
+    parser.add_argument("--batch-size", type=int, default=1, help="tickets per request; > 1 uses /match/batch")
+    args = parser.parse_args()
+
+    httpd = None
+    if args.url:
+        url = urlparse(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        httpd = create_server(MatchingService(args.data), port=0)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        host, port = httpd.server_address[:2]
+
+    latencies, errors = [], []
+    threads = [threading.Thread(target=run_client,
+                                args=(host, port, client, args.requests, args.batch_size, latencies, errors))
+               for client in range(args.clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - started
+
+    if httpd is not None:
+        httpd.shutdown()
+        httpd.server_close()
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    print(json.dumps({
+        "clients": args.clients,
+        "requests": len(latencies),
+        "tickets": len(latencies) * args.batch_size,
+        "errors": len(errors),
+        "seconds": round(seconds, 3),
+        "requests_per_second": round(len(latencies) / seconds, 1),
+        "tickets_per_second": round(len(latencies) * args.batch_size / seconds, 1),
+        "latency_ms": {"p50": round(p50, 3), "p95": round(p95, 3), "p99": round(p99, 3),
+                       "max": round(max(latencies), 3)}
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
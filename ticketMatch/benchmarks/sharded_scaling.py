@@ -0,0 +1,61 @@
+"""Sharded matching throughput (tickets/s) as a function of the number of worker processes.
+
+Matches the same synthetic backlog in vectorized mode and in sharded mode with an
+increasing number of workers:
+
+    python benchmarks/sharded_scaling.py --tickets 50000 --ambassadors 500 --workers 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from agents.matching_agent import MatchingAgent
+from tests.test_scoring import make_dataset, NOW
+
+
+def run(mode, args, workers=None):
+    tickets, ambassadors, shifts = make_dataset(seed=args.seed, n_tickets=args.tickets, n_ambassadors=args.ambassadors)
+    for ambassador in ambassadors:
+        ambassador.max_active_tickets = args.tickets  # Capacity never runs out, so every ticket is scored
+    agent = MatchingAgent()
+    agent.workers = workers
+    agent.shard_size = args.shard_size
+    try:
+        if mode == 'sharded':
+            # Start the pool outside the timed run
+            warmup, _, _ = make_dataset(seed=args.seed + 1, n_tickets=args.shard_size * 2, n_ambassadors=0)
+            agent.process_tickets(warmup, ambassadors, shifts, NOW, mode=mode)
+            for ticket in warmup:
+                agent.release_ticket(ticket.case_number)
+        started = time.perf_counter()
+        assigned = agent.process_tickets(tickets, ambassadors, shifts, NOW, mode=mode)
+        seconds = time.perf_counter() - started
+    finally:
+        agent.close()
+    matched = sum(1 for ambassador_id, _ in assigned.values() if ambassador_id)
+    return seconds, matched
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickets", type=int, default=50_000)
+    parser.add_argument("--ambassadors", type=int, default=500)
+    parser.add_argument("--shard-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'mode':>10}  {'workers':>7}  {'seconds':>8}  {'tickets/s':>10}  {'matched':>8}")
+    seconds, matched = run('vectorized', args)
+    print(f"{'vectorized':>10}  {'-':>7}  {seconds:>8.2f}  {args.tickets / seconds:>10.0f}  {matched:>8}")
+    for workers in args.workers:
+        seconds, matched = run('sharded', args, workers)
+        print(f"{'sharded':>10}  {workers:>7}  {seconds:>8.2f}  {args.tickets / seconds:>10.0f}  {matched:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Seeded synthetic data in the layout of the mock workbook.
+
+generate_sheets() returns DataFrames for the Tickets, Ambassador History and Shift
+Schedule sheets with the same columns and value types as data/mock_data.xlsx, so they
+can be written as a workbook, imported into a SQLite store, or parsed in memory. The
+same seed and sizes always give the same data.
+"""
+from datetime import datetime, time
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+LANGUAGES = ["English", "Spanish", "French", "German", "Portuguese", "Italian"]
+LINES_OF_BUSINESS = ["CoPilot Welcome", "Proactive Grace", "Business Advisor Reactive", "Modern Work", "Security"]
+PRODUCTS = ["Teams", "Outlook", "SharePoint", "Excel", "OneDrive", "Word"]
+FEATURES = ["Email Sync", "Chat", "Calendar", "Sharing", "Permissions", "Sign-in"]
+PROFICIENCY = ["Weak", "Moderate", "Strong", "Expert", "Advanced"]
+URGENCY = ["Low", "Medium", "High"]
+WORKING_DAYS = ["Mon to Fri", "Mon to Sun", "Sat, Sun", "Wed to Sun"]
+DESCRIPTIONS = ["User unable to log in", "Wants clarity on monthly invoice", "Sync stops after update",
+                "Meeting recordings are missing", "Cannot share files externally", "App crashes on start"]
+SHIFT_STARTS = [time(6, 0), time(8, 0), time(9, 0), time(10, 0), time(14, 0), time(22, 0)]
+CREATED_AT = datetime(2025, 5, 23)
+# A Wednesday morning, inside most generated shifts
+NOW = datetime(2025, 6, 4, 10, 0)
+
+
+def generate_sheets(n_tickets: int, n_ambassadors: int, seed: int = 7, assigned_fraction: float = 0.5,
+                    cases_per_ambassador: int = 10) -> Dict[str, pd.DataFrame]:
+    """Sheets keyed by name. The first assigned_fraction of the tickets are closed cases
+    that make up the ambassadors' case histories; the rest are the unassigned backlog."""
+    rng = np.random.default_rng(seed)
+    ambassador_ids = np.array([f"AMB{i:05d}" for i in range(n_ambassadors)], dtype=object)
+    names = np.array([f"Ambassador {i}" for i in range(n_ambassadors)], dtype=object)
+    pick = lambda values, size: np.array(values, dtype=object)[rng.integers(0, len(values), size)]
+
+    products = pick(PRODUCTS, n_tickets)
+    n_assigned = int(n_tickets * assigned_fraction)
+    assigned = np.arange(n_tickets) < n_assigned
+    owners = rng.integers(0, n_ambassadors, n_tickets)
+    case_numbers = [f"TCKT{i:07d}" for i in range(n_tickets)]
+    tickets = pd.DataFrame({
+        'Case Number': case_numbers,
+        'Line of Business': pick(LINES_OF_BUSINESS, n_tickets),
+        'Primary Product': products,
+        'Primary Feature': pick(FEATURES, n_tickets),
+        'Spesific Primary Driver': [f"Driver for {product}" for product in products],
+        'Secondary Product': np.where(rng.random(n_tickets) < 0.1, pick(PRODUCTS, n_tickets), None),
+        'Spesific Secondary Feature': None,
+        'Issue Summary': [f"{product} issue related to driver for {product.lower()}" for product in products],
+        'Technical Proficeny': pick(PROFICIENCY, n_tickets),
+        'Detailed Description': pick(DESCRIPTIONS, n_tickets),
+        'Urgency': pick(URGENCY, n_tickets),
+        'Language': pick(LANGUAGES, n_tickets),
+        'assigned': assigned,
+        'created at': CREATED_AT,
+        'ambassador': np.where(assigned, names[owners], None),
+    })
+
+    # Each ambassador's history is a sample of the closed cases they own
+    case_history = [[] for _ in range(n_ambassadors)]
+    for position, owner in zip(range(n_assigned), owners.tolist()):
+        history = case_history[owner]
+        if len(history) < cases_per_ambassador:
+            history.append(case_numbers[position])
+    language_counts = rng.integers(1, 3, n_ambassadors)
+    ambassadors = pd.DataFrame({
+        'Ambassador ID': ambassador_ids,
+        'Name': names,
+        'Case Number': [', '.join(history) if history else None for history in case_history],
+        'Line of Business': pick(LINES_OF_BUSINESS, n_ambassadors),
+        'Primary Product': pick(PRODUCTS, n_ambassadors),
+        'Secondary Product': np.nan,
+        'Conversation History': "[]",
+        'Language(s)': [', '.join(rng.choice(LANGUAGES, count, replace=False)) for count in language_counts],
+        'CSAT': np.round(rng.uniform(3.0, 5.0, n_ambassadors), 2),
+    })
+
+    # One shift per ambassador, plus a second line of business for a third of them
+    second = np.flatnonzero(rng.random(n_ambassadors) < 1 / 3)
+    shift_owners = np.concatenate([np.arange(n_ambassadors), second])
+    starts = pick(SHIFT_STARTS, len(shift_owners))
+    shifts = pd.DataFrame({
+        'Ambassador ID': ambassador_ids[shift_owners],
+        'Name': names[shift_owners],
+        'Line of Business': pick(LINES_OF_BUSINESS, len(shift_owners)),
+        'Working Days': pick(WORKING_DAYS, len(shift_owners)),
+        'Shift Start': starts,
+        'Shift End': [time((start.hour + 8) % 24, 0) for start in starts],
+    })
+    return {'Tickets': tickets, 'Ambassador History': ambassadors, 'Shift Schedule': shifts}
@@ -0,0 +1,154 @@
+import re
+from bisect import bisect_right
+from datetime import date, datetime, time, timedelta
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple
+
+import numpy as np
+
+from .data_models import Shift
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+DAY_NAMES = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+ALL_DAYS = frozenset(range(7))
+DAY_ALIASES = {
+    'daily': ALL_DAYS,
+    'everyday': ALL_DAYS,
+    'every day': ALL_DAYS,
+    'all week': ALL_DAYS,
+    'weekdays': frozenset(range(5)),
+    'weekends': frozenset({5, 6}),
+    'weekend': frozenset({5, 6}),
+}
+
+def parse_working_days(working_days: str) -> FrozenSet[int]:
+    """Parse a working days string such as 'Mon to Fri', 'Mon-Wed, Sat' or 'Fri to Mon'.
+    Returns weekday numbers (Monday=0). Unrecognised values count as every day."""
+    text = str(working_days).strip().lower()
+    if text in DAY_ALIASES:
+        return DAY_ALIASES[text]
+
+    days: Set[int] = set()
+    for part in re.split(r'[,/;&]|\band\b', text):
+        bounds = [b.strip() for b in re.split(r'\bto\b|-|–', part) if b.strip()]
+        if not bounds:
+            continue
+        try:
+            numbers = [DAY_NAMES.index(b[:3]) for b in bounds]
+        except ValueError:
+            return ALL_DAYS
+        if len(numbers) == 1:
+            days.add(numbers[0])
+        else:
+            # Ranges may wrap around the week, e.g. 'Fri to Mon'
+            first, last = numbers[0], numbers[-1]
+            days.update((first + offset) % 7 for offset in range((last - first) % 7 + 1))
+    return frozenset(days) if days else ALL_DAYS
+
+def minute_of_week(moment: datetime) -> int:
+    """Minutes elapsed since Monday 00:00 of the week containing moment."""
+    return moment.weekday() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+def _minute_of_day(value: time) -> int:
+    return value.hour * 60 + value.minute
+
+class WeeklyAvailabilityIndex:
+    """Sorted-boundary index of shifts over the minutes of a week.
+
+    Every shift is expanded into [start, end) minute-of-week intervals for each of its
+    working days; shifts ending at or before their start time run past midnight into
+    the next day. The week is cut at every interval boundary, and each resulting
+    segment stores who is on shift, so a lookup is one binary search."""
+
+    def __init__(self, shifts: List[Shift]):
+        self.shifts = shifts
+        intervals = []
+        for position, shift in enumerate(shifts):
+            if not shift.is_active:
+                continue
+            intervals.extend((start, end, position) for start, end in self._shift_intervals(shift))
+
+        boundaries = {0, MINUTES_PER_WEEK}
+        for start, end, _ in intervals:
+            boundaries.add(start)
+            boundaries.add(end)
+        self.boundaries: List[int] = sorted(boundaries)
+        self._boundaries_array = np.array(self.boundaries, dtype=np.int64)
+
+        # Sweep the boundaries once, keeping a count of the currently open intervals
+        starts: Dict[int, List[int]] = {}
+        ends: Dict[int, List[int]] = {}
+        for start, end, position in intervals:
+            starts.setdefault(start, []).append(position)
+            ends.setdefault(end, []).append(position)
+
+        open_counts: Dict[int, int] = {}
+        self._segment_shifts: List[Tuple[int, ...]] = []
+        self._segment_ids: List[FrozenSet[str]] = []
+        for boundary in self.boundaries[:-1]:
+            for position in ends.get(boundary, []):
+                open_counts[position] -= 1
+                if not open_counts[position]:
+                    del open_counts[position]
+            for position in starts.get(boundary, []):
+                open_counts[position] = open_counts.get(position, 0) + 1
+            positions = tuple(sorted(open_counts))
+            self._segment_shifts.append(positions)
+            self._segment_ids.append(frozenset(shifts[p].ambassador_id for p in positions))
+
+    def _shift_intervals(self, shift: Shift) -> List[Tuple[int, int]]:
+        """Expand a shift into minute-of-week intervals, splitting at the end of the week."""
+        start_minute = _minute_of_day(shift.shift_start)
+        end_minute = _minute_of_day(shift.shift_end)
+        length = (end_minute - start_minute) % MINUTES_PER_DAY or MINUTES_PER_DAY
+
+        intervals = []
+        for day in parse_working_days(shift.working_days):
+            start = day * MINUTES_PER_DAY + start_minute
+            end = start + length
+            if end <= MINUTES_PER_WEEK:
+                intervals.append((start, end))
+            else:
+                intervals.append((start, MINUTES_PER_WEEK))
+                intervals.append((0, end - MINUTES_PER_WEEK))
+        return intervals
+
+    def _segment(self, moment: datetime) -> int:
+        return bisect_right(self.boundaries, minute_of_week(moment)) - 1
+
+    def on_shift(self, moment: datetime) -> FrozenSet[str]:
+        """Return the IDs of ambassadors on shift at the given time."""
+        return self._segment_ids[self._segment(moment)]
+
+    def shifts_at(self, moment: datetime) -> List[Shift]:
+        """Return the shifts covering the given time."""
+        return [self.shifts[p] for p in self._segment_shifts[self._segment(moment)]]
+
+    def on_shift_many(self, moments: Iterable[datetime]) -> List[FrozenSet[str]]:
+        """Bulk version of on_shift, resolving all timestamps with one vectorised search."""
+        minutes = np.fromiter((minute_of_week(m) for m in moments), dtype=np.int64)
+        segments = np.searchsorted(self._boundaries_array, minutes, side='right') - 1
+        return [self._segment_ids[s] for s in segments.tolist()]
+
+    def day_schedule(self, day: date) -> List[Tuple[datetime, datetime, FrozenSet[str]]]:
+        """Precompute availability for a whole day as (start, end, ambassador IDs) intervals."""
+        day_start = day.weekday() * MINUTES_PER_DAY
+        day_end = day_start + MINUTES_PER_DAY
+        midnight = datetime.combine(day, time(0, 0))
+
+        schedule = []
+        first = bisect_right(self.boundaries, day_start) - 1
+        for segment in range(first, len(self.boundaries) - 1):
+            start = max(self.boundaries[segment], day_start)
+            end = min(self.boundaries[segment + 1], day_end)
+            if start >= day_end:
+                break
+            on_shift = self._segment_ids[segment]
+            if schedule and schedule[-1][2] == on_shift:
+                # Merge neighbouring segments with the same people on shift
+                schedule[-1] = (schedule[-1][0], midnight + timedelta(minutes=end - day_start), on_shift)
+            else:
+                schedule.append((midnight + timedelta(minutes=start - day_start),
+                                 midnight + timedelta(minutes=end - day_start), on_shift))
+        return schedule
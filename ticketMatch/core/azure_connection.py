@@ -1,34 +1,121 @@
 # Código base para azure_connection.py con el contenido que el usuario proporcionó
 
+import asyncio
+import hashlib
 import os
 import logging
-from openai import AzureOpenAI
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from openai import AzureOpenAI, AsyncAzureOpenAI, APIConnectionError, APIStatusError
 from dotenv import load_dotenv
+from .rate_limiter import RateLimiter, backoff_delay, estimate_tokens
+from .metrics import metrics
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+API_VERSION = "2024-10-21"
+
+# Sync clients (and with them their HTTP connection pools) shared by every connection
+# to the same endpoint and key, so agents reuse keep-alive connections
+_shared_clients: Dict[tuple, AzureOpenAI] = {}
+# Rate limiters shared by every connection to the same deployment, so agents with their
+# own connections draw on one request and token budget instead of each spending the quota
+_shared_limiters: Dict[tuple, Tuple[RateLimiter, tuple]] = {}  # key -> (limiter, its limits)
+_shared_clients_lock = threading.Lock()
+
+def _credentials_key(endpoint: Optional[str], api_key: Optional[str]) -> tuple:
+    return endpoint, hashlib.sha256((api_key or '').encode()).hexdigest()
+
+def _shared_limiter(key: tuple, requests_per_minute: Optional[float],
+                    tokens_per_minute: Optional[float]) -> RateLimiter:
+    """The limiter of a deployment; the limits of the first connection to it apply, and
+    a later connection asking for different ones is warned that they are ignored."""
+    limits = (requests_per_minute, tokens_per_minute)
+    with _shared_clients_lock:
+        entry = _shared_limiters.get(key)
+        if entry is None:
+            entry = _shared_limiters[key] = (RateLimiter(requests_per_minute, tokens_per_minute), limits)
+    limiter, shared_limits = entry
+    if limits != shared_limits:
+        logger.warning(f"Deployment {key[-1]} is already rate limited to {shared_limits[0]} requests and "
+                       f"{shared_limits[1]} tokens per minute; ignoring the requested {limits[0]} and {limits[1]}")
+    return limiter
+
+def _env_float(name: str) -> Optional[float]:
+    value = os.environ.get(name)
+    return float(value) if value else None
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return isinstance(error, APIConnectionError)
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, 'response', None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
 class AzureConnection:
-    def __init__(self):
+    """Azure OpenAI connection with lazily created clients, client-side rate limiting
+    and retries with jittered exponential backoff on 429, 5xx and connection errors.
+
+    Nothing touches the network until the first request; initialize() only validates
+    the credentials unless health_check is set. Limits default to the AZURE_OPENAI_RPM
+    and AZURE_OPENAI_TPM environment variables and apply per deployment: connections
+    to the same endpoint, key and deployment share one budget."""
+
+    def __init__(self, requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None,
+                 max_retries: int = 5, backoff_base: float = 0.5, backoff_cap: float = 30.0,
+                 health_check: bool = False):
         load_dotenv()
         self.endpoint = os.environ.get("AZURE_OPENAI_ENDPOINT")
         self.api_key = os.environ.get("AZURE_OPENAI_KEY")
         self.deployment = os.environ.get("AZURE_OPENAI_DEPLOYMENT", "gpt-4o-mini")
-        self.client = None
+        self._client: Optional[AzureOpenAI] = None
+        self.async_client: Optional[AsyncAzureOpenAI] = None
+        self.rate_limiter = _shared_limiter(_credentials_key(self.endpoint, self.api_key) + (self.deployment,),
+                                            requests_per_minute or _env_float("AZURE_OPENAI_RPM"),
+                                            tokens_per_minute or _env_float("AZURE_OPENAI_TPM"))
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.health_check = health_check
+        self.retries = 0
         logger.info(f"Deployment set to: {self.deployment}")
 
-    def initialize(self) -> bool:
-        try:
-            if not self.endpoint or not self.api_key:
-                raise ValueError("Azure OpenAI credentials not found in environment variables")
+    def _check_credentials(self):
+        if not self.endpoint or not self.api_key:
+            raise ValueError("Azure OpenAI credentials not found in environment variables")
 
-            self.client = AzureOpenAI(
-                api_key=self.api_key,
-                api_version="2024-10-21",
-                azure_endpoint=self.endpoint
-            )
+    @property
+    def client(self) -> AzureOpenAI:
+        """The sync client, created on first use and shared with other connections to the same endpoint."""
+        if self._client is None:
+            self._check_credentials()
+            key = _credentials_key(self.endpoint, self.api_key) + (API_VERSION,)
+            with _shared_clients_lock:
+                if key not in _shared_clients:
+                    # Retries are handled here, with rate limiting and jitter
+                    _shared_clients[key] = AzureOpenAI(
+                        api_key=self.api_key,
+                        api_version=API_VERSION,
+                        azure_endpoint=self.endpoint,
+                        max_retries=0
+                    )
+                self._client = _shared_clients[key]
+        return self._client
 
-            self.test_connection()
+    def initialize(self) -> bool:
+        try:
+            self._check_credentials()
+            if self.health_check:
+                return self.test_connection()
             return True
 
         except Exception as e:
@@ -36,19 +123,9 @@ class AzureConnection:
             return False
 
     def test_connection(self) -> bool:
+        """Cheap health check: list the available models instead of running a completion."""
         try:
-            if not self.client:
-                raise ValueError("Azure OpenAI client not initialized")
-
-            response = self.client.chat.completions.create(
-                model=self.deployment,
-                messages=[
-                    {"role": "system", "content": "You are a test assistant."},
-                    {"role": "user", "content": "Say 'hello'"}
-                ],
-                max_tokens=10
-            )
-
+            self.client.models.list()
             logger.info("Successfully connected to Azure OpenAI!")
             return True
 
@@ -57,7 +134,70 @@ class AzureConnection:
             return False
 
     def get_client(self) -> AzureOpenAI:
-        if not self.client:
-            raise ValueError("Azure OpenAI client not initialized")
         return self.client
 
+    def get_async_client(self) -> AsyncAzureOpenAI:
+        """Async client for concurrent requests, created on first use with the same credentials.
+        Async connection pools are bound to an event loop, so this one is not shared."""
+        if not self.async_client:
+            self._check_credentials()
+            self.async_client = AsyncAzureOpenAI(
+                api_key=self.api_key,
+                api_version=API_VERSION,
+                azure_endpoint=self.endpoint,
+                max_retries=0
+            )
+        return self.async_client
+
+    async def aclose(self):
+        """Close the async client; the next async request creates a new one."""
+        if self.async_client is not None:
+            await self.async_client.close()
+            self.async_client = None
+
+    def _request_tokens(self, messages: List[Dict], max_tokens: Optional[int]) -> int:
+        return sum(estimate_tokens(message['content']) for message in messages) + (max_tokens or 0)
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        self.retries += 1
+        metrics.inc('llm_retries_total')
+        delay = backoff_delay(attempt, self.backoff_base, self.backoff_cap, _retry_after(error))
+        logger.warning(f"Azure OpenAI request failed ({error}), retrying in {delay:.2f}s")
+        return delay
+
+    def chat_completion(self, messages: List[Dict], max_tokens: Optional[int] = None, **kwargs):
+        """Rate-limited chat completion against the configured deployment, with retries."""
+        tokens = self._request_tokens(messages, max_tokens)
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire(tokens)
+            started = time.perf_counter()
+            try:
+                response = self.client.chat.completions.create(
+                    model=self.deployment, messages=messages, max_tokens=max_tokens, **kwargs)
+            except Exception as e:
+                metrics.observe('llm_call_seconds', time.perf_counter() - started, outcome='error')
+                if attempt == self.max_retries or not _is_retryable(e):
+                    raise
+                time.sleep(self._backoff(attempt, e))
+            else:
+                metrics.observe('llm_call_seconds', time.perf_counter() - started, outcome='ok')
+                return response
+
+    async def chat_completion_async(self, messages: List[Dict], max_tokens: Optional[int] = None, **kwargs):
+        """Async counterpart of chat_completion."""
+        client = self.get_async_client()
+        tokens = self._request_tokens(messages, max_tokens)
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire_async(tokens)
+            started = time.perf_counter()
+            try:
+                response = await client.chat.completions.create(
+                    model=self.deployment, messages=messages, max_tokens=max_tokens, **kwargs)
+            except Exception as e:
+                metrics.observe('llm_call_seconds', time.perf_counter() - started, outcome='error')
+                if attempt == self.max_retries or not _is_retryable(e):
+                    raise
+                await asyncio.sleep(self._backoff(attempt, e))
+            else:
+                metrics.observe('llm_call_seconds', time.perf_counter() - started, outcome='ok')
+                return response
@@ -1,32 +1,160 @@
 import pandas as pd
 from datetime import datetime, time
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 from .data_models import Ticket, Ambassador, Shift
+from .shift_index import ShiftIndex
+from .snapshot_cache import SnapshotCache
+from .vocabulary import CategoricalEncoder
+from .expertise_index import ExpertiseIndex
+from .sqlite_store import SQLiteStore, is_sqlite_path
+from .metrics import metrics
+
+SHEET_NAMES = ['Tickets', 'Ambassador History', 'Shift Schedule']
 
 class DataLoader:
-    def __init__(self, excel_path: str):
+    """Loads tickets, ambassadors and shifts from an xlsx workbook or, for a .sqlite/.db
+    path, from a SQLiteStore. With unassigned_only, only unassigned tickets are returned
+    (read through the store's index); case histories are still joined against all tickets.
+    `assigned` maps case numbers to the ambassadors they were assigned to outside the data
+    source, e.g. ResultsWriter.assigned() of the results log: those tickets load as assigned,
+    so they are not matched again."""
+
+    def __init__(self, excel_path: str, columnar: bool = True, use_snapshot: bool = True,
+                 snapshot_dir: Optional[str] = None, unassigned_only: bool = False,
+                 assigned: Optional[Dict[str, str]] = None):
         self.excel_path = excel_path
+        self.columnar = columnar  # Single-pass, column-at-a-time parsing
+        self.unassigned_only = unassigned_only
+        self.assigned = assigned or {}
+        self.store = SQLiteStore(excel_path) if is_sqlite_path(excel_path) else None
+        # The store is read with indexed queries, so it needs no snapshot
+        self.snapshot = SnapshotCache(excel_path, snapshot_dir) if use_snapshot and self.store is None else None
+        self.snapshot_hit = False
+        self.shift_index: Optional[ShiftIndex] = None
+        self.encoder: Optional[CategoricalEncoder] = None  # Category vocabularies of the loaded data
+        self.expertise_index: Optional[ExpertiseIndex] = None  # Case history joined against the tickets
         self.tickets_df = None
         self.ambassadors_df = None
         self.shifts_df = None
 
-    def load_data(self) -> Tuple[List[Ticket], List[Ambassador], List[Shift]]:
-        """Load and parse data from Excel file."""
+    @metrics.timed()
+    def load_data(self, refresh: bool = False) -> Tuple[List[Ticket], List[Ambassador], List[Shift]]:
+        """Load and parse data from Excel file.
+
+        When snapshots are enabled, a valid snapshot of the parsed data is returned
+        without opening the workbook (the DataFrames are then left unset).
+        Pass refresh=True to ignore the snapshot and rebuild it from the workbook."""
+        self.snapshot_hit = False
+        if self.store is not None:
+            return self._unassigned(self._load_store())
+        if self.snapshot is None:
+            return self._unassigned(self._load_workbook())
+
+        if not refresh:
+            snapshot = self.snapshot.load()
+            if snapshot is not None:
+                self.snapshot_hit = True
+                data, self.encoder = snapshot
+                self.shift_index = ShiftIndex(data[2])
+                self.expertise_index = ExpertiseIndex.build(data[1], data[0])
+                return self._unassigned(data)
+
+        fingerprint = self.snapshot.fingerprint()
+        data = self._load_workbook()
+        self.snapshot.save((data, self.encoder), fingerprint)
+        return self._unassigned(data)
+
+    def _unassigned(self, data: Tuple[List[Ticket], List[Ambassador], List[Shift]]) -> Tuple[List[Ticket], List[Ambassador], List[Shift]]:
+        tickets, ambassadors, shifts = data
+        if self.assigned:
+            self._apply_assigned(tickets)
+        if self.unassigned_only:
+            tickets = [ticket for ticket in tickets if not ticket.assigned]
+        return tickets, ambassadors, shifts
+
+    def _apply_assigned(self, tickets: List[Ticket]):
+        """Mark the tickets of `assigned` as assigned. The log has no close events, so its
+        entries do not count towards workload, which starts from the source as before."""
+        for ticket in tickets:
+            ambassador_id = self.assigned.get(ticket.case_number)
+            if ambassador_id and not ticket.assigned:
+                ticket.assigned = True
+                ticket.assigned_ambassador_id = ambassador_id
+
+    def _load_store(self) -> Tuple[List[Ticket], List[Ambassador], List[Shift]]:
+        """Read the SQLite store; its tables come back in the workbook's sheet layout."""
+        sheets = self.store.sheets(self.unassigned_only)
+        self.tickets_df = sheets['Tickets']
+        self.ambassadors_df = sheets['Ambassador History']
+        self.shifts_df = sheets['Shift Schedule']
+
+        tickets = self._parse_tickets_columnar()
+        shifts = self._parse_shifts_columnar()
+        self.shift_index = ShiftIndex(shifts)
+        ambassadors = self._parse_ambassadors_columnar()
+        history = self._parse_tickets_columnar(self.store.history_tickets()) if self.unassigned_only else None
+        self._encode(tickets, ambassadors, shifts, history)
+        return tickets, ambassadors, shifts
+
+    def invalidate_snapshot(self):
+        """Discard the on-disk snapshot of this workbook."""
+        if self.snapshot is not None:
+            self.snapshot.invalidate()
+
+    def _load_workbook(self) -> Tuple[List[Ticket], List[Ambassador], List[Shift]]:
+        """Parse the workbook itself, bypassing any snapshot."""
         try:
+            if self.columnar:
+                tickets, ambassadors, shifts = self._load_columnar()
+                self._encode(tickets, ambassadors, shifts)
+                return tickets, ambassadors, shifts
+
             # Read Excel sheets
             self.tickets_df = pd.read_excel(self.excel_path, sheet_name='Tickets')
             self.ambassadors_df = pd.read_excel(self.excel_path, sheet_name='Ambassador History')
             self.shifts_df = pd.read_excel(self.excel_path, sheet_name='Shift Schedule')
 
-            # Convert to data models
+            # Convert to data models (shifts first, ambassadors are joined against the shift index)
             tickets = self._parse_tickets()
-            ambassadors = self._parse_ambassadors()
             shifts = self._parse_shifts()
+            self.shift_index = ShiftIndex(shifts)
+            ambassadors = self._parse_ambassadors()
+            self._encode(tickets, ambassadors, shifts)
 
             return tickets, ambassadors, shifts
         except Exception as e:
             raise Exception(f"Error loading data from Excel: {str(e)}")
 
+    def _encode(self, tickets: List[Ticket], ambassadors: List[Ambassador], shifts: List[Shift],
+                history: Optional[List[Ticket]] = None):
+        """Normalize and intern languages, lines of business and products to integer codes,
+        then join the case histories against the (normalized) tickets, or against the
+        history tickets when only unassigned tickets were loaded."""
+        self.encoder = CategoricalEncoder()
+        self.encoder.encode(tickets, ambassadors, shifts)
+        for ticket in history or []:
+            self.encoder.encode_ticket(ticket)
+        self.expertise_index = ExpertiseIndex.build(ambassadors, tickets if history is None else history)
+
+    def _case_history(self, case_numbers) -> List[str]:
+        """Split the comma-separated case numbers of an ambassador."""
+        return [case.strip() for case in str(case_numbers).split(',') if case.strip()]
+
+    def _load_columnar(self) -> Tuple[List[Ticket], List[Ambassador], List[Shift]]:
+        """Read all sheets in one pass over the workbook and parse them by column."""
+        # A single read_excel call opens and unzips the workbook only once
+        sheets = pd.read_excel(self.excel_path, sheet_name=SHEET_NAMES)
+        self.tickets_df = sheets['Tickets']
+        self.ambassadors_df = sheets['Ambassador History']
+        self.shifts_df = sheets['Shift Schedule']
+
+        tickets = self._parse_tickets_columnar()
+        shifts = self._parse_shifts_columnar()
+        self.shift_index = ShiftIndex(shifts)
+        ambassadors = self._parse_ambassadors_columnar()
+
+        return tickets, ambassadors, shifts
+
     def _parse_time(self, time_str: str) -> time:
         """Parse time string to time object."""
         try:
@@ -64,17 +192,17 @@ class DataLoader:
     def _parse_ambassadors(self) -> List[Ambassador]:
         ambassadors = []
         for _, row in self.ambassadors_df.iterrows():
-            # Get unique line of business and case numbers for this ambassador
-            ambassador_shifts = self.shifts_df[self.shifts_df['Ambassador ID'] == row['Ambassador ID']]
-            lines_of_business = ambassador_shifts['Line of Business'].unique().tolist()
+            # Get unique line of business for this ambassador from the shift index
+            ambassador_id = str(row['Ambassador ID'])
+            lines_of_business = self.shift_index.lines_of_business(ambassador_id)
             
             ambassador = Ambassador(
-                id=str(row['Ambassador ID']),
+                id=ambassador_id,
                 name=str(row['Name']),
                 line_of_business=lines_of_business,
-                languages=str(row['Language(s)']).split(','),
+                languages=[language.strip() for language in str(row['Language(s)']).split(',')],
                 csat_score=float(row['CSAT']),
-                case_history=str(row['Case Number']).split(',') if pd.notna(row['Case Number']) else []
+                case_history=self._case_history(row['Case Number']) if pd.notna(row['Case Number']) else []
             )
             ambassadors.append(ambassador)
         return ambassadors
@@ -95,4 +223,69 @@ class DataLoader:
                 shift_end=shift_end
             )
             shifts.append(shift)
-        return shifts 
\ No newline at end of file
+        return shifts
+
+    def _str_column(self, df: pd.DataFrame, column: str) -> List[str]:
+        """Return a whole column converted to strings."""
+        return [str(value) for value in df[column].tolist()]
+
+    def _optional_str_column(self, df: pd.DataFrame, column: str) -> List[Optional[str]]:
+        """Return a whole column converted to strings, with missing values as None."""
+        present = df[column].notna().tolist()
+        return [str(value) if ok else None for value, ok in zip(df[column].tolist(), present)]
+
+    def _parse_tickets_columnar(self, df: Optional[pd.DataFrame] = None) -> List[Ticket]:
+        df = self.tickets_df if df is None else df
+        assigned_present = df['assigned'].notna().tolist()
+        assigned = [bool(value) if ok else False for value, ok in zip(df['assigned'].tolist(), assigned_present)]
+
+        columns = zip(
+            self._str_column(df, 'Case Number'),
+            self._str_column(df, 'Line of Business'),
+            self._str_column(df, 'Primary Product'),
+            self._str_column(df, 'Primary Feature'),
+            self._str_column(df, 'Spesific Primary Driver'),
+            self._optional_str_column(df, 'Secondary Product'),
+            self._optional_str_column(df, 'Spesific Secondary Feature'),
+            self._str_column(df, 'Issue Summary'),
+            self._str_column(df, 'Technical Proficeny'),
+            self._str_column(df, 'Detailed Description'),
+            self._str_column(df, 'Urgency'),
+            self._str_column(df, 'Language'),
+            assigned
+        )
+        return [Ticket(*values) for values in columns]
+
+    def _parse_ambassadors_columnar(self) -> List[Ambassador]:
+        df = self.ambassadors_df
+        case_present = df['Case Number'].notna().tolist()
+        ambassadors = []
+        for ambassador_id, name, languages, csat, case_numbers, has_cases in zip(
+            self._str_column(df, 'Ambassador ID'),
+            self._str_column(df, 'Name'),
+            self._str_column(df, 'Language(s)'),
+            df['CSAT'].tolist(),
+            df['Case Number'].tolist(),
+            case_present
+        ):
+            ambassadors.append(Ambassador(
+                id=ambassador_id,
+                name=name,
+                line_of_business=self.shift_index.lines_of_business(ambassador_id),
+                languages=[language.strip() for language in languages.split(',')],
+                csat_score=float(csat),
+                case_history=self._case_history(case_numbers) if has_cases else []
+            ))
+        return ambassadors
+
+    def _parse_shifts_columnar(self) -> List[Shift]:
+        df = self.shifts_df
+        columns = zip(
+            self._str_column(df, 'Ambassador ID'),
+            self._str_column(df, 'Name'),
+            self._str_column(df, 'Line of Business'),
+            self._str_column(df, 'Working Days'),
+            [self._parse_time(value) for value in df['Shift Start'].tolist()],
+            [self._parse_time(value) for value in df['Shift End'].tolist()]
+        )
+        return [Shift(*values) for values in columns]
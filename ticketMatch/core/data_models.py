@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from typing import List, Optional
 from datetime import datetime, time
 
-@dataclass
+@dataclass(slots=True)
 class Ticket:
     case_number: str
     line_of_business: str
@@ -19,8 +19,12 @@ class Ticket:
     assigned: bool = False
     assignment_datetime: Optional[datetime] = None
     assigned_ambassador_id: Optional[str] = None
+    # Interned category codes, set by CategoricalEncoder at load time
+    language_code: Optional[int] = None
+    lob_code: Optional[int] = None
+    product_code: Optional[int] = None
 
-@dataclass
+@dataclass(slots=True)
 class Ambassador:
     id: str
     name: str
@@ -30,8 +34,11 @@ class Ambassador:
     case_history: List[str] = None
     current_tickets: int = 0
     max_active_tickets: int = 3  # Default value
+    # Bitsets over language / line of business codes, set by CategoricalEncoder at load time
+    language_mask: Optional[int] = None
+    lob_mask: Optional[int] = None
 
-@dataclass
+@dataclass(slots=True)
 class Shift:
     ambassador_id: str
     name: str
@@ -39,4 +46,5 @@ class Shift:
     working_days: str
     shift_start: time
     shift_end: time
-    is_active: bool = True 
\ No newline at end of file
+    is_active: bool = True
+    lob_code: Optional[int] = None  # Interned line of business code, set by CategoricalEncoder 
\ No newline at end of file
@@ -0,0 +1,85 @@
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+from .data_models import Ticket, Ambassador
+
+EXPERTISE_CAP = 10  # Past cases with a product that count as full expertise
+
+def _key(value: Optional[str]) -> Optional[str]:
+    """Lookup key: whitespace-collapsed and case-folded, like Vocabulary."""
+    if value is None:
+        return None
+    return ' '.join(str(value).split()).casefold()
+
+class ExpertiseIndex:
+    """Per-ambassador counts of past cases by product, feature and driver.
+
+    Built by joining each ambassador's case history against the tickets, so expertise
+    lookups are dictionary reads instead of scans of the history. Case numbers that do
+    not appear among the tickets are counted in `unmatched` and otherwise ignored."""
+
+    def __init__(self, tickets: Iterable[Ticket] = ()):
+        self._tickets: Dict[str, Tuple[str, str, str]] = {}
+        self.products: Dict[str, Counter] = {}
+        self.features: Dict[str, Counter] = {}
+        self.drivers: Dict[str, Counter] = {}
+        self._names: Dict[str, str] = {}  # product key -> spelling as found in the tickets
+        self.unmatched = 0
+        self.add_tickets(tickets)
+
+    @classmethod
+    def build(cls, ambassadors: Iterable[Ambassador], tickets: Iterable[Ticket]) -> 'ExpertiseIndex':
+        index = cls(tickets)
+        for ambassador in ambassadors:
+            index.set_history(ambassador.id, ambassador.case_history or [])
+        return index
+
+    def add_tickets(self, tickets: Iterable[Ticket]):
+        """Make tickets available for joining (e.g. newly closed cases)."""
+        for ticket in tickets:
+            self._tickets[ticket.case_number] = (
+                ticket.primary_product, ticket.primary_feature, ticket.specific_primary_driver)
+
+    def set_history(self, ambassador_id: str, case_numbers: Iterable[str]):
+        """(Re)build the counts of one ambassador from their case history."""
+        self.products[ambassador_id] = Counter()
+        self.features[ambassador_id] = Counter()
+        self.drivers[ambassador_id] = Counter()
+        for case_number in case_numbers:
+            self.add_case(ambassador_id, case_number)
+
+    def add_case(self, ambassador_id: str, case_number: str) -> bool:
+        """Count one more handled case; returns False when the case number is unknown."""
+        ticket = self._tickets.get(case_number.strip())
+        if ticket is None:
+            self.unmatched += 1
+            return False
+        product, feature, driver = ticket
+        product_key = _key(product)
+        self._names.setdefault(product_key, product)
+        self.products.setdefault(ambassador_id, Counter())[product_key] += 1
+        self.features.setdefault(ambassador_id, Counter())[_key(feature)] += 1
+        self.drivers.setdefault(ambassador_id, Counter())[_key(driver)] += 1
+        return True
+
+    def product_count(self, ambassador_id: str, product: str) -> int:
+        counts = self.products.get(ambassador_id)
+        return counts[_key(product)] if counts else 0
+
+    def feature_count(self, ambassador_id: str, feature: str) -> int:
+        counts = self.features.get(ambassador_id)
+        return counts[_key(feature)] if counts else 0
+
+    def driver_count(self, ambassador_id: str, driver: str) -> int:
+        counts = self.drivers.get(ambassador_id)
+        return counts[_key(driver)] if counts else 0
+
+    def get_expertise_score(self, ambassador_id: str, product: str) -> float:
+        """Share of EXPERTISE_CAP past cases with the product (0-1)."""
+        return min(1.0, self.product_count(ambassador_id, product) / EXPERTISE_CAP)
+
+    def past_products(self, ambassador_id: str) -> List[str]:
+        """Products the ambassador has handled, most frequent first."""
+        counts = self.products.get(ambassador_id)
+        if not counts:
+            return []
+        return [self._names[key] for key, _ in counts.most_common()]
@@ -0,0 +1,174 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from .metrics import metrics
+
+DEFAULT_CACHE_PATH = os.path.join('.cache', 'ticket_analysis.sqlite')
+
+class AnalysisCache:
+    """Content-addressed cache of LLM analysis results.
+
+    Entries are keyed by a hash of the normalized prompt, the model deployment and the
+    sampling parameters. An in-memory LRU sits in front of a SQLite table; both layers
+    honour the TTL. The table's row count is kept as writes happen, and once it exceeds
+    max_disk_entries the least recently used tenth is evicted in one go, so a write does
+    not count the table. Pass path=None for a memory-only cache."""
+
+    def __init__(self, path: Optional[str] = DEFAULT_CACHE_PATH, ttl_seconds: Optional[float] = 7 * 24 * 3600,
+                 max_memory_entries: int = 1024, max_disk_entries: int = 100_000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory: 'OrderedDict[str, Tuple[Dict, float, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.latency_saved = 0.0  # Seconds of model latency avoided by hits
+        self._db = None
+        self._rows = 0  # Rows in the disk table
+        if path is not None:
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            # WAL without a sync per commit keeps the last-access update on every hit cheap
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS analysis_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    latency REAL NOT NULL,
+                    expires_at REAL,
+                    last_access REAL NOT NULL
+                )""")
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_analysis_cache_last_access ON analysis_cache (last_access)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_analysis_cache_expires_at ON analysis_cache (expires_at)")
+            self._db.commit()
+            self._rows = self._count()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Fold case, Unicode forms and whitespace so trivially different prompts share a key."""
+        return ' '.join(unicodedata.normalize('NFKC', text).casefold().split())
+
+    @classmethod
+    def make_key(cls, messages: List[Dict], deployment: str, temperature: float, max_tokens: int) -> str:
+        payload = {
+            'messages': [[message['role'], cls.normalize(message['content'])] for message in messages],
+            'deployment': deployment,
+            'temperature': temperature,
+            'max_tokens': max_tokens
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return a copy of the cached result, or None on a miss or expired entry."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, latency, expires_at = entry
+                if expires_at is None or expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    self.latency_saved += latency
+                    metrics.inc('llm_cache_lookups_total', result='memory_hit')
+                    return dict(value)
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, latency, expires_at FROM analysis_cache WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    value, latency, expires_at = json.loads(row[0]), row[1], row[2]
+                    if expires_at is None or expires_at > now:
+                        self._db.execute("UPDATE analysis_cache SET last_access = ? WHERE key = ?", (now, key))
+                        self._db.commit()
+                        self._remember(key, value, latency, expires_at)
+                        self.disk_hits += 1
+                        self.latency_saved += latency
+                        metrics.inc('llm_cache_lookups_total', result='disk_hit')
+                        return dict(value)
+                    self._rows -= self._db.execute("DELETE FROM analysis_cache WHERE key = ?", (key,)).rowcount
+                    self._db.commit()
+
+            self.misses += 1
+            metrics.inc('llm_cache_lookups_total', result='miss')
+            return None
+
+    def put(self, key: str, value: Dict, latency: float = 0.0):
+        """Store a result together with the latency it took to produce."""
+        now = time.time()
+        expires_at = now + self.ttl_seconds if self.ttl_seconds is not None else None
+        with self._lock:
+            self._remember(key, dict(value), latency, expires_at)
+            if self._db is not None:
+                row = (json.dumps(value), latency, expires_at, now, key)
+                updated = self._db.execute(
+                    "UPDATE analysis_cache SET value = ?, latency = ?, expires_at = ?, last_access = ? "
+                    "WHERE key = ?", row).rowcount
+                if not updated:
+                    self._db.execute(
+                        "INSERT INTO analysis_cache (value, latency, expires_at, last_access, key) "
+                        "VALUES (?, ?, ?, ?, ?)", row)
+                    self._rows += 1
+                self._evict_disk(now)
+                self._db.commit()
+
+    def _remember(self, key: str, value: Dict, latency: float, expires_at: Optional[float]):
+        self._memory[key] = (value, latency, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _count(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM analysis_cache").fetchone()[0]
+
+    def _evict_disk(self, now: float):
+        self._rows -= self._db.execute(
+            "DELETE FROM analysis_cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)).rowcount
+        if self._rows <= self.max_disk_entries:
+            return
+        # Other processes may share the file, so recount before evicting
+        self._rows = self._count()
+        excess = self._rows - self.max_disk_entries
+        if excess > 0:
+            excess += self.max_disk_entries // 10
+            self._rows -= self._db.execute(
+                "DELETE FROM analysis_cache WHERE key IN "
+                "(SELECT key FROM analysis_cache ORDER BY last_access LIMIT ?)", (excess,)).rowcount
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM analysis_cache")
+                self._db.commit()
+                self._rows = 0
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and the model latency saved by hits."""
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            'hits': hits,
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_ratio': hits / lookups if lookups else 0.0,
+            'latency_saved': self.latency_saved,
+            'memory_entries': len(self._memory)
+        }
@@ -1,6 +1,8 @@
 from typing import Tuple, Optional
 from datetime import datetime
 from ticketMatch.core.data_loader import DataLoader
+from ticketMatch.core.shift_index import ShiftIndex
+from ticketMatch.core.vocabulary import has_code
 from ticketMatch.core.ticket import Ticket
 from ticketMatch.core.ambassador import Ambassador
 
@@ -10,18 +12,26 @@ class MatchingAgent:
         self.ambassadors = data_loader.load_ambassadors()
         self.tickets = data_loader.load_tickets()
         self.shifts = data_loader.load_shifts()
+        # The loader already indexed the shifts it loaded
+        self.shift_index = data_loader.shift_index if data_loader.shift_index is not None else ShiftIndex(self.shifts)
 
     def calculate_match_score(self, ticket: Ticket, ambassador: Ambassador) -> Tuple[float, str]:
         score = 0.0
         reasons = []
 
-        # Language match (highest priority)
-        if ticket.language.lower() in [lang.lower() for lang in ambassador.languages]:
+        # Language match (highest priority), on interned codes when the data was encoded
+        language_match = has_code(ambassador.language_mask, ticket.language_code)
+        if language_match is None:
+            language_match = ticket.language.lower() in [lang.lower() for lang in ambassador.languages]
+        if language_match:
             score += 0.3
             reasons.append("Language match")
 
         # Line of business match
-        if ticket.line_of_business.lower() in [lob.lower() for lob in ambassador.lines_of_business]:
+        lob_match = has_code(ambassador.lob_mask, ticket.lob_code)
+        if lob_match is None:
+            lob_match = ticket.line_of_business.lower() in [lob.lower() for lob in ambassador.lines_of_business]
+        if lob_match:
             score += 0.2
             reasons.append("Line of business match")
 
@@ -53,9 +63,8 @@ class MatchingAgent:
         for ambassador in self.ambassadors:
             # Check if ambassador is available (has active shifts)
             is_available = any(
-                shift.ambassador_id == ambassador.ambassador_id and 
                 shift.start_time <= datetime.now() <= shift.end_time
-                for shift in self.shifts
+                for shift in self.shift_index.for_ambassador(ambassador.ambassador_id)
             )
 
             if not is_available:
@@ -0,0 +1,252 @@
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+
+# (metric name, sorted (label, value) pairs)
+MetricKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+# Upper bounds in seconds, from sub-millisecond scoring calls to slow model requests
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+PREFIX = 'ticketmatch'
+
+def _key(name: str, labels: Dict[str, str]) -> MetricKey:
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+class Histogram:
+    """Bucketed distribution of observed values; quantiles are bucket upper bounds."""
+    __slots__ = ('buckets', 'counts', 'count', 'sum', 'max')
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self) -> Dict:
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'mean': round(self.sum / self.count, 6) if self.count else 0.0,
+            'p50': round(self.quantile(0.5), 6),
+            'p95': round(self.quantile(0.95), 6),
+            'p99': round(self.quantile(0.99), 6),
+            'max': round(self.max, 6)
+        }
+
+class _Timer:
+    __slots__ = ('metrics', 'name', 'labels', 'started')
+
+    def __init__(self, metrics: 'Metrics', name: str, labels: Dict[str, str]):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.started, **self.labels)
+        return False
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+class Metrics:
+    """Process-wide counters, timers and latency histograms.
+
+    Disabled, every call site costs one attribute check: inc() and observe() return at
+    once, timer() hands out a shared no-op context manager and functions wrapped by
+    timed() are called straight through. Method timings go to the duration_seconds
+    histogram labelled by operation, the scripts' stages to stage_seconds. summary()
+    returns a JSON-ready dict, prometheus() a snapshot in the Prometheus text exposition
+    format. Metrics recorded in sharded-mode worker processes stay in those processes."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.counters: Dict[MetricKey, float] = {}
+        self.histograms: Dict[MetricKey, Histogram] = {}
+        self.started = time.time()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.counters = {}
+            self.histograms = {}
+            self.started = time.time()
+
+    def inc(self, name: str, value: float = 1, **labels):
+        if not self.enabled:
+            return
+        key = _key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        if not self.enabled:
+            return
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def timer(self, name: str, **labels):
+        """Context manager timing its block into the named histogram."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name, labels)
+
+    def timed(self, operation: Optional[str] = None) -> Callable:
+        """Decorator timing every call of a function; the operation defaults to its qualified name."""
+        def decorator(func: Callable) -> Callable:
+            label = operation or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe('duration_seconds', time.perf_counter() - started, operation=label)
+            return wrapper
+        return decorator
+
+    def counter(self, name: str, **labels) -> float:
+        """Value of one counter; without labels, the sum over all its label sets."""
+        if labels:
+            return self.counters.get(_key(name, labels), 0)
+        return sum(value for (counter_name, _), value in self.counters.items() if counter_name == name)
+
+    def _histogram_total(self, name: str, **labels) -> Tuple[int, float]:
+        count, total = 0, 0.0
+        for (histogram_name, histogram_labels), histogram in self.histograms.items():
+            if histogram_name == name and set(labels.items()) <= set(histogram_labels):
+                count += histogram.count
+                total += histogram.sum
+        return count, total
+
+    def derived(self) -> Dict[str, float]:
+        """Rates and ratios computed from the raw metrics."""
+        with self._lock:
+            matched = self.counter('tickets_matched_total')
+            tickets = self.counter('tickets_scored_total')
+            candidates = self.counter('candidates_scored_total')
+            _, match_seconds = self._histogram_total('duration_seconds', operation='MatchingAgent.process_tickets')
+            llm_calls, llm_seconds = self._histogram_total('llm_call_seconds')
+        return {
+            'tickets_matched_per_second': round(matched / match_seconds, 3) if match_seconds else 0.0,
+            'candidates_per_ticket': round(candidates / tickets, 3) if tickets else 0.0,
+            'llm_calls': llm_calls,
+            'llm_mean_latency_seconds': round(llm_seconds / llm_calls, 6) if llm_calls else 0.0
+        }
+
+    def summary(self) -> Dict:
+        derived = self.derived()
+        with self._lock:
+            counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                        for (name, labels), value in sorted(self.counters.items())]
+            histograms = [dict({'name': name, 'labels': dict(labels)}, **histogram.summary())
+                          for (name, labels), histogram in sorted(self.histograms.items())]
+        return {
+            'started': self.started,
+            'elapsed_seconds': round(time.time() - self.started, 3),
+            'counters': counters,
+            'histograms': histograms,
+            'derived': derived
+        }
+
+    def dump(self, path: str):
+        """Write summary() as JSON."""
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def prometheus(self, prefix: str = PREFIX) -> str:
+        """Snapshot in the Prometheus text exposition format (version 0.0.4)."""
+        derived = self.derived()
+        lines: List[str] = []
+        typed = set()
+
+        def declare(name: str, kind: str):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                metric = f"{prefix}_{name}"
+                declare(metric, 'counter')
+                lines.append(f"{metric}{_labels(labels)} {_number(value)}")
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                metric = f"{prefix}_{name}"
+                declare(metric, 'histogram')
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + (float('inf'),), histogram.counts):
+                    cumulative += count
+                    lines.append(f"{metric}_bucket{_labels(labels + (('le', _number(bound)),))} {cumulative}")
+                lines.append(f"{metric}_sum{_labels(labels)} {_number(histogram.sum)}")
+                lines.append(f"{metric}_count{_labels(labels)} {histogram.count}")
+        for name, value in derived.items():
+            metric = f"{prefix}_{name}"
+            declare(metric, 'gauge')
+            lines.append(f"{metric} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{label}="{_escape(value)}"' for label, value in labels) + "}"
+
+def _number(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+# Shared by the loader, the agents and the scripts; TICKETMATCH_METRICS=1 turns it on at import
+metrics = Metrics(enabled=os.environ.get('TICKETMATCH_METRICS', '') not in ('', '0'))
@@ -0,0 +1,73 @@
+import asyncio
+import random
+import threading
+import time
+from typing import Optional
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (about four characters per token), good enough for budgeting."""
+    return len(text) // 4 + 1
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 30.0,
+                  retry_after: Optional[float] = None, rng: random.Random = random) -> float:
+    """Exponential backoff with full jitter, never shorter than a server-supplied Retry-After."""
+    delay = rng.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+class TokenBucket:
+    """Token bucket refilled at per_minute / 60 per second, holding at most burst tokens.
+
+    acquire() reserves tokens immediately, letting the balance go negative, and returns
+    how long the caller must wait before using them. Concurrent callers therefore queue
+    up in arrival order without holding the lock while they sleep."""
+
+    def __init__(self, per_minute: float, burst: Optional[float] = None):
+        if per_minute <= 0:
+            raise ValueError("per_minute must be positive")
+        self.rate = per_minute / 60.0
+        # Azure OpenAI evaluates quotas over short windows, so only allow ~10s worth of burst
+        self.capacity = burst if burst is not None else max(1.0, per_minute / 6.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """Take amount tokens and return the delay in seconds before they are available."""
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= amount
+            return max(0.0, -self.tokens / self.rate)
+
+class RateLimiter:
+    """Client-side limit on requests and tokens per minute; either may be None (unlimited)."""
+
+    def __init__(self, requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None,
+                 request_burst: Optional[float] = None, token_burst: Optional[float] = None):
+        self.requests = TokenBucket(requests_per_minute, request_burst) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute, token_burst) if tokens_per_minute else None
+        self.waited = 0.0  # Total seconds callers were held back
+
+    def reserve(self, tokens: int = 0) -> float:
+        delay = 0.0
+        if self.requests is not None:
+            delay = self.requests.reserve(1)
+        if self.tokens is not None and tokens:
+            delay = max(delay, self.tokens.reserve(tokens))
+        self.waited += delay
+        return delay
+
+    def acquire(self, tokens: int = 0):
+        """Block until a request using the given number of tokens may be sent."""
+        delay = self.reserve(tokens)
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self, tokens: int = 0):
+        delay = self.reserve(tokens)
+        if delay:
+            await asyncio.sleep(delay)
@@ -0,0 +1,140 @@
+import json
+import os
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+import pandas as pd
+from .data_models import Ambassador
+from .metrics import metrics
+
+# ticket_id -> (ambassador_id, explanation), as kept by MatchingAgent.assigned_tickets
+Assignments = Dict[str, Tuple[Optional[str], str]]
+
+RESULT_COLUMNS = ['case_number', 'ambassador_id', 'ambassador', 'explanation', 'assigned_at']
+FORMATS = ('jsonl', 'csv', 'parquet')
+
+def ambassador_names(ambassadors: Iterable[Ambassador]) -> Dict[str, str]:
+    """ID -> name lookup, built once per save instead of a scan per assignment."""
+    return {ambassador.id: ambassador.name for ambassador in ambassadors}
+
+def apply_assignments(df: pd.DataFrame, assignments: Assignments, names: Dict[str, str]) -> int:
+    """Mark the assigned tickets of a Tickets sheet DataFrame in one vectorized join.
+
+    Tickets matched to an ambassador get assigned=True and the ambassador's name
+    (or ID when the name is unknown). Returns the number of rows updated."""
+    matched = {case_number: names.get(ambassador_id, ambassador_id)
+               for case_number, (ambassador_id, _) in assignments.items() if ambassador_id}
+    if not matched:
+        return 0
+    assigned_names = df['Case Number'].astype(str).map(matched)
+    mask = assigned_names.notna()
+    if 'ambassador' not in df.columns:
+        df['ambassador'] = None
+    df['ambassador'] = df['ambassador'].astype(object)
+    df.loc[mask, 'assigned'] = True
+    df.loc[mask, 'ambassador'] = assigned_names[mask]
+    return int(mask.sum())
+
+@metrics.timed()
+def write_workbook(excel_path: str, assignments: Assignments, names: Dict[str, str]) -> int:
+    """Apply assignments to the Tickets sheet and rewrite that sheet of the workbook."""
+    df = pd.read_excel(excel_path, sheet_name='Tickets')
+    updated = apply_assignments(df, assignments, names)
+    with pd.ExcelWriter(excel_path, engine='openpyxl', mode='a', if_sheet_exists='replace') as writer:
+        df.to_excel(writer, sheet_name='Tickets', index=False)
+    return updated
+
+class ResultsWriter:
+    """Append-only log of assignments, written as JSON lines, CSV or Parquet.
+
+    The writer starts from the records already in the log, so a rerun neither writes
+    the same assignment twice nor loses track of earlier runs: assigned() returns the
+    logged matches, to be loaded as assigned (see DataLoader). add() queues changed
+    assignments and save() writes only the queued ones, so a save costs O(new records).
+    JSONL and CSV are appended to a single file. Parquet files cannot be appended to,
+    so `path` is then a directory that gets one part file per save and can be read back
+    with pd.read_parquet(path). Parquet needs pyarrow or fastparquet."""
+
+    def __init__(self, path: str, format: Optional[str] = None):
+        self.path = path
+        self.format = format or os.path.splitext(path)[1].lstrip('.').lower()
+        if self.format not in FORMATS:
+            raise ValueError(f"Unknown results format '{self.format}', expected one of {FORMATS}")
+        self._written: Dict[str, Optional[str]] = self._read_log()  # case number -> ambassador last logged
+        self._pending: Assignments = {}  # Changed since the last save
+        self._parts = 0
+
+    def _read_log(self) -> Dict[str, Optional[str]]:
+        """Latest ambassador of every case number in the existing log."""
+        if self.format == 'jsonl':
+            if not os.path.exists(self.path):
+                return {}
+            written = {}
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        written[str(record['case_number'])] = record['ambassador_id']
+            return written
+        if self.format == 'csv':
+            if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+                return {}
+            df = pd.read_csv(self.path, usecols=['case_number', 'ambassador_id'], dtype=str)
+        else:
+            if not os.path.isdir(self.path) or not any(name.endswith('.parquet') for name in os.listdir(self.path)):
+                return {}
+            df = pd.read_parquet(self.path, columns=['case_number', 'ambassador_id'])
+        ambassador_ids = [value if isinstance(value, str) else None for value in df['ambassador_id'].tolist()]
+        return dict(zip(df['case_number'].astype(str).tolist(), ambassador_ids))
+
+    def assigned(self) -> Dict[str, str]:
+        """Case number -> ambassador ID of every match in the log."""
+        return {case_number: ambassador_id for case_number, ambassador_id in self._written.items() if ambassador_id}
+
+    def add(self, assignments: Assignments):
+        """Queue the given assignments for the next save, skipping those already logged as is."""
+        for case_number, (ambassador_id, explanation) in assignments.items():
+            if case_number in self._written and self._written[case_number] == ambassador_id:
+                self._pending.pop(case_number, None)
+            else:
+                self._pending[case_number] = (ambassador_id, explanation)
+
+    def new_records(self, names: Dict[str, str], assigned_at: Optional[datetime] = None) -> List[Dict]:
+        """Result records of the queued assignments."""
+        assigned_at = (assigned_at or datetime.now()).isoformat(timespec='seconds')
+        return [{
+            'case_number': case_number,
+            'ambassador_id': ambassador_id,
+            'ambassador': names.get(ambassador_id, ambassador_id) if ambassador_id else None,
+            'explanation': explanation,
+            'assigned_at': assigned_at
+        } for case_number, (ambassador_id, explanation) in self._pending.items()]
+
+    @metrics.timed()
+    def save(self, assignments: Optional[Assignments], names: Dict[str, str],
+             assigned_at: Optional[datetime] = None) -> int:
+        """Queue `assignments` (the new or changed ones; None when they were add()ed already)
+        and append everything queued; returns how many records were written."""
+        if assignments:
+            self.add(assignments)
+        records = self.new_records(names, assigned_at)
+        if not records:
+            return 0
+        directory = self.path if self.format == 'parquet' else os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if self.format == 'jsonl':
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.writelines(json.dumps(record) + '\n' for record in records)
+        elif self.format == 'csv':
+            header = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            pd.DataFrame(records, columns=RESULT_COLUMNS).to_csv(self.path, mode='a', header=header, index=False)
+        else:
+            self._parts += 1
+            part = f"part-{datetime.now():%Y%m%dT%H%M%S%f}-{os.getpid()}-{self._parts}.parquet"
+            pd.DataFrame(records, columns=RESULT_COLUMNS).to_parquet(os.path.join(self.path, part), index=False)
+
+        for case_number, (ambassador_id, _) in self._pending.items():
+            self._written[case_number] = ambassador_id
+        self._pending = {}
+        return len(records)
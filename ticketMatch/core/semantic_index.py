@@ -0,0 +1,193 @@
+import zlib
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .data_models import Ticket, Ambassador
+
+DEFAULT_FEATURES = 1 << 18
+TOKENIZE_CHUNK = 50_000
+TOKEN_CACHE_SIZE = 1 << 17  # Token hashes kept across calls; bounded for long-lived services
+# Tokens are runs of characters other than whitespace and punctuation. The table only
+# maps ASCII to ASCII so str.translate keeps its fast path.
+SEPARATOR = '\x00'
+TOKEN_TABLE = str.maketrans({chr(c): ' ' for c in range(128) if not chr(c).isalnum() and chr(c) != SEPARATOR})
+UNICODE_PUNCTUATION = '«»¿¡“”‘’–—…·•'
+
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def _token_hash(token: str) -> int:
+    # crc32 rather than hash(): stable across processes, so indexes can be pickled
+    return zlib.crc32(token.encode('utf-8'))
+
+def ticket_text(ticket: Ticket) -> str:
+    """The free text of a ticket that is embedded."""
+    return f"{ticket.issue_summary or ''} {ticket.detailed_description or ''}"
+
+def _normalize_rows(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms) @ matrix
+
+class SemanticIndex:
+    """Offline text similarity between tickets and ambassadors' past cases.
+
+    Tickets are embedded as hashed TF-IDF vectors (sublinear term frequency, smoothed
+    IDF, L2-normalised), so there is no vocabulary to store and no network call. Each
+    ambassador is represented by the normalised centroid of the tickets in their case
+    history, and similarity is the cosine between a ticket and a centroid. Vectors and
+    centroids are sparse, so a batch query is one sparse matrix product."""
+
+    def __init__(self, n_features: int = DEFAULT_FEATURES):
+        self.n_features = n_features
+        self.idf: Optional[np.ndarray] = None
+        self.history: Optional[sparse.csr_matrix] = None  # Embedded historical tickets
+        self.case_rows: Dict[str, int] = {}  # case number -> row of history
+        self.ambassador_ids: List[str] = []
+        self.position: Dict[str, int] = {}
+        self._centroid_rows: Dict[str, sparse.csr_matrix] = {}
+        self._centroids: Optional[sparse.csr_matrix] = None
+
+    @classmethod
+    def build(cls, tickets: Sequence[Ticket], ambassadors: Iterable[Ambassador],
+              n_features: int = DEFAULT_FEATURES) -> 'SemanticIndex':
+        """Fit on the historical tickets and build centroids from the ambassadors' case histories."""
+        index = cls(n_features)
+        index.fit(tickets)
+        index.update_ambassadors({ambassador.id: ambassador.case_history or [] for ambassador in ambassadors})
+        return index
+
+    def _term_counts(self, texts: Iterable[str]) -> sparse.csr_matrix:
+        texts = iter(texts)
+        indices: List[np.ndarray] = []
+        indptr: List[np.ndarray] = [np.zeros(1, dtype=np.int64)]
+        offset = 0
+        while True:
+            chunk = list(islice(texts, TOKENIZE_CHUNK))
+            if not chunk:
+                break
+            chunk_indices, chunk_ends = self._tokenize(chunk)
+            indices.append(chunk_indices)
+            indptr.append(chunk_ends + offset)
+            offset += len(chunk_indices)
+        indices_array = np.concatenate(indices) if indices else np.zeros(0, dtype=np.int32)
+        counts = sparse.csr_matrix(
+            (np.ones(len(indices_array), dtype=np.float64), indices_array, np.concatenate(indptr)),
+            shape=(sum(len(ends) for ends in indptr) - 1, self.n_features))
+        counts.sum_duplicates()
+        return counts
+
+    def _tokenize(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Feature columns of all tokens of the texts, and the end offset of each text.
+
+        The texts are joined and split in one go, which is several times faster than a
+        regex per text; a separator token marks where each text ends."""
+        joiner = f' {SEPARATOR} '
+        corpus = joiner.join(texts)
+        if corpus.count(SEPARATOR) != len(texts) - 1:
+            corpus = joiner.join(text.replace(SEPARATOR, ' ') for text in texts)
+        corpus = corpus.lower().translate(TOKEN_TABLE)
+        if not corpus.isascii():
+            for character in UNICODE_PUNCTUATION:
+                corpus = corpus.replace(character, ' ')
+        tokens = corpus.split()
+
+        # Hash each distinct token once, then gather through the factorized codes
+        codes, distinct = pd.factorize(np.array(tokens, dtype=object))
+        n_features = self.n_features
+        columns = np.fromiter((-1 if token == SEPARATOR else _token_hash(token) % n_features for token in distinct),
+                              dtype=np.int64, count=len(distinct))[codes]
+
+        is_separator = columns < 0
+        separators = np.flatnonzero(is_separator)
+        words = columns[~is_separator].astype(np.int32)
+        ends = np.append(separators - np.arange(len(separators)), len(words))
+        return words, ends
+
+    def _weigh(self, counts: sparse.csr_matrix) -> sparse.csr_matrix:
+        counts.data = 1.0 + np.log(counts.data)
+        return _normalize_rows(counts @ sparse.diags(self.idf))
+
+    def fit(self, tickets: Sequence[Ticket]) -> 'SemanticIndex':
+        """Learn IDF weights from the tickets and keep their vectors as the case history corpus."""
+        counts = self._term_counts(ticket_text(ticket) for ticket in tickets)
+        document_frequency = np.bincount(counts.indices, minlength=self.n_features)
+        self.idf = np.log((1 + counts.shape[0]) / (1 + document_frequency)) + 1.0
+        self.history = self._weigh(counts).tocsr()
+        self.case_rows = {ticket.case_number: row for row, ticket in enumerate(tickets)}
+        return self
+
+    def add_tickets(self, tickets: Sequence[Ticket]):
+        """Add historical tickets with the existing IDF weights."""
+        first_row = self.history.shape[0]
+        self.history = sparse.vstack([self.history, self.transform(tickets)], format='csr')
+        for offset, ticket in enumerate(tickets):
+            self.case_rows[ticket.case_number] = first_row + offset
+
+    def transform(self, tickets: Sequence[Ticket]) -> sparse.csr_matrix:
+        """Embed tickets as L2-normalised TF-IDF rows."""
+        if self.idf is None:
+            raise ValueError("SemanticIndex has not been fitted")
+        return self._weigh(self._term_counts(ticket_text(ticket) for ticket in tickets)).tocsr()
+
+    def update_ambassador(self, ambassador_id: str, case_history: Iterable[str]):
+        """(Re)compute one ambassador's centroid; cases missing from the corpus are ignored."""
+        self.update_ambassadors({ambassador_id: case_history})
+
+    def update_ambassadors(self, case_histories: Dict[str, Iterable[str]]):
+        """(Re)compute the centroids of many ambassadors with a single sparse product."""
+        rows: List[int] = []
+        columns: List[int] = []
+        for row, case_history in enumerate(case_histories.values()):
+            cases = [self.case_rows[case] for case in case_history if case in self.case_rows]
+            columns.extend(cases)
+            rows.extend([row] * len(cases))
+        membership = sparse.csr_matrix((np.ones(len(rows)), (rows, columns)),
+                                       shape=(len(case_histories), self.history.shape[0]))
+        centroids = _normalize_rows((membership @ self.history).tocsr()).tocsr()
+
+        for row, ambassador_id in enumerate(case_histories):
+            if ambassador_id not in self.position:
+                self.position[ambassador_id] = len(self.ambassador_ids)
+                self.ambassador_ids.append(ambassador_id)
+            self._centroid_rows[ambassador_id] = centroids[row]
+        self._centroids = None
+
+    def centroids(self) -> sparse.csr_matrix:
+        """(ambassadors x features) centroid matrix in ambassador_ids order."""
+        if self._centroids is None:
+            if self.ambassador_ids:
+                self._centroids = sparse.vstack(
+                    [self._centroid_rows[ambassador_id] for ambassador_id in self.ambassador_ids], format='csr')
+            else:
+                self._centroids = sparse.csr_matrix((0, self.n_features))
+        return self._centroids
+
+    def similarity_matrix(self, tickets: Sequence[Ticket], ambassador_ids: Optional[Sequence[str]] = None) -> np.ndarray:
+        """(tickets x ambassadors) cosine similarity; ambassadors unknown to the index get 0."""
+        similarity = (self.transform(tickets) @ self.centroids().T).toarray()
+        if ambassador_ids is None:
+            return similarity
+        columns = np.array([self.position.get(ambassador_id, -1) for ambassador_id in ambassador_ids], dtype=np.int64)
+        selected = similarity[:, np.maximum(columns, 0)] if len(columns) else np.zeros((len(tickets), 0))
+        selected[:, columns < 0] = 0.0
+        return selected
+
+    def nearest(self, tickets: Sequence[Ticket], k: int = 5, chunk_size: int = 4096) -> List[List[Tuple[str, float]]]:
+        """The k most similar ambassadors for each ticket, as (ambassador_id, similarity), best first."""
+        results: List[List[Tuple[str, float]]] = []
+        k = min(k, len(self.ambassador_ids))
+        for start in range(0, len(tickets), chunk_size):
+            similarity = self.similarity_matrix(tickets[start:start + chunk_size])
+            if k == 0:
+                results.extend([] for _ in range(similarity.shape[0]))
+                continue
+            top = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(similarity, top, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind='stable')
+            for columns, scores in zip(np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)):
+                results.append([(self.ambassador_ids[column], float(score)) for column, score in zip(columns, scores)])
+        return results
@@ -0,0 +1,34 @@
+from typing import Dict, List, Optional
+from .availability_index import WeeklyAvailabilityIndex
+from .data_models import Shift
+
+class ShiftIndex:
+    """Shifts grouped by ambassador ID, built once so lookups only touch one ambassador's rota."""
+
+    def __init__(self, shifts: List[Shift]):
+        self.shifts = shifts
+        self._by_ambassador: Dict[str, List[Shift]] = {}
+        self._weekly: Optional[WeeklyAvailabilityIndex] = None
+        for shift in shifts:
+            self._by_ambassador.setdefault(shift.ambassador_id, []).append(shift)
+
+    def for_ambassador(self, ambassador_id: str) -> List[Shift]:
+        """Return the shifts of a single ambassador."""
+        return self._by_ambassador.get(ambassador_id, [])
+
+    def lines_of_business(self, ambassador_id: str) -> List[str]:
+        """Return the unique lines of business an ambassador works, in schedule order."""
+        return list(dict.fromkeys(shift.line_of_business for shift in self.for_ambassador(ambassador_id)))
+
+    def weekly(self) -> WeeklyAvailabilityIndex:
+        """Return the week-aware availability index over these shifts, built on first use."""
+        if self._weekly is None:
+            self._weekly = WeeklyAvailabilityIndex(self.shifts)
+        return self._weekly
+
+    def ambassador_ids(self) -> List[str]:
+        """Return the IDs of all ambassadors that have at least one shift."""
+        return list(self._by_ambassador)
+
+    def __len__(self) -> int:
+        return len(self.shifts)
@@ -0,0 +1,67 @@
+import hashlib
+import os
+import pickle
+from typing import Dict, Optional, Tuple
+
+SNAPSHOT_VERSION = 4
+SNAPSHOT_DIR_NAME = '.snapshots'
+
+class SnapshotCache:
+    """On-disk binary snapshot of parsed workbook data, keyed by the workbook's content hash."""
+
+    def __init__(self, source_path: str, cache_dir: Optional[str] = None):
+        self.source_path = source_path
+        self.cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(source_path)), SNAPSHOT_DIR_NAME)
+        self.snapshot_path = os.path.join(self.cache_dir, os.path.basename(source_path) + '.snapshot.pkl')
+
+    def fingerprint(self) -> Dict:
+        """Fingerprint the source workbook by size, mtime and SHA-256 of its content."""
+        stat = os.stat(self.source_path)
+        digest = hashlib.sha256()
+        with open(self.source_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return {
+            'version': SNAPSHOT_VERSION,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': digest.hexdigest()
+        }
+
+    def is_valid(self, header: Dict, fingerprint: Dict) -> bool:
+        """A snapshot is valid only for the same format version and workbook content."""
+        return (header.get('version') == fingerprint['version']
+                and header.get('size') == fingerprint['size']
+                and header.get('sha256') == fingerprint['sha256'])
+
+    def load(self) -> Optional[Tuple]:
+        """Return the cached data, or None when the snapshot is missing or stale."""
+        if not os.path.exists(self.snapshot_path):
+            return None
+
+        fingerprint = self.fingerprint()
+        try:
+            with open(self.snapshot_path, 'rb') as f:
+                # The header is pickled separately so a stale payload is never unpickled
+                header = pickle.load(f)
+                if not self.is_valid(header, fingerprint):
+                    return None
+                return pickle.load(f)
+        except Exception:
+            # A truncated or unreadable snapshot is treated like a missing one
+            return None
+
+    def save(self, data: Tuple, fingerprint: Optional[Dict] = None):
+        """Write the snapshot atomically next to any previous one."""
+        fingerprint = fingerprint or self.fingerprint()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.snapshot_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(fingerprint, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.snapshot_path)
+
+    def invalidate(self):
+        """Delete the snapshot so the next load re-parses the workbook."""
+        if os.path.exists(self.snapshot_path):
+            os.remove(self.snapshot_path)
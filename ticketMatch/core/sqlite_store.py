@@ -0,0 +1,243 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime, time
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+from .metrics import metrics
+
+SQLITE_EXTENSIONS = ('.sqlite', '.sqlite3', '.db')
+
+# (column, sheet column, SQL type) per table, in the column order of the xlsx layout
+TICKET_COLUMNS = [
+    ('case_number', 'Case Number', 'TEXT PRIMARY KEY'),
+    ('line_of_business', 'Line of Business', 'TEXT'),
+    ('primary_product', 'Primary Product', 'TEXT'),
+    ('primary_feature', 'Primary Feature', 'TEXT'),
+    ('specific_primary_driver', 'Spesific Primary Driver', 'TEXT'),
+    ('secondary_product', 'Secondary Product', 'TEXT'),
+    ('specific_secondary_feature', 'Spesific Secondary Feature', 'TEXT'),
+    ('issue_summary', 'Issue Summary', 'TEXT'),
+    ('technical_proficiency', 'Technical Proficeny', 'TEXT'),
+    ('detailed_description', 'Detailed Description', 'TEXT'),
+    ('urgency', 'Urgency', 'TEXT'),
+    ('language', 'Language', 'TEXT'),
+    ('assigned', 'assigned', 'INTEGER NOT NULL DEFAULT 0'),
+    ('created_at', 'created at', 'TEXT'),
+    ('ambassador', 'ambassador', 'TEXT'),
+]
+AMBASSADOR_COLUMNS = [
+    ('ambassador_id', 'Ambassador ID', 'TEXT NOT NULL'),
+    ('name', 'Name', 'TEXT'),
+    ('case_numbers', 'Case Number', 'TEXT'),
+    ('line_of_business', 'Line of Business', 'TEXT'),
+    ('primary_product', 'Primary Product', 'TEXT'),
+    ('secondary_product', 'Secondary Product', 'TEXT'),
+    ('conversation_history', 'Conversation History', 'TEXT'),
+    ('languages', 'Language(s)', 'TEXT'),
+    ('csat', 'CSAT', 'REAL'),
+]
+SHIFT_COLUMNS = [
+    ('ambassador_id', 'Ambassador ID', 'TEXT NOT NULL'),
+    ('name', 'Name', 'TEXT'),
+    ('line_of_business', 'Line of Business', 'TEXT'),
+    ('working_days', 'Working Days', 'TEXT'),
+    ('shift_start', 'Shift Start', 'TEXT'),
+    ('shift_end', 'Shift End', 'TEXT'),
+]
+TABLES = {
+    'tickets': ('Tickets', TICKET_COLUMNS),
+    'ambassadors': ('Ambassador History', AMBASSADOR_COLUMNS),
+    'shifts': ('Shift Schedule', SHIFT_COLUMNS),
+}
+
+SCHEMA = [
+    f"CREATE TABLE IF NOT EXISTS tickets ({', '.join(f'{c} {t}' for c, _, t in TICKET_COLUMNS)}, "
+    "ambassador_id TEXT, assigned_at TEXT)",
+    # position keeps the sheet's row order
+    f"CREATE TABLE IF NOT EXISTS ambassadors (position INTEGER PRIMARY KEY, "
+    f"{', '.join(f'{c} {t}' for c, _, t in AMBASSADOR_COLUMNS)})",
+    f"CREATE TABLE IF NOT EXISTS shifts (position INTEGER PRIMARY KEY, {', '.join(f'{c} {t}' for c, _, t in SHIFT_COLUMNS)})",
+    "CREATE TABLE IF NOT EXISTS ambassador_cases (ambassador_id TEXT NOT NULL, case_number TEXT NOT NULL)",
+    """CREATE TABLE IF NOT EXISTS assignments (
+        id INTEGER PRIMARY KEY,
+        case_number TEXT NOT NULL,
+        ambassador_id TEXT,
+        explanation TEXT,
+        assigned_at TEXT NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_tickets_assigned ON tickets (assigned)",
+    "CREATE INDEX IF NOT EXISTS idx_tickets_ambassador_id ON tickets (ambassador_id)",
+    "CREATE INDEX IF NOT EXISTS idx_tickets_line_of_business ON tickets (line_of_business)",
+    "CREATE INDEX IF NOT EXISTS idx_ambassadors_ambassador_id ON ambassadors (ambassador_id)",
+    "CREATE INDEX IF NOT EXISTS idx_shifts_ambassador_id ON shifts (ambassador_id)",
+    "CREATE INDEX IF NOT EXISTS idx_shifts_line_of_business ON shifts (line_of_business)",
+    "CREATE INDEX IF NOT EXISTS idx_ambassador_cases_ambassador_id ON ambassador_cases (ambassador_id)",
+    "CREATE INDEX IF NOT EXISTS idx_ambassador_cases_case_number ON ambassador_cases (case_number)",
+    "CREATE INDEX IF NOT EXISTS idx_assignments_case_number ON assignments (case_number)",
+    "CREATE INDEX IF NOT EXISTS idx_assignments_ambassador_id ON assignments (ambassador_id)",
+]
+
+def is_sqlite_path(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in SQLITE_EXTENSIONS
+
+def _select(table: str, columns, where: str = '') -> str:
+    """SELECT with the sheet column names as aliases, so results parse like the workbook."""
+    aliases = ', '.join(f'{column} AS "{sheet_column}"' for column, sheet_column, _ in columns)
+    order = ' ORDER BY position' if table != 'tickets' else ' ORDER BY rowid'
+    return f"SELECT {aliases} FROM {table}{where}{order}"
+
+def _sql_value(value):
+    """Convert a cell to something SQLite stores, with missing cells as NULL."""
+    if value is None or pd.isna(value):
+        return None
+    if isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (datetime, pd.Timestamp)):
+        return value.isoformat()
+    if isinstance(value, time):
+        return value.strftime('%H:%M:%S')
+    if hasattr(value, 'item'):  # numpy scalars
+        return value.item()
+    return str(value)
+
+def write_sheets(frames: Dict[str, pd.DataFrame], excel_path: str):
+    """Write DataFrames keyed by sheet name to a workbook. pandas writes time values as
+    text, so columns of times are written as time cells, like the source workbook."""
+    with pd.ExcelWriter(excel_path, engine='openpyxl') as writer:
+        for sheet, df in frames.items():
+            df.to_excel(writer, sheet_name=sheet, index=False)
+            worksheet = writer.sheets[sheet]
+            for column_number, column in enumerate(df.columns, start=1):
+                values = df[column].tolist()
+                if not values or not isinstance(values[0], time):
+                    continue
+                for row, value in enumerate(values, start=2):
+                    if isinstance(value, time):
+                        cell = worksheet.cell(row=row, column=column_number)
+                        cell.value = value
+                        cell.number_format = 'h:mm'
+
+class SQLiteStore:
+    """Tickets, ambassadors, shifts and assignments in one SQLite database.
+
+    Tables keep the columns of the xlsx layout, so queries return DataFrames that
+    DataLoader parses exactly like the workbook sheets, and a workbook can be imported
+    once and exported back. Unassigned tickets are read through the index on
+    `assigned`. Assignments are written in a single transaction that only claims
+    tickets still unassigned, so concurrent runs cannot assign a ticket twice."""
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Transactions are managed explicitly (BEGIN IMMEDIATE for writes)
+        self._db = sqlite3.connect(path, timeout=timeout, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            self._db.execute(statement)
+        self.conflicts = 0  # Tickets another run assigned first, in the last save
+
+    def close(self):
+        self._db.close()
+
+    def is_empty(self) -> bool:
+        return self._db.execute("SELECT NOT EXISTS (SELECT 1 FROM ambassadors)").fetchone()[0] == 1
+
+    def import_workbook(self, excel_path: str):
+        """Replace the stored tickets, ambassadors and shifts with the sheets of a workbook."""
+        self.import_sheets(pd.read_excel(excel_path, sheet_name=[sheet for sheet, _ in TABLES.values()]))
+
+    def import_sheets(self, sheets: Dict[str, pd.DataFrame]):
+        """Replace the stored data with DataFrames in the workbook's sheet layout, keyed by sheet name."""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                for table, (sheet, columns) in TABLES.items():
+                    self._db.execute(f"DELETE FROM {table}")
+                    df = sheets[sheet]
+                    rows = zip(*[[_sql_value(value) for value in df[sheet_column].tolist()] if sheet_column in df
+                                 else [None] * len(df) for _, sheet_column, _ in columns])
+                    names = ', '.join(column for column, _, _ in columns)
+                    self._db.executemany(f"INSERT INTO {table} ({names}) VALUES ({', '.join('?' * len(columns))})", rows)
+
+                self._db.execute("DELETE FROM ambassador_cases")
+                self._db.execute("""
+                    INSERT INTO ambassador_cases (ambassador_id, case_number)
+                    WITH RECURSIVE split (ambassador_id, case_number, rest) AS (
+                        SELECT ambassador_id, '', case_numbers || ',' FROM ambassadors WHERE case_numbers IS NOT NULL
+                        UNION ALL
+                        SELECT ambassador_id, trim(substr(rest, 1, instr(rest, ',') - 1)), substr(rest, instr(rest, ',') + 1)
+                        FROM split WHERE rest <> ''
+                    )
+                    SELECT ambassador_id, case_number FROM split WHERE case_number <> ''""")
+                # Tickets only name their ambassador; resolve the ID where the name is unique
+                self._db.execute("""
+                    UPDATE tickets SET ambassador_id = (
+                        SELECT ambassador_id FROM ambassadors a WHERE a.name = tickets.ambassador
+                        GROUP BY a.name HAVING count(*) = 1)
+                    WHERE ambassador IS NOT NULL""")
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def sheets(self, unassigned_only: bool = False) -> Dict[str, pd.DataFrame]:
+        """The stored tables as DataFrames in the workbook's sheet layout."""
+        frames = {}
+        for table, (sheet, columns) in TABLES.items():
+            where = ' WHERE assigned = 0' if table == 'tickets' and unassigned_only else ''
+            frames[sheet] = pd.read_sql_query(_select(table, columns, where), self._db)
+        tickets = frames['Tickets']
+        tickets['assigned'] = tickets['assigned'].astype(bool)
+        tickets['created at'] = pd.to_datetime(tickets['created at'])
+        return frames
+
+    def history_tickets(self) -> pd.DataFrame:
+        """Tickets referenced by any ambassador's case history, in the Tickets sheet layout."""
+        where = " WHERE case_number IN (SELECT case_number FROM ambassador_cases)"
+        df = pd.read_sql_query(_select('tickets', TICKET_COLUMNS, where), self._db)
+        df['assigned'] = df['assigned'].astype(bool)
+        return df
+
+    def export_workbook(self, excel_path: str):
+        """Write the stored data back out in the xlsx layout it was imported from."""
+        frames = self.sheets()
+        shifts = frames['Shift Schedule']
+        for column in ('Shift Start', 'Shift End'):
+            shifts[column] = pd.Series([datetime.strptime(value, '%H:%M:%S').time() if isinstance(value, str) else value
+                                        for value in shifts[column].tolist()], dtype=object)
+        write_sheets(frames, excel_path)
+
+    @metrics.timed()
+    def save_assignments(self, assignments: Dict[str, Tuple[Optional[str], str]], names: Dict[str, str],
+                         assigned_at: Optional[datetime] = None) -> int:
+        """Mark matched tickets as assigned and log them, in one transaction.
+
+        Tickets that are already assigned (e.g. by a concurrent run) or not stored are
+        left alone and counted in `conflicts`. Returns the number of tickets assigned."""
+        timestamp = (assigned_at or datetime.now()).isoformat(timespec='seconds')
+        matched = [(case_number, ambassador_id, explanation)
+                   for case_number, (ambassador_id, explanation) in assignments.items() if ambassador_id]
+        written = 0
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                for case_number, ambassador_id, explanation in matched:
+                    cursor = self._db.execute(
+                        "UPDATE tickets SET assigned = 1, ambassador_id = ?, ambassador = ?, assigned_at = ? "
+                        "WHERE case_number = ? AND assigned = 0",
+                        (ambassador_id, names.get(ambassador_id, ambassador_id), timestamp, case_number))
+                    if cursor.rowcount:
+                        written += 1
+                        self._db.execute(
+                            "INSERT INTO assignments (case_number, ambassador_id, explanation, assigned_at) "
+                            "VALUES (?, ?, ?, ?)", (case_number, ambassador_id, explanation, timestamp))
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        self.conflicts = len(matched) - written
+        return written
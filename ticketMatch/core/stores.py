@@ -0,0 +1,248 @@
+"""Compact columnar containers for tickets and ambassadors.
+
+Each field is held in one column: repeated category strings are dictionary-encoded
+into integer arrays, numbers and flags live in typed arrays, and only genuinely
+free-form text stays in plain lists. Rows are handed out as lightweight views that
+read and write the columns, and quack like the Ticket/Ambassador dataclasses, so
+the agents can consume a store directly instead of a list of objects."""
+from array import array
+from collections.abc import Mapping
+from dataclasses import fields
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from .data_models import Ticket, Ambassador
+
+EPOCH = datetime(1970, 1, 1)
+MISSING_INT = -1
+MISSING_TIMESTAMP = -(2 ** 63)
+
+class _TextColumn:
+    """Free-form strings, one per row."""
+    __slots__ = ('values',)
+
+    def __init__(self):
+        self.values: List[Any] = []
+
+    def append(self, value):
+        self.values.append(value)
+
+    def get(self, row: int):
+        return self.values[row]
+
+    def set(self, row: int, value):
+        self.values[row] = value
+
+class _CategoryColumn:
+    """Dictionary-encoded strings: an int array of codes into a list of distinct values (None is -1)."""
+    __slots__ = ('codes', 'values', '_index')
+
+    def __init__(self):
+        self.codes = array('i')
+        self.values: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def _encode(self, value: Optional[str]) -> int:
+        if value is None:
+            return MISSING_INT
+        code = self._index.get(value)
+        if code is None:
+            code = self._index[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def append(self, value: Optional[str]):
+        self.codes.append(self._encode(value))
+
+    def get(self, row: int) -> Optional[str]:
+        code = self.codes[row]
+        return None if code == MISSING_INT else self.values[code]
+
+    def set(self, row: int, value: Optional[str]):
+        self.codes[row] = self._encode(value)
+
+class _NumberColumn:
+    """Numbers or flags in a typed array, optionally with a sentinel for None."""
+    __slots__ = ('data', 'cast', 'missing')
+
+    def __init__(self, typecode: str, cast, missing=None):
+        self.data = array(typecode)
+        self.cast = cast
+        self.missing = missing
+
+    def append(self, value):
+        self.data.append(self.missing if value is None else value)
+
+    def get(self, row: int):
+        value = self.data[row]
+        return None if self.missing is not None and value == self.missing else self.cast(value)
+
+    def set(self, row: int, value):
+        self.data[row] = self.missing if value is None else value
+
+class _DatetimeColumn:
+    """Naive datetimes as int64 microseconds since the epoch."""
+    __slots__ = ('data',)
+
+    def __init__(self):
+        self.data = array('q')
+
+    def append(self, value: Optional[datetime]):
+        self.data.append(self._encode(value))
+
+    def _encode(self, value: Optional[datetime]) -> int:
+        if value is None:
+            return MISSING_TIMESTAMP
+        return (value - EPOCH) // timedelta(microseconds=1)
+
+    def get(self, row: int) -> Optional[datetime]:
+        value = self.data[row]
+        return None if value == MISSING_TIMESTAMP else EPOCH + timedelta(microseconds=value)
+
+    def set(self, row: int, value: Optional[datetime]):
+        self.data[row] = self._encode(value)
+
+def _column_property(name: str) -> property:
+    def getter(view):
+        return view._store.columns[name].get(view._row)
+
+    def setter(view, value):
+        view._store.columns[name].set(view._row, value)
+
+    return property(getter, setter)
+
+class _RowView:
+    """Lightweight handle on one row of a store."""
+    __slots__ = ('_store', '_row')
+
+    def __init__(self, store: '_ColumnStore', row: int):
+        self._store = store
+        self._row = row
+
+    def __repr__(self) -> str:
+        values = ', '.join(f"{name}={getattr(self, name)!r}" for name in self._store.columns)
+        return f"{type(self).__name__}({values})"
+
+class _ColumnStore:
+    model = None
+    view_class = None
+
+    def __init__(self, records: Iterable = ()):
+        self.columns = self._make_columns()
+        self._length = 0
+        for record in records:
+            self.append(record)
+
+    def _make_columns(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def append(self, record):
+        """Append a dataclass instance (or any object with the same attributes)."""
+        for name, column in self.columns.items():
+            column.append(getattr(record, name))
+        self._length += 1
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, row: int):
+        if row < 0:
+            row += self._length
+        if not 0 <= row < self._length:
+            raise IndexError(row)
+        return self.view_class(self, row)
+
+    def __iter__(self) -> Iterator:
+        view_class = self.view_class
+        for row in range(self._length):
+            yield view_class(self, row)
+
+    def materialize(self, row: int):
+        """Build a regular dataclass instance from one row."""
+        return self.model(**{name: column.get(row) for name, column in self.columns.items()})
+
+class TicketView(_RowView):
+    """Row view with the attributes of Ticket."""
+    __slots__ = ()
+
+class TicketStore(_ColumnStore):
+    """Columnar container of tickets."""
+    model = Ticket
+    view_class = TicketView
+    TEXT_FIELDS = ('case_number', 'issue_summary', 'detailed_description')
+    CODE_FIELDS = ('language_code', 'lob_code', 'product_code')
+
+    def _make_columns(self) -> Dict[str, Any]:
+        columns = {}
+        for field in fields(Ticket):
+            if field.name in self.TEXT_FIELDS:
+                columns[field.name] = _TextColumn()
+            elif field.name in self.CODE_FIELDS:
+                columns[field.name] = _NumberColumn('i', int, MISSING_INT)
+            elif field.name == 'assigned':
+                columns[field.name] = _NumberColumn('b', bool)
+            elif field.name == 'assignment_datetime':
+                columns[field.name] = _DatetimeColumn()
+            else:
+                columns[field.name] = _CategoryColumn()
+        return columns
+
+class AmbassadorView(_RowView):
+    """Row view with the attributes of Ambassador."""
+    __slots__ = ()
+
+    def profile(self, performance_metrics: Dict) -> 'ProfileView':
+        return ProfileView(self._store, self._row, performance_metrics)
+
+class AmbassadorStore(_ColumnStore):
+    """Columnar container of ambassadors."""
+    model = Ambassador
+    view_class = AmbassadorView
+
+    def _make_columns(self) -> Dict[str, Any]:
+        columns = {}
+        for field in fields(Ambassador):
+            if field.name == 'csat_score':
+                columns[field.name] = _NumberColumn('d', float)
+            elif field.name in ('current_tickets', 'max_active_tickets'):
+                columns[field.name] = _NumberColumn('i', int)
+            else:
+                # IDs, names, list fields and arbitrary-width bitsets
+                columns[field.name] = _TextColumn()
+        return columns
+
+class ProfileView(Mapping):
+    """Ambassador profile backed by an AmbassadorStore row instead of a copied dict.
+
+    Profile keys that are ambassador fields read and write the store; other keys
+    (performance metrics, derived data) are kept on the view itself."""
+    __slots__ = ('_store', '_row', '_extra')
+
+    def __init__(self, store: AmbassadorStore, row: int, performance_metrics: Dict):
+        self._store = store
+        self._row = row
+        self._extra = {'performance_metrics': performance_metrics}
+
+    def __getitem__(self, key: str):
+        column = self._store.columns.get(key)
+        if column is not None:
+            return column.get(self._row)
+        return self._extra[key]
+
+    def __setitem__(self, key: str, value):
+        column = self._store.columns.get(key)
+        if column is not None:
+            column.set(self._row, value)
+        else:
+            self._extra[key] = value
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._store.columns
+        yield from self._extra
+
+    def __len__(self) -> int:
+        return len(self._store.columns) + len(self._extra)
+
+for _model, _view in ((Ticket, TicketView), (Ambassador, AmbassadorView)):
+    for _field in fields(_model):
+        setattr(_view, _field.name, _column_property(_field.name))
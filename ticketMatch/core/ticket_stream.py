@@ -0,0 +1,139 @@
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+from dataclasses import fields
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from .data_models import Ticket
+
+logger = logging.getLogger(__name__)
+
+# A streamed record and the time.monotonic() at which it was read
+StreamItem = Tuple[float, Dict]
+
+TICKET_FIELDS = {field.name for field in fields(Ticket)} - {'language_code', 'lob_code', 'product_code'}
+OPTIONAL_FIELDS = {'secondary_product', 'specific_secondary_feature', 'assignment_datetime', 'assigned_ambassador_id'}
+# Records may also use the column names of the Tickets sheet
+SHEET_COLUMNS = {
+    'Case Number': 'case_number',
+    'Line of Business': 'line_of_business',
+    'Primary Product': 'primary_product',
+    'Primary Feature': 'primary_feature',
+    'Spesific Primary Driver': 'specific_primary_driver',
+    'Secondary Product': 'secondary_product',
+    'Spesific Secondary Feature': 'specific_secondary_feature',
+    'Issue Summary': 'issue_summary',
+    'Technical Proficeny': 'technical_proficiency',
+    'Detailed Description': 'detailed_description',
+    'Urgency': 'urgency',
+    'Language': 'language',
+}
+
+def ticket_from_record(record: Dict) -> Ticket:
+    """Build a Ticket from a streamed JSON record; missing text fields are left empty."""
+    values = {SHEET_COLUMNS.get(key, key): value for key, value in record.items()}
+    case_number = values.get('case_number')
+    if case_number is None or not str(case_number).strip():
+        raise ValueError("Ticket record has no case_number")
+
+    ticket = {}
+    for name in TICKET_FIELDS:
+        value = values.get(name)
+        if name == 'assigned':
+            ticket[name] = bool(value)
+        elif name in OPTIONAL_FIELDS:
+            ticket[name] = str(value) if value is not None else None
+        else:
+            ticket[name] = str(value) if value is not None else ''
+    ticket['case_number'] = str(case_number).strip()
+    ticket['assignment_datetime'] = None
+    return Ticket(**ticket)
+
+def read_lines(source: str, follow: bool = False, poll_interval: float = 0.2) -> Iterator[str]:
+    """Yield the non-empty lines of a file, a named pipe or stdin ('-') as they arrive.
+
+    With follow=True a regular file is tailed: reaching the end waits for more lines
+    instead of stopping. A named pipe ends when its last writer closes it."""
+    stream = sys.stdin if source == '-' else open(source, 'r', encoding='utf-8')
+    try:
+        while True:
+            line = stream.readline()
+            if not line:
+                if not follow:
+                    return
+                time.sleep(poll_interval)
+                continue
+            line = line.strip()
+            if line:
+                yield line
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+class MicroBatcher:
+    """Groups streamed JSON lines into micro-batches of up to batch_size records.
+
+    A reader thread parses lines into a bounded queue, so a slow consumer holds the
+    reader back instead of buffering without limit. A batch is closed when it is full
+    or max_wait seconds after its first record arrived, whichever comes first. Lines
+    that are not JSON objects are logged and counted in `invalid`."""
+
+    _END = object()
+
+    def __init__(self, lines: Iterable[str], batch_size: int = 64, max_wait: float = 0.2,
+                 max_pending: int = 1024):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.invalid = 0
+        self.error: Optional[BaseException] = None
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._read, args=(lines,), daemon=True)
+        self._started = False
+
+    def _read(self, lines: Iterable[str]):
+        try:
+            for line in lines:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                if not isinstance(record, dict):
+                    self.invalid += 1
+                    logger.warning(f"Skipping invalid ticket line: {line[:80]}")
+                    continue
+                self._queue.put((time.monotonic(), record))
+        except BaseException as e:
+            self.error = e
+        finally:
+            self._queue.put(self._END)
+
+    def __iter__(self) -> Iterator[List[StreamItem]]:
+        if not self._started:
+            self._started = True
+            self._thread.start()
+
+        done = False
+        while not done:
+            item = self._queue.get()
+            if item is self._END:
+                break
+            batch = [item]
+            deadline = item[0] + self.max_wait
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is self._END:
+                    done = True
+                    break
+                batch.append(item)
+            yield batch
+
+        if self.error is not None:
+            raise self.error
@@ -0,0 +1,96 @@
+from typing import Dict, Iterable, List, Optional
+from .data_models import Ticket, Ambassador, Shift
+
+class Vocabulary:
+    """Interns normalized category values (languages, lines of business, products) to small integer codes.
+
+    Values are stripped and have inner whitespace collapsed; lookups ignore case. The
+    first spelling seen becomes the canonical value returned by decode()."""
+
+    def __init__(self):
+        self._codes: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    @staticmethod
+    def normalize(value: str) -> str:
+        return ' '.join(str(value).split())
+
+    def encode(self, value: str) -> int:
+        """Return the code of a value, adding it to the vocabulary if needed."""
+        normalized = self.normalize(value)
+        key = normalized.casefold()
+        code = self._codes.get(key)
+        if code is None:
+            code = self._codes[key] = len(self.values)
+            self.values.append(normalized)
+        return code
+
+    def code(self, value: str) -> Optional[int]:
+        """Return the code of a known value, or None."""
+        return self._codes.get(self.normalize(value).casefold())
+
+    def decode(self, code: int) -> str:
+        return self.values[code]
+
+    def canonical(self, value: str) -> str:
+        """Intern a value and return its canonical spelling."""
+        return self.values[self.encode(value)]
+
+    def mask(self, values: Iterable[str]) -> int:
+        """Encode a set of values as a bitset with one bit per code."""
+        mask = 0
+        for value in values:
+            mask |= 1 << self.encode(value)
+        return mask
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+class CategoricalEncoder:
+    """Vocabularies for languages, lines of business and products, applied to the data models.
+
+    Encoding replaces the free-form strings with their canonical interned spelling and
+    sets the integer codes (tickets, shifts) and bitsets (ambassadors), so membership
+    tests become integer operations. Codes are only comparable within one encoder."""
+
+    def __init__(self):
+        self.languages = Vocabulary()
+        self.lines_of_business = Vocabulary()
+        self.products = Vocabulary()
+
+    def encode(self, tickets: List[Ticket], ambassadors: List[Ambassador], shifts: List[Shift]):
+        for ambassador in ambassadors:
+            self.encode_ambassador(ambassador)
+        for shift in shifts:
+            self.encode_shift(shift)
+        for ticket in tickets:
+            self.encode_ticket(ticket)
+
+    def encode_ticket(self, ticket: Ticket) -> Ticket:
+        ticket.language_code = self.languages.encode(ticket.language)
+        ticket.language = self.languages.decode(ticket.language_code)
+        ticket.lob_code = self.lines_of_business.encode(ticket.line_of_business)
+        ticket.line_of_business = self.lines_of_business.decode(ticket.lob_code)
+        ticket.product_code = self.products.encode(ticket.primary_product)
+        ticket.primary_product = self.products.decode(ticket.product_code)
+        return ticket
+
+    def encode_ambassador(self, ambassador: Ambassador) -> Ambassador:
+        ambassador.languages = list(dict.fromkeys(
+            self.languages.canonical(language) for language in ambassador.languages if self.languages.normalize(language)))
+        ambassador.language_mask = self.languages.mask(ambassador.languages)
+        ambassador.line_of_business = list(dict.fromkeys(
+            self.lines_of_business.canonical(lob) for lob in ambassador.line_of_business))
+        ambassador.lob_mask = self.lines_of_business.mask(ambassador.line_of_business)
+        return ambassador
+
+    def encode_shift(self, shift: Shift) -> Shift:
+        shift.lob_code = self.lines_of_business.encode(shift.line_of_business)
+        shift.line_of_business = self.lines_of_business.decode(shift.lob_code)
+        return shift
+
+def has_code(mask: Optional[int], code: Optional[int]) -> Optional[bool]:
+    """Bitset membership test; None when either side was not encoded."""
+    if mask is None or code is None:
+        return None
+    return bool((mask >> code) & 1)
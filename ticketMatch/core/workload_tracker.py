@@ -0,0 +1,64 @@
+from typing import Dict, List, Optional, Set
+from .data_models import Ambassador
+
+class WorkloadTracker:
+    """Live ambassador workload, updated on every assignment and release.
+
+    Ambassadors with free capacity are kept in an open set, so full ambassadors drop out
+    of candidate sets without re-scanning everyone; each update costs O(1)."""
+
+    def __init__(self, ambassadors: List[Ambassador]):
+        self.ambassadors = ambassadors
+        self._by_id: Dict[str, Ambassador] = {a.id: a for a in ambassadors}
+        self.position: Dict[str, int] = {a.id: i for i, a in enumerate(ambassadors)}
+        self._open: Set[str] = set()
+        self._ticket_owner: Dict[str, str] = {}  # ticket_id -> ambassador_id
+        for ambassador in ambassadors:
+            self._refresh(ambassador)
+
+    def tracks(self, ambassadors: List[Ambassador]) -> bool:
+        """Whether this tracker was built for the given ambassador list."""
+        return self.ambassadors is ambassadors and len(self._by_id) == len(ambassadors)
+
+    def ambassador(self, ambassador_id: str) -> Optional[Ambassador]:
+        return self._by_id.get(ambassador_id)
+
+    def remaining_capacity(self, ambassador_id: str) -> int:
+        ambassador = self._by_id[ambassador_id]
+        return ambassador.max_active_tickets - ambassador.current_tickets
+
+    def has_capacity(self, ambassador_id: str) -> bool:
+        return ambassador_id in self._open
+
+    def open_ids(self) -> Set[str]:
+        """IDs of ambassadors that can still take tickets."""
+        return self._open
+
+    def assign(self, ticket_id: str, ambassador_id: str):
+        """Record a new ticket for an ambassador."""
+        previous = self._ticket_owner.get(ticket_id)
+        if previous == ambassador_id:
+            return
+        if previous is not None:
+            self.release(ticket_id)
+        ambassador = self._by_id[ambassador_id]
+        ambassador.current_tickets += 1
+        self._ticket_owner[ticket_id] = ambassador_id
+        self._refresh(ambassador)
+
+    def release(self, ticket_id: str, ambassador_id: Optional[str] = None) -> Optional[str]:
+        """Free the slot held by a closed ticket. ambassador_id is only needed for
+        tickets that were assigned before tracking started. Returns the ambassador ID."""
+        ambassador_id = self._ticket_owner.pop(ticket_id, ambassador_id)
+        ambassador = self._by_id.get(ambassador_id) if ambassador_id else None
+        if ambassador is None:
+            return None
+        ambassador.current_tickets = max(0, ambassador.current_tickets - 1)
+        self._refresh(ambassador)
+        return ambassador_id
+
+    def _refresh(self, ambassador: Ambassador):
+        if ambassador.current_tickets < ambassador.max_active_tickets:
+            self._open.add(ambassador.id)
+        else:
+            self._open.discard(ambassador.id)
@@ -5,7 +5,10 @@ from agents.ambassador_profiling_agent import AmbassadorProfilingAgent
 from agents.availability_agent import AvailabilityAgent
 from agents.matching_agent import MatchingAgent
 from core.data_models import Ticket, Ambassador, Shift
+from core.results_writer import ResultsWriter, ambassador_names, write_workbook, FORMATS
+from core.metrics import metrics
 from datetime import datetime
+import argparse
 import os
 from colorama import init, Fore, Style
 import pandas as pd
@@ -29,18 +32,58 @@ def print_error(message: str):
     """Print error message in red."""
     print(f"{Fore.RED}✗ {message}{Style.RESET_ALL}")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Ticket Matchmaker - Multi-Agent System")
+    parser.add_argument("--data", default="data/mock_data.xlsx",
+                        help="workbook, or .sqlite/.db store, with tickets, ambassadors and shifts")
+    parser.add_argument("--results", default="results/assignments.jsonl",
+                        help="append-only assignment log (.jsonl, .csv, or a .parquet directory); "
+                             "tickets matched in it are skipped by later runs")
+    parser.add_argument("--results-format", choices=FORMATS, help="format of --results when not given by its extension")
+    parser.add_argument("--write-workbook", action="store_true",
+                        help="also mark the assignments in the Tickets sheet (rewrites the sheet)")
+    parser.add_argument("--import-workbook", metavar="XLSX", help="load this workbook into the --data store first")
+    parser.add_argument("--export-workbook", metavar="XLSX", help="write the --data store to this workbook at the end")
+    parser.add_argument("--metrics-json", metavar="PATH", help="record stage timings and counters, and dump them here as JSON")
+    parser.add_argument("--metrics-prometheus", metavar="PATH",
+                        help="record stage timings and counters, and write a Prometheus text-format snapshot here")
+    return parser.parse_args()
+
+def write_metrics(args):
+    """Write the metrics requested on the command line."""
+    if args.metrics_json:
+        metrics.dump(args.metrics_json)
+        print_success(f"Wrote metrics summary to {args.metrics_json}")
+    if args.metrics_prometheus:
+        with open(args.metrics_prometheus, 'w') as f:
+            f.write(metrics.prometheus())
+        print_success(f"Wrote Prometheus metrics to {args.metrics_prometheus}")
+    derived = metrics.derived()
+    print(f"  {derived['tickets_matched_per_second']:.1f} tickets matched/s, "
+          f"{derived['candidates_per_ticket']:.1f} candidates scored per ticket, {derived['llm_calls']} LLM calls")
+
 def main():
+    args = parse_args()
+    if args.metrics_json or args.metrics_prometheus:
+        metrics.enable()
     print(f"\n{Fore.BLUE}🚀 Ticket Matchmaker - Multi-Agent System{Style.RESET_ALL}\n")
 
     try:
         # 1. Load data from Excel
         print_step("DATA", "Loading data from Excel...")
-        data_loader = DataLoader("data/mock_data.xlsx")
-        tickets, ambassadors, shifts = data_loader.load_data()
-        
-        # Filter only unassigned tickets
-        unassigned_tickets = [ticket for ticket in tickets if not ticket.assigned]
-        print_success(f"Loaded {len(unassigned_tickets)} unassigned tickets out of {len(tickets)} total tickets")
+        with metrics.timer('stage_seconds', stage='load'):
+            # Tickets in the assignment log were matched by an earlier run
+            results_writer = ResultsWriter(args.results, args.results_format)
+            # A store returns only its unassigned tickets, read through the assigned index
+            data_loader = DataLoader(args.data, unassigned_only=True, assigned=results_writer.assigned())
+            if args.import_workbook:
+                if data_loader.store is None:
+                    raise ValueError("--import-workbook needs a .sqlite or .db --data store")
+                data_loader.store.import_workbook(args.import_workbook)
+                print_success(f"Imported {args.import_workbook} into {args.data}")
+            unassigned_tickets, ambassadors, shifts = data_loader.load_data()
+        shift_index = data_loader.shift_index
+        print_success(f"Loaded {len(unassigned_tickets)} unassigned tickets")
         
         # Debug: Print some ticket details
         print("\nSample of unassigned tickets:")
@@ -53,25 +96,31 @@ def main():
         ambassador_agent = AmbassadorProfilingAgent()
         availability_agent = AvailabilityAgent()
         matching_agent = MatchingAgent()
+        ambassador_agent.use_expertise_index(data_loader.expertise_index)
+        matching_agent.profiling_agent.use_expertise_index(data_loader.expertise_index)
         print_success("All agents initialized")
 
         # 3. Process tickets
         print_step("PROCESSING", f"Processing {len(unassigned_tickets)} unassigned tickets...")
         
         # Get unassigned tickets
-        unassigned_tickets = ticket_agent.analyze_tickets(tickets)
+        with metrics.timer('stage_seconds', stage='analysis'):
+            unassigned_tickets = ticket_agent.analyze_tickets(unassigned_tickets)
         print_success(f"Found {len(unassigned_tickets)} unassigned tickets")
 
         # Get ambassador profiles
-        ambassador_profiles = ambassador_agent.analyze_conversation_history(ambassadors)
+        with metrics.timer('stage_seconds', stage='profile'):
+            ambassador_profiles = ambassador_agent.analyze_conversation_history(ambassadors)
         print_success(f"Analyzed profiles for {len(ambassador_profiles)} ambassadors")
+        names = ambassador_names(ambassadors)
 
         # Process each unassigned ticket
         for ticket in unassigned_tickets:
             print(f"\n{Fore.MAGENTA}📋 Processing Ticket {ticket.case_number}{Style.RESET_ALL}")
             
             # Get available ambassadors
-            available_ambassadors = availability_agent.check_availability(ticket, ambassadors, shifts)
+            with metrics.timer('stage_seconds', stage='availability'):
+                available_ambassadors = availability_agent.check_availability(ticket, ambassadors, shift_index)
             
             if not available_ambassadors:
                 print_warning(f"No available ambassadors for ticket {ticket.case_number}")
@@ -79,50 +128,46 @@ def main():
 
             # Match ticket
             print_step("MATCHING", "Finding best match...")
-            assigned_tickets = matching_agent.process_tickets([ticket], ambassadors, shifts)
+            with metrics.timer('stage_seconds', stage='matching'):
+                assigned_tickets = matching_agent.process_tickets([ticket], ambassadors, shift_index)
             
             if ticket.case_number in assigned_tickets:
                 ambassador_id, explanation = assigned_tickets[ticket.case_number]
+                results_writer.add({ticket.case_number: (ambassador_id, explanation)})
                 if ambassador_id:
-                    # Find ambassador name
-                    ambassador = next((a for a in ambassadors if a.id == ambassador_id), None)
-                    ambassador_name = ambassador.name if ambassador else ambassador_id
-                    print_success(f"Matched to Ambassador {ambassador_name}")
+                    print_success(f"Matched to Ambassador {names.get(ambassador_id, ambassador_id)}")
                     print(f"  {Fore.CYAN}Reason:{Style.RESET_ALL} {explanation}")
                 else:
                     print_warning(f"No suitable match found: {explanation}")
 
-        # Save results to Excel
-        print_step("SAVING", "Saving assignment results to Excel...")
+        # Save results: append only the new assignments, optionally update the workbook too
+        print_step("SAVING", f"Appending assignment results to {args.results}...")
         try:
-            # Read the original Excel file
-            df = pd.read_excel("data/mock_data.xlsx", sheet_name='Tickets')
-            
-            # Update the assigned column and ambassador column
-            for ticket_id, (ambassador_id, _) in matching_agent.assigned_tickets.items():
-                if ambassador_id:
-                    # Find ambassador name
-                    ambassador = next((a for a in ambassadors if a.id == ambassador_id), None)
-                    ambassador_name = ambassador.name if ambassador else ambassador_id
-                    
-                    # Update the row
-                    mask = df['Case Number'] == ticket_id
-                    df.loc[mask, 'assigned'] = True
-                    df.loc[mask, 'ambassador'] = ambassador_name
-            
-            # Save back to Excel
-            with pd.ExcelWriter("data/mock_data.xlsx", engine='openpyxl', mode='a', if_sheet_exists='replace') as writer:
-                df.to_excel(writer, sheet_name='Tickets', index=False)
-            
-            print_success("Results saved to Excel successfully!")
+            with metrics.timer('stage_seconds', stage='save'):
+                written = results_writer.save(None, names)
+                print_success(f"Saved {written} assignment results")
+                if data_loader.store is not None:
+                    updated = data_loader.store.save_assignments(matching_agent.assigned_tickets, names)
+                    print_success(f"Marked {updated} assigned tickets in the store")
+                    if data_loader.store.conflicts:
+                        print_warning(f"{data_loader.store.conflicts} tickets were already assigned by another run")
+                    if args.export_workbook:
+                        data_loader.store.export_workbook(args.export_workbook)
+                        print_success(f"Exported the store to {args.export_workbook}")
+                elif args.write_workbook:
+                    updated = write_workbook(args.data, matching_agent.assigned_tickets, names)
+                    print_success(f"Marked {updated} assigned tickets in the workbook")
         except Exception as e:
-            print_error(f"Error saving to Excel: {str(e)}")
+            print_error(f"Error saving results: {str(e)}")
 
         print_success("\nAll tickets processed successfully!")
 
     except Exception as e:
         print_error(f"An error occurred: {str(e)}")
         return
+    finally:
+        if metrics.enabled:
+            write_metrics(args)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
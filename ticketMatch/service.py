@@ -0,0 +1,186 @@
+"""Local matching service with warm in-memory state.
+
+Loads ambassadors, shifts and profiles once and answers match requests over HTTP:
+
+    python service.py --data data/mock_data.xlsx --port 8080
+
+    POST /match        one ticket record             -> one assignment
+    POST /match/batch  a JSON array of ticket records -> a JSON array of assignments
+    POST /reload       re-read the data source and rebuild the state
+    GET  /health       status and latency statistics
+    GET  /metrics      Prometheus text-format snapshot (recorded with --metrics)
+
+Ticket records use the same fields as stream.py. Requests are served concurrently;
+matching itself is serialized because it updates the shared workload.
+"""
+import argparse
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from core.data_loader import DataLoader
+from core.metrics import metrics
+from agents.matching_agent import MatchingAgent, MATCHING_MODES
+from agents.stream_matcher import StreamMatcher
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_BYTES = 16 << 20
+
+
+class MatchingService:
+    """Warm matching state behind the HTTP endpoints.
+
+    A reload builds the new state before swapping it in, so requests keep being served
+    from the old state while the data source is read."""
+
+    def __init__(self, data_path: str, mode: str = 'vectorized', current_time: Optional[datetime] = None):
+        self.data_path = data_path
+        self.mode = mode
+        self.current_time = current_time  # Fixed matching time, for replays and tests; None uses the clock
+        self.matcher: Optional[StreamMatcher] = None
+        self.loaded_at: Optional[float] = None
+        self.reloads = 0
+        self._match_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self.reload()
+
+    def reload(self) -> Dict:
+        """Re-read the data source; ambassador workload starts again from the source."""
+        with self._reload_lock:
+            started = time.perf_counter()
+            data_loader = DataLoader(self.data_path)
+            _, ambassadors, _ = data_loader.load_data()
+            matching_agent = MatchingAgent()
+            matching_agent.profiling_agent.use_expertise_index(data_loader.expertise_index)
+            matching_agent.profiling_agent.analyze_conversation_history(ambassadors)  # Warm the profiles
+            matcher = StreamMatcher(ambassadors, data_loader.shift_index, data_loader.encoder, matching_agent, self.mode)
+            with self._match_lock:
+                self.matcher = matcher
+                self.loaded_at = time.time()
+                self.reloads += 1
+            return {'ambassadors': len(ambassadors), 'seconds': round(time.perf_counter() - started, 3)}
+
+    def match(self, records: List[Dict], received: float) -> List[Dict]:
+        """Match ticket records received at the given time.monotonic()."""
+        with self._match_lock:
+            return self.matcher.match_batch([(received, record) for record in records], self.current_time)
+
+    def health(self) -> Dict:
+        with self._match_lock:
+            stats = self.matcher.stats()
+            ambassadors = len(self.matcher.ambassadors)
+        return {'status': 'ok', 'ambassadors': ambassadors, 'mode': self.mode, 'reloads': self.reloads,
+                'loaded_at': datetime.fromtimestamp(self.loaded_at).isoformat(timespec='seconds'), **stats}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without TCP_NODELAY keep-alive clients
+    # wait for a delayed ACK (~40ms) on every response
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, self.server.service.health())
+        elif self.path == '/metrics':
+            self._send(200, metrics.prometheus().encode(), "text/plain; version=0.0.4; charset=utf-8")
+        else:
+            self._send_json(404, {'error': f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        received = time.monotonic()
+        service = self.server.service
+        try:
+            body = self._read_json()
+            if self.path == '/match':
+                if not isinstance(body, dict):
+                    raise ValueError("Expected a ticket object")
+                self._send_json(200, service.match([body], received)[0])
+            elif self.path == '/match/batch':
+                if not isinstance(body, list) or not all(isinstance(record, dict) for record in body):
+                    raise ValueError("Expected an array of ticket objects")
+                self._send_json(200, service.match(body, received) if body else [])
+            elif self.path == '/reload':
+                self._send_json(200, service.reload())
+            else:
+                self._send_json(404, {'error': f"Unknown path {self.path}"})
+        except ValueError as e:
+            self._send_json(400, {'error': str(e)})
+        except Exception as e:
+            logger.exception("Error handling request")
+            self._send_json(500, {'error': str(e)})
+
+    def _read_json(self):
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            length = -1
+        if length < 0 or length > MAX_BODY_BYTES:
+            # The body is left unread, so the connection cannot carry another request
+            self.close_connection = True
+            raise ValueError("Request body too large" if length > 0 else "Invalid Content-Length")
+        raw = self.rfile.read(length)
+        if not raw:
+            return None
+        try:
+            return json.loads(raw)
+        except ValueError:
+            raise ValueError("Request body is not valid JSON")
+
+    def _send_json(self, status: int, body):
+        self._send(status, json.dumps(body).encode(), "application/json")
+
+    def _send(self, status: int, payload: bytes, content_type: str):
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            if self.close_connection:
+                self.send_header("Connection", "close")
+            self.end_headers()
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+
+def create_server(service: MatchingService, host: str = '127.0.0.1', port: int = 8080) -> ThreadingHTTPServer:
+    """HTTP server for the service, handling each connection in its own thread."""
+    httpd = ThreadingHTTPServer((host, port), _Handler)
+    httpd.daemon_threads = True
+    httpd.service = service
+    return httpd
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", default="data/mock_data.xlsx", help="workbook or .sqlite/.db store")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--mode", choices=MATCHING_MODES, default="vectorized")
+    parser.add_argument("--metrics", action="store_true", help="record timings and counters for GET /metrics")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    if args.metrics:
+        metrics.enable()
+
+    service = MatchingService(args.data, args.mode)
+    httpd = create_server(service, args.host, args.port)
+    logger.info(f"Serving {len(service.matcher.ambassadors)} ambassadors on http://{args.host}:{httpd.server_address[1]}")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Streaming ticket matcher.
+
+Reads tickets as JSON lines from a file, a named pipe or stdin, matches them in
+micro-batches against the ambassadors and shifts of the workbook, and writes one JSON
+assignment per ticket as soon as its batch is matched:
+
+    python stream.py tickets.jsonl --follow --output assignments.jsonl
+    cat tickets.jsonl | python stream.py - --batch-size 128 --max-wait 0.5
+
+Run statistics (throughput, per-ticket latency percentiles) go to stderr.
+"""
+import argparse
+import json
+import sys
+
+from core.data_loader import DataLoader
+from core.ticket_stream import MicroBatcher, read_lines
+from agents.matching_agent import MatchingAgent, MATCHING_MODES
+from agents.stream_matcher import StreamMatcher
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", help="JSONL file, named pipe, or - for stdin")
+    parser.add_argument("--data", default="data/mock_data.xlsx", help="workbook with ambassadors and shifts")
+    parser.add_argument("--output", default="-", help="file to append assignments to, or - for stdout")
+    parser.add_argument("--follow", action="store_true", help="keep reading a file as it grows")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--max-wait", type=float, default=0.2, help="seconds a ticket may wait for its batch to fill")
+    parser.add_argument("--max-pending", type=int, default=1024, help="tickets buffered ahead of matching")
+    parser.add_argument("--mode", choices=MATCHING_MODES, default="vectorized")
+    args = parser.parse_args()
+
+    data_loader = DataLoader(args.data)
+    _, ambassadors, _ = data_loader.load_data()
+    matching_agent = MatchingAgent()
+    matching_agent.profiling_agent.use_expertise_index(data_loader.expertise_index)
+    matcher = StreamMatcher(ambassadors, data_loader.shift_index, data_loader.encoder, matching_agent, args.mode)
+    batcher = MicroBatcher(read_lines(args.source, args.follow), args.batch_size, args.max_wait, args.max_pending)
+
+    output = sys.stdout if args.output == "-" else open(args.output, "a", encoding="utf-8")
+    try:
+        matcher.run(batcher, output)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        stats = matcher.stats()
+        stats["invalid_lines"] = batcher.invalid
+        print(json.dumps(stats), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Local stand-in for the Azure OpenAI chat completions endpoint, for tests and benchmarks.
+
+Every POST to .../chat/completions sleeps for `latency` seconds and answers with a
+completion whose content is a JSON analysis derived from the ticket text. Tickets
+containing "[slow]" take `slow_latency` instead and tickets containing "[garbled]"
+get a non-JSON answer. A user message holding a JSON array of {case_number, text}
+is answered as a batch with a JSON array; in a batch, tickets containing "[dropped]"
+are left out of the answer and tickets containing "[invalid]" get a bad urgency.
+Status codes queued with fail_next() are returned, one per request, before normal
+answers resume. GET .../models answers the health check. The server records how many
+requests were in flight at once."""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def analysis_for(ticket_text: str) -> dict:
+    """The analysis the fake model returns for a ticket."""
+    words = ticket_text.split()
+    return {
+        "topic": words[0] if words else "unknown",
+        "urgency": "high" if "urgent" in ticket_text.lower() else "low",
+        "sentiment": "negative" if "angry" in ticket_text.lower() else "neutral"
+    }
+
+
+def _batch_tickets(content: str):
+    try:
+        tickets = json.loads(content)
+    except ValueError:
+        return None
+    return tickets if isinstance(tickets, list) else None
+
+
+def _batch_answer(tickets: list) -> list:
+    answer = []
+    for ticket in tickets:
+        if "[dropped]" in ticket["text"]:
+            continue
+        analysis = analysis_for(ticket["text"])
+        if "[invalid]" in ticket["text"]:
+            analysis["urgency"] = "extreme"
+        answer.append({"case_number": ticket["case_number"], **analysis})
+    return answer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server.fake
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        ticket_text = body["messages"][-1]["content"].removeprefix("Ticket: ")
+
+        with server.lock:
+            server.requests += 1
+            failure = server.failures.pop(0) if server.failures else None
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(server.slow_latency if "[slow]" in ticket_text else server.latency)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+        if failure is not None:
+            self._send_json(failure, {"error": {"message": f"Injected {failure}", "code": str(failure)}},
+                            {"Retry-After": str(server.retry_after)} if server.retry_after is not None else {})
+            return
+
+        batch = _batch_tickets(ticket_text)
+        if batch is not None:
+            content = json.dumps(_batch_answer(batch))
+        elif "[garbled]" in ticket_text:
+            content = "not json"
+        else:
+            content = json.dumps(analysis_for(ticket_text))
+        self._send_json(200, {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": content}
+            }],
+            "usage": {"prompt_tokens": 50, "completion_tokens": 20, "total_tokens": 70}
+        })
+
+    def do_GET(self):
+        with self.server.fake.lock:
+            self.server.fake.health_checks += 1
+        self._send_json(200, {"object": "list", "data": []})
+
+    def _send_json(self, status: int, body: dict, headers: dict = None):
+        payload = json.dumps(body).encode()
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The client gave up (timeout)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeCompletionServer:
+    def __init__(self, latency: float = 0.05, slow_latency: float = 5.0):
+        self.latency = latency
+        self.slow_latency = slow_latency
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.health_checks = 0
+        self.failures = []
+        self.retry_after = None
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.fake = self
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset_counters(self):
+        with self.lock:
+            self.requests = 0
+            self.max_in_flight = 0
+
+    def fail_next(self, *status_codes: int, retry_after: float = None):
+        """Answer the next requests with these error statuses, optionally with a Retry-After header."""
+        with self.lock:
+            self.failures.extend(status_codes)
+            self.retry_after = retry_after
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
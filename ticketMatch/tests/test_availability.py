@@ -0,0 +1,83 @@
+import os
+import sys
+from datetime import date, datetime, time, timedelta
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from agents.availability_agent import AvailabilityAgent
+from core.availability_index import WeeklyAvailabilityIndex, parse_working_days
+from core.data_models import Ambassador, Shift
+
+# 2025-06-02 is a Monday
+MONDAY = date(2025, 6, 2)
+
+
+def make_shifts():
+    return [
+        Shift("AMB001", "Day", "CoPilot Welcome", "Mon to Fri", time(9, 0), time(17, 0)),
+        Shift("AMB002", "Night", "Proactive Grace", "Fri to Sun", time(22, 0), time(6, 0)),
+        Shift("AMB003", "Weekend", "CoPilot Welcome", "Sat, Sun", time(10, 0), time(14, 0)),
+        Shift("AMB004", "Inactive", "CoPilot Welcome", "Mon to Sun", time(0, 0), time(0, 0), is_active=False),
+    ]
+
+
+def brute_force_on_shift(shifts, moment):
+    """Reference implementation that walks every shift and day."""
+    on_shift = set()
+    for shift in shifts:
+        if not shift.is_active:
+            continue
+        for day in parse_working_days(shift.working_days):
+            start = datetime.combine(MONDAY + timedelta(days=day), shift.shift_start)
+            end = datetime.combine(MONDAY + timedelta(days=day), shift.shift_end)
+            if end <= start:
+                end += timedelta(days=1)
+            for week_offset in (-7, 0):
+                offset = timedelta(days=week_offset)
+                if start + offset <= moment < end + offset:
+                    on_shift.add(shift.ambassador_id)
+    return on_shift
+
+
+def test_parse_working_days():
+    assert parse_working_days("Mon to Fri") == frozenset(range(5))
+    assert parse_working_days("Fri to Mon") == frozenset({4, 5, 6, 0})
+    assert parse_working_days("Sat, Sun") == frozenset({5, 6})
+    assert parse_working_days("Tuesday-Thursday") == frozenset({1, 2, 3})
+
+
+def test_index_handles_working_days_and_overnight_shifts():
+    index = WeeklyAvailabilityIndex(make_shifts())
+
+    assert index.on_shift(datetime(2025, 6, 2, 10, 0)) == {"AMB001"}
+    # Friday night shift runs into Saturday morning
+    assert index.on_shift(datetime(2025, 6, 7, 3, 0)) == {"AMB002"}
+    # Sunday night shift wraps into Monday morning of the next week
+    assert index.on_shift(datetime(2025, 6, 2, 5, 59)) == {"AMB002"}
+    assert index.on_shift(datetime(2025, 6, 2, 6, 0)) == frozenset()
+    assert index.on_shift(datetime(2025, 6, 7, 12, 0)) == {"AMB003"}
+
+
+def test_bulk_queries_match_brute_force():
+    shifts = make_shifts()
+    index = WeeklyAvailabilityIndex(shifts)
+    moments = [datetime.combine(MONDAY, time(0, 0)) + timedelta(minutes=17 * step) for step in range(600)]
+
+    assert index.on_shift_many(moments) == [brute_force_on_shift(shifts, m) for m in moments]
+
+    saturday = index.day_schedule(MONDAY + timedelta(days=5))
+    assert saturday[0][0] == datetime(2025, 6, 7, 0, 0)
+    assert saturday[-1][1] == datetime(2025, 6, 8, 0, 0)
+    assert ({"AMB003"}, {"AMB002"}) == (
+        set(index.on_shift(datetime(2025, 6, 7, 11, 0))), set(saturday[0][2]))
+
+
+def test_agent_uses_week_aware_availability():
+    ambassadors = [Ambassador(f"AMB00{i}", f"Ambassador {i}", [], ["English"], 4.5) for i in range(1, 5)]
+    agent = AvailabilityAgent()
+
+    available = agent.check_availability(None, ambassadors, make_shifts(), datetime(2025, 6, 7, 23, 0))
+    assert list(available) == ["AMB002"]
+    assert available["AMB002"]["active_shifts"][0].name == "Night"
@@ -0,0 +1,44 @@
+import copy
+import os
+import sys
+
+import pandas as pd
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from benchmarks.pipeline_benchmark import STAGES, compare, run_case
+from benchmarks.synthetic_data import generate_sheets
+from core.sqlite_store import TABLES
+from tests.test_data_loader import EXCEL_PATH
+
+
+def test_generated_sheets_are_seeded_and_match_the_workbook_schema():
+    sheets = generate_sheets(300, 20, seed=3)
+    again = generate_sheets(300, 20, seed=3)
+    for sheet, _ in TABLES.values():
+        pd.testing.assert_frame_equal(sheets[sheet], again[sheet])
+        assert list(sheets[sheet].columns) == list(pd.read_excel(EXCEL_PATH, sheet_name=sheet).columns)
+    assert not sheets['Tickets'].equals(generate_sheets(300, 20, seed=4)['Tickets'])
+
+
+def test_pipeline_benchmark_times_every_stage_and_flags_regressions(tmp_path):
+    for source in ('xlsx', 'sqlite'):
+        case = run_case(400, 20, seed=3, source=source, mode='vectorized', workdir=str(tmp_path))
+        assert set(case['stages']) == set(STAGES)
+        assert case['backlog'] == 200
+        assert case['matched'] == case['backlog']
+
+    baseline = {'cases': [case]}
+    assert not any(row['regression'] for row in compare({'cases': [case]}, baseline, 0.25, 0.0))
+    slower = copy.deepcopy(case)
+    slower['stages']['scoring'] = case['stages']['scoring'] * 2 + 1
+    rows = compare({'cases': [slower]}, baseline, 0.25, 0.05)
+    assert [row['stage'] for row in rows if row['regression']] == ['scoring']
+
+    # A stage shorter than the floor only has to beat timer noise, a longer one the floor
+    slower['stages'].update(scoring=0.01 * 1.7, profile=0.0004 * 2, load=1.0 * 1.3, save=0.1 + 0.04)
+    baseline = {'cases': [dict(case, stages=dict(case['stages'], scoring=0.01, profile=0.0004, load=1.0, save=0.1))]}
+    rows = compare({'cases': [slower]}, baseline, 0.25, 0.05)
+    assert sorted(row['stage'] for row in rows if row['regression']) == ['load', 'scoring']
@@ -0,0 +1,170 @@
+import os
+import shutil
+import sys
+
+import pandas as pd
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from core.data_loader import DataLoader
+
+EXCEL_PATH = os.path.join(project_root, "data", "mock_data.xlsx")
+
+
+def test_columnar_loader_matches_row_loader():
+    """The single-pass columnar loader builds exactly the same objects as the iterrows loader."""
+    row_data = DataLoader(EXCEL_PATH, columnar=False, use_snapshot=False).load_data()
+    columnar_data = DataLoader(EXCEL_PATH, columnar=True, use_snapshot=False).load_data()
+
+    assert columnar_data == row_data
+    tickets, ambassadors, shifts = columnar_data
+    assert tickets and ambassadors and shifts
+    assert all(ticket.secondary_product is None or isinstance(ticket.secondary_product, str) for ticket in tickets)
+
+
+def test_snapshot_is_reused_until_workbook_changes(tmp_path):
+    """A warm load is served from the snapshot, and a modified workbook is never served stale."""
+    workbook = tmp_path / "mock_data.xlsx"
+    shutil.copy(EXCEL_PATH, workbook)
+
+    cold_loader = DataLoader(str(workbook))
+    cold_data = cold_loader.load_data()
+    assert not cold_loader.snapshot_hit
+
+    warm_loader = DataLoader(str(workbook))
+    assert warm_loader.load_data() == cold_data
+    assert warm_loader.snapshot_hit
+
+    # Rewrite the workbook with a changed ticket
+    sheets = pd.read_excel(workbook, sheet_name=None)
+    sheets['Tickets'].loc[0, 'Language'] = 'Klingon'
+    with pd.ExcelWriter(workbook, engine='openpyxl') as writer:
+        for name, df in sheets.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+
+    stale_loader = DataLoader(str(workbook))
+    tickets, _, _ = stale_loader.load_data()
+    assert not stale_loader.snapshot_hit
+    assert tickets[0].language == 'Klingon'
+
+    refreshed_loader = DataLoader(str(workbook))
+    refreshed_loader.load_data(refresh=True)
+    assert not refreshed_loader.snapshot_hit
+
+    refreshed_loader.invalidate_snapshot()
+    assert not os.path.exists(refreshed_loader.snapshot.snapshot_path)
+
+
+def test_shift_index_groups_shifts_by_ambassador():
+    """The loader builds a shift index once and derives ambassador lines of business from it."""
+    loader = DataLoader(EXCEL_PATH, use_snapshot=False)
+    _, ambassadors, shifts = loader.load_data()
+
+    for ambassador in ambassadors:
+        own_shifts = [shift for shift in shifts if shift.ambassador_id == ambassador.id]
+        assert loader.shift_index.for_ambassador(ambassador.id) == own_shifts
+        assert ambassador.line_of_business == list(dict.fromkeys(shift.line_of_business for shift in own_shifts))
+
+
+def test_categories_are_normalized_and_interned():
+    from core.vocabulary import CategoricalEncoder, has_code
+    from core.data_models import Ambassador, Ticket
+
+    loader = DataLoader(EXCEL_PATH, use_snapshot=False)
+    tickets, ambassadors, shifts = loader.load_data()
+    encoder = loader.encoder
+    for ticket in tickets:
+        assert encoder.languages.decode(ticket.language_code) == ticket.language
+    for shift in shifts:
+        assert encoder.lines_of_business.decode(shift.lob_code) == shift.line_of_business
+
+    encoder = CategoricalEncoder()
+    ambassador = encoder.encode_ambassador(Ambassador("AMB1", "A", ["CoPilot Welcome"], "English, Spanish".split(","), 4.5))
+    ticket = encoder.encode_ticket(Ticket("T1", "copilot  welcome", "Teams", "F", "D", None, None, "S", "Weak", "D", "Low", " spanish"))
+    assert ambassador.languages == ["English", "Spanish"]
+    assert ticket.language == "Spanish" and ticket.line_of_business == "CoPilot Welcome"
+    assert has_code(ambassador.language_mask, ticket.language_code)
+    assert has_code(ambassador.lob_mask, ticket.lob_code)
+    assert not has_code(ambassador.language_mask, encoder.languages.encode("French"))
+
+
+def test_expertise_index_joins_case_history_to_tickets():
+    """Case histories are joined against the Tickets sheet at load time."""
+    from agents.ambassador_profiling_agent import AmbassadorProfilingAgent
+
+    loader = DataLoader(EXCEL_PATH, use_snapshot=False)
+    tickets, ambassadors, _ = loader.load_data()
+    index = loader.expertise_index
+    by_case = {ticket.case_number: ticket for ticket in tickets}
+
+    ambassador = next(a for a in ambassadors if a.case_history)
+    expected = {}
+    for case_number in ambassador.case_history:
+        product = by_case[case_number].primary_product
+        expected[product] = expected.get(product, 0) + 1
+    assert set(index.past_products(ambassador.id)) == set(expected)
+    product, count = next(iter(expected.items()))
+    assert index.product_count(ambassador.id, product.upper()) == count
+
+    profiling = AmbassadorProfilingAgent()
+    profiling.use_expertise_index(index)
+    profiles = profiling.analyze_conversation_history(ambassadors)
+    assert profiles[ambassador.id]["past_products"] == index.past_products(ambassador.id)
+    assert profiling.get_expertise_score(ambassador.id, product) == min(1.0, count / 10)
+    assert profiling.get_expertise_score(ambassador.id, "No Such Product") == 0.0
+
+    # Newly recorded cases are joined incrementally
+    other = next(t for t in tickets if t.case_number not in ambassador.case_history)
+    profiling.record_case(ambassador.id, other.case_number)
+    assert other.primary_product in profiles[ambassador.id]["past_products"]
+
+
+def test_sqlite_store_loads_like_the_workbook_and_round_trips(tmp_path):
+    """A store imported from the workbook loads the same objects and exports the same sheets."""
+    from core.sqlite_store import SQLiteStore
+
+    store_path = str(tmp_path / "ticketmatch.sqlite")
+    SQLiteStore(store_path).import_workbook(EXCEL_PATH)
+
+    store_loader = DataLoader(store_path)
+    assert store_loader.load_data() == DataLoader(EXCEL_PATH, use_snapshot=False).load_data()
+
+    exported = str(tmp_path / "exported.xlsx")
+    store_loader.store.export_workbook(exported)
+    original = pd.read_excel(EXCEL_PATH, sheet_name=None)
+    for sheet, df in pd.read_excel(exported, sheet_name=None).items():
+        pd.testing.assert_frame_equal(df, original[sheet], check_dtype=False)
+
+
+def test_sqlite_store_reads_unassigned_by_index_and_claims_tickets_once(tmp_path):
+    """Unassigned tickets come from the assigned index, and a ticket is only ever claimed by one run."""
+    import sqlite3
+    from core.sqlite_store import SQLiteStore
+
+    store_path = str(tmp_path / "ticketmatch.sqlite")
+    SQLiteStore(store_path).import_workbook(EXCEL_PATH)
+    with sqlite3.connect(store_path) as db:
+        db.execute("UPDATE tickets SET assigned = 0, ambassador = NULL, ambassador_id = NULL "
+                   "WHERE case_number IN ('TCKT003', 'TCKT004')")
+        plan = " ".join(str(row) for row in db.execute("EXPLAIN QUERY PLAN SELECT * FROM tickets WHERE assigned = 0"))
+    assert "idx_tickets_assigned" in plan
+
+    loader = DataLoader(store_path, unassigned_only=True)
+    tickets, ambassadors, _ = loader.load_data()
+    assert [ticket.case_number for ticket in tickets] == ["TCKT003", "TCKT004"]
+    # Case histories are still joined against every stored ticket
+    full = DataLoader(EXCEL_PATH, use_snapshot=False)
+    full.load_data()
+    assert loader.expertise_index.products == full.expertise_index.products
+
+    names = {ambassador.id: ambassador.name for ambassador in ambassadors}
+    assignments = {"TCKT003": ("AMB001", "Match"), "TCKT004": (None, "No available ambassadors")}
+    other_run = SQLiteStore(store_path)
+    assert loader.store.save_assignments(assignments, names) == 1
+    assert other_run.save_assignments({"TCKT003": ("AMB002", "Match")}, names) == 0
+    assert other_run.conflicts == 1
+
+    remaining, _, _ = DataLoader(store_path, unassigned_only=True).load_data()
+    assert [ticket.case_number for ticket in remaining] == ["TCKT004"]
@@ -0,0 +1,82 @@
+import json
+import os
+import sys
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from agents.matching_agent import MatchingAgent
+from core.metrics import Metrics, metrics
+from tests.test_scoring import make_dataset, NOW
+
+
+def test_registry_records_nothing_while_disabled():
+    registry = Metrics()
+    registry.inc('calls_total')
+    registry.observe('duration_seconds', 0.5, operation='x')
+    with registry.timer('stage_seconds', stage='load'):
+        pass
+
+    @registry.timed()
+    def work(value):
+        return value * 2
+
+    assert work(21) == 42
+    assert not registry.counters and not registry.histograms
+
+    registry.enable()
+    assert work(1) == 2
+    registry.inc('calls_total', 2, outcome='ok')
+    registry.inc('calls_total', outcome='error')
+    for value in (0.002, 0.003, 0.2, 7.0):
+        registry.observe('llm_call_seconds', value, outcome='ok')
+
+    assert registry.counter('calls_total') == 3
+    assert registry.counter('calls_total', outcome='ok') == 2
+    histogram = registry.histograms[('llm_call_seconds', (('outcome', 'ok'),))]
+    assert (histogram.count, histogram.max) == (4, 7.0)
+    assert histogram.quantile(0.5) == 0.005
+    assert histogram.quantile(1.0) == 7.0
+    summary = json.loads(json.dumps(registry.summary()))
+    assert summary['derived']['llm_calls'] == 4
+    assert any(entry['labels'] == {'operation': work.__qualname__} for entry in summary['histograms'])
+
+
+def test_prometheus_snapshot_format():
+    registry = Metrics(enabled=True)
+    registry.inc('tickets_matched_total', 3, mode='vectorized')
+    registry.observe('duration_seconds', 0.003, operation='DataLoader.load_data')
+    text = registry.prometheus()
+    lines = text.splitlines()
+
+    assert "# TYPE ticketmatch_tickets_matched_total counter" in lines
+    assert 'ticketmatch_tickets_matched_total{mode="vectorized"} 3' in lines
+    assert "# TYPE ticketmatch_duration_seconds histogram" in lines
+    assert 'ticketmatch_duration_seconds_bucket{operation="DataLoader.load_data",le="0.0025"} 0' in lines
+    assert 'ticketmatch_duration_seconds_bucket{operation="DataLoader.load_data",le="0.005"} 1' in lines
+    assert 'ticketmatch_duration_seconds_bucket{operation="DataLoader.load_data",le="+Inf"} 1' in lines
+    assert 'ticketmatch_duration_seconds_count{operation="DataLoader.load_data"} 1' in lines
+    assert "# TYPE ticketmatch_tickets_matched_per_second gauge" in lines
+    assert text.endswith("\n")
+
+
+def test_matching_records_throughput_and_candidates_per_ticket():
+    tickets, ambassadors, shifts = make_dataset(seed=4, n_tickets=120, n_ambassadors=15)
+    metrics.reset()
+    metrics.enable()
+    try:
+        assigned = MatchingAgent().process_tickets(tickets, ambassadors, shifts, NOW, mode='vectorized')
+        derived = metrics.derived()
+        matched = sum(1 for ambassador_id, _ in assigned.values() if ambassador_id)
+        assert metrics.counter('tickets_matched_total', mode='vectorized') == matched
+        assert metrics.counter('tickets_unmatched_total', mode='vectorized') == len(tickets) - matched
+        assert metrics.counter('tickets_scored_total') == len(tickets)
+        assert 0 < derived['candidates_per_ticket'] <= len(ambassadors)
+        assert derived['tickets_matched_per_second'] > 0
+        operations = {dict(labels).get('operation') for name, labels in metrics.histograms}
+        assert {'MatchingAgent.process_tickets', 'AvailabilityAgent.check_availability',
+                'AmbassadorProfilingAgent.analyze_conversation_history'} <= operations
+    finally:
+        metrics.disable()
+        metrics.reset()
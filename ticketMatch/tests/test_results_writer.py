@@ -0,0 +1,90 @@
+import json
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from benchmarks.synthetic_data import generate_sheets
+from core.data_loader import DataLoader
+from core.results_writer import ResultsWriter, apply_assignments
+from core.sqlite_store import SQLiteStore
+
+NAMES = {"AMB1": "Ada", "AMB2": "Grace"}
+ASSIGNMENTS = {"C1": ("AMB1", "Match"), "C3": ("AMB2", "Match"), "C4": (None, "No available ambassadors"),
+               "C9": ("AMB3", "Match")}
+
+
+def tickets_sheet():
+    return pd.DataFrame({"Case Number": ["C1", "C2", "C3", "C4"], "assigned": [False] * 4, "ambassador": [None] * 4})
+
+
+def test_apply_assignments_matches_row_by_row_update():
+    expected = tickets_sheet()
+    for ticket_id, (ambassador_id, _) in ASSIGNMENTS.items():
+        if ambassador_id:
+            mask = expected['Case Number'] == ticket_id
+            expected.loc[mask, 'assigned'] = True
+            expected.loc[mask, 'ambassador'] = NAMES.get(ambassador_id, ambassador_id)
+
+    df = tickets_sheet()
+    assert apply_assignments(df, ASSIGNMENTS, NAMES) == 2
+    pd.testing.assert_frame_equal(df, expected)
+
+
+@pytest.mark.parametrize("extension", ["jsonl", "csv"])
+def test_results_are_appended_once(tmp_path, extension):
+    path = str(tmp_path / "out" / f"assignments.{extension}")
+    writer = ResultsWriter(path)
+    assert writer.save(ASSIGNMENTS, NAMES) == 4
+    assert writer.save(ASSIGNMENTS, NAMES) == 0
+    assert writer.save({**ASSIGNMENTS, "C5": ("AMB2", "Match"), "C4": ("AMB1", "Match")}, NAMES) == 2
+
+    if extension == "jsonl":
+        with open(path) as f:
+            records = [json.loads(line) for line in f]
+    else:
+        records = pd.read_csv(path).replace({float("nan"): None}).to_dict("records")
+    assert [record["case_number"] for record in records] == ["C1", "C3", "C4", "C9", "C4", "C5"]
+    assert records[0]["ambassador"] == "Ada" and records[2]["ambassador"] is None
+    assert records[4]["ambassador_id"] == "AMB1"
+
+
+def test_unknown_results_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        ResultsWriter(str(tmp_path / "assignments.txt"))
+
+
+@pytest.mark.parametrize("extension", ["jsonl", "csv"])
+def test_new_writer_resumes_from_the_log(tmp_path, extension):
+    path = str(tmp_path / f"assignments.{extension}")
+    assert ResultsWriter(path).save(ASSIGNMENTS, NAMES) == 4
+
+    writer = ResultsWriter(path)
+    assert writer.assigned() == {"C1": "AMB1", "C3": "AMB2", "C9": "AMB3"}
+    assert writer.save(ASSIGNMENTS, NAMES) == 0
+    writer.add({"C4": ("AMB1", "Match")})
+    writer.add({"C4": (None, "No available ambassadors")})
+    assert writer.save(None, NAMES) == 0
+    writer.add({"C5": ("AMB2", "Match")})
+    assert writer.save(None, NAMES) == 1
+    assert ResultsWriter(path).assigned()["C5"] == "AMB2"
+
+
+def test_logged_tickets_load_as_assigned(tmp_path):
+    store_path = str(tmp_path / "ticketmatch.sqlite")
+    store = SQLiteStore(store_path)
+    store.import_sheets(generate_sheets(40, 5, seed=3))
+    store.close()
+    tickets, ambassadors, _ = DataLoader(store_path, unassigned_only=True).load_data()
+    backlog = [ticket.case_number for ticket in tickets]
+    logged = {backlog[0]: ambassadors[0].id, "TCKT999": ambassadors[0].id}
+
+    tickets, ambassadors, _ = DataLoader(store_path, unassigned_only=True, assigned=logged).load_data()
+    assert [ticket.case_number for ticket in tickets] == backlog[1:]
+    # Old and unknown log entries never consume capacity
+    assert all(ambassador.current_tickets == 0 for ambassador in ambassadors)
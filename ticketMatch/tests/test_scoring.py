@@ -0,0 +1,339 @@
+import dataclasses
+import os
+import random
+import sys
+from datetime import datetime, time
+
+import numpy as np
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from agents.matching_agent import MatchingAgent
+from core.data_models import Ambassador, Shift, Ticket
+from core.vocabulary import CategoricalEncoder
+
+LANGUAGES = ["English", "Spanish", "French", "German"]
+LINES_OF_BUSINESS = ["CoPilot Welcome", "Proactive Grace", "Business Advisor Reactive"]
+PRODUCTS = ["Teams", "Outlook", "SharePoint", "Excel"]
+PROFICIENCY = ["Weak", "Moderate", "Strong", "Expert", "Advanced"]
+URGENCY = ["Low", "Medium", "High"]
+# A Wednesday morning, inside every generated shift
+NOW = datetime(2025, 6, 4, 10, 0)
+
+
+def make_dataset(seed=7, n_tickets=200, n_ambassadors=25):
+    """Random tickets, ambassadors and all-week shifts for scoring tests."""
+    rng = random.Random(seed)
+    tickets = [
+        Ticket(
+            case_number=f"TCKT{i:05d}",
+            line_of_business=rng.choice(LINES_OF_BUSINESS),
+            primary_product=rng.choice(PRODUCTS),
+            primary_feature="Feature",
+            specific_primary_driver="Driver",
+            secondary_product=None,
+            specific_secondary_feature=None,
+            issue_summary="Summary",
+            technical_proficiency=rng.choice(PROFICIENCY),
+            detailed_description="Description",
+            urgency=rng.choice(URGENCY),
+            language=rng.choice(LANGUAGES)
+        )
+        for i in range(n_tickets)
+    ]
+    ambassadors = [
+        Ambassador(
+            id=f"AMB{i:04d}",
+            name=f"Ambassador {i}",
+            line_of_business=rng.sample(LINES_OF_BUSINESS, rng.randint(1, 2)),
+            languages=rng.sample(LANGUAGES, rng.randint(1, 2)),
+            csat_score=round(rng.uniform(3.0, 5.0), 2),
+            case_history=[],
+            current_tickets=rng.randint(0, 2)
+        )
+        for i in range(n_ambassadors)
+    ]
+    shifts = [
+        Shift(a.id, a.name, a.line_of_business[0], "Mon to Sun", time(0, 0), time(0, 0))
+        for a in ambassadors
+    ]
+    return tickets, ambassadors, shifts
+
+
+def test_score_matrix_matches_scalar_scores():
+    tickets, ambassadors, _ = make_dataset()
+    agent = MatchingAgent()
+    profiles = agent.profiling_agent.analyze_conversation_history(ambassadors)
+    ambassador_ids = [a.id for a in ambassadors]
+
+    scores = agent.score_matrix(tickets, ambassador_ids, profiles)
+
+    expected = np.array([
+        [agent._calculate_match_score(ticket, profiles[ambassador_id])[0] for ambassador_id in ambassador_ids]
+        for ticket in tickets
+    ])
+    np.testing.assert_allclose(scores, expected, rtol=0, atol=1e-12)
+
+
+def test_vectorized_mode_matches_scalar_mode():
+    scalar_data = make_dataset()
+    vector_data = make_dataset()
+
+    scalar = MatchingAgent().process_tickets(*scalar_data, current_time=NOW)
+    vector_agent = MatchingAgent()
+    vector_agent.chunk_size = 64
+    vectorized = vector_agent.process_tickets(*vector_data, current_time=NOW, mode="vectorized")
+
+    assert vectorized == scalar
+
+
+def test_encoded_batches_match_on_codes_not_strings():
+    tickets, ambassadors, shifts = make_dataset(seed=6)
+    CategoricalEncoder().encode(tickets, ambassadors, shifts)
+    for ticket in tickets:
+        # Stale spellings: only the interned codes still say what matches
+        ticket.language = ticket.language.upper()
+        ticket.line_of_business = ticket.line_of_business.lower()
+    agent = MatchingAgent()
+    profiles = agent.profiling_agent.analyze_conversation_history(ambassadors)
+    ambassador_ids = [a.id for a in ambassadors]
+
+    scores = agent.score_matrix(tickets, ambassador_ids, profiles)
+
+    expected = np.array([
+        [agent._calculate_match_score(ticket, profiles[ambassador_id])[0] for ambassador_id in ambassador_ids]
+        for ticket in tickets
+    ])
+    np.testing.assert_allclose(scores, expected, rtol=0, atol=1e-12)
+    assert (scores >= 0.55).any()  # Some pairs match on both language and line of business
+
+
+def test_profile_bitsets_wider_than_the_ticket_codes():
+    """Ambassadors are encoded first, so their bitsets can hold codes past 64 that no ticket uses."""
+    tickets, ambassadors, shifts = make_dataset(seed=8, n_tickets=5, n_ambassadors=70)
+    for i, (ambassador, shift) in enumerate(zip(ambassadors, shifts)):
+        ambassador.line_of_business = [f"LOB{i}"]
+        shift.line_of_business = f"LOB{i}"
+    for ticket in tickets:
+        ticket.line_of_business = "LOB0"
+    CategoricalEncoder().encode(tickets, ambassadors, shifts)
+    assert ambassadors[-1].lob_mask >= 1 << 64
+
+    agent = MatchingAgent()
+    profiles = agent.profiling_agent.analyze_conversation_history(ambassadors)
+    ambassador_ids = [a.id for a in ambassadors]
+    expected = np.array([
+        [agent._calculate_match_score(ticket, profiles[ambassador_id])[0] for ambassador_id in ambassador_ids]
+        for ticket in tickets
+    ])
+    np.testing.assert_allclose(agent.score_matrix(tickets, ambassador_ids, profiles), expected, rtol=0, atol=1e-12)
+
+    assigned = MatchingAgent().process_tickets(tickets, ambassadors, shifts, current_time=NOW, mode="vectorized")
+    assert all(ambassador_id for ambassador_id, _ in assigned.values())
+
+
+def test_optimal_assignment_respects_capacity_and_beats_greedy():
+    from agents.assignment_solver import greedy_assignment, optimal_assignment, total_score
+
+    # Greedy gives ticket 0 the shared favourite and leaves ticket 1 with a poor match
+    scores = np.array([[0.9, 0.8], [0.9, 0.1]])
+    capacity = np.array([1, 1])
+    assert greedy_assignment(scores, capacity).tolist() == [0, 1]
+    assert optimal_assignment(scores, capacity).tolist() == [1, 0]
+
+    tickets, ambassadors, shifts = make_dataset(n_tickets=120, n_ambassadors=30)
+    free_slots = {a.id: a.max_active_tickets - a.current_tickets for a in ambassadors}
+    agent = MatchingAgent()
+    assigned = agent.process_tickets(tickets, ambassadors, shifts, current_time=NOW, mode="optimal")
+
+    load = {}
+    for ambassador_id, _ in assigned.values():
+        if ambassador_id:
+            load[ambassador_id] = load.get(ambassador_id, 0) + 1
+    for ambassador in ambassadors:
+        assert load.get(ambassador.id, 0) <= free_slots[ambassador.id]
+        assert ambassador.current_tickets <= ambassador.max_active_tickets
+
+    report = agent.last_assignment_report
+    assert report["assigned"] == sum(load.values())
+    assert report["total_score"] >= report["greedy_total_score"] - 1e-9
+    assert report["gain"] == report["total_score"] - report["greedy_total_score"]
+
+
+def test_workload_is_tracked_across_assignments_and_releases():
+    tickets, ambassadors, shifts = make_dataset(n_tickets=100, n_ambassadors=10)
+    initial_load = sum(a.current_tickets for a in ambassadors)
+    agent = MatchingAgent()
+    assigned = agent.process_tickets(tickets, ambassadors, shifts, current_time=NOW)
+
+    matched = [ticket_id for ticket_id, (ambassador_id, _) in assigned.items() if ambassador_id]
+    assert sum(a.current_tickets for a in ambassadors) == initial_load + len(matched)
+    assert all(a.current_tickets <= a.max_active_tickets for a in ambassadors)
+    assert not agent.workload.open_ids()
+
+    released_from = agent.release_ticket(matched[0])
+    assert released_from == assigned[matched[0]][0]
+    assert agent.workload.open_ids() == {released_from}
+    assert agent.profiling_agent.get_ambassador_profile(released_from)["current_tickets"] == 2
+
+
+def test_lazy_explanations_match_eager_explanations():
+    eager_agent = MatchingAgent()
+    eager_agent.lazy_explanations = False
+    eager = eager_agent.process_tickets(*make_dataset(seed=3), current_time=NOW)
+
+    lazy_agent = MatchingAgent()
+    lazy_agent.explain_top_k = 3
+    lazy = lazy_agent.process_tickets(*make_dataset(seed=3), current_time=NOW)
+
+    assert lazy == eager
+    for ticket_id, (ambassador_id, explanation) in lazy.items():
+        if ambassador_id:
+            top = lazy_agent.top_matches[ticket_id]
+            assert top[0][0] == ambassador_id
+            assert explanation == f"Match score: {top[0][1]:.2%} - {top[0][2]}"
+            assert [score for _, score, _ in top] == sorted((score for _, score, _ in top), reverse=True)
+
+
+def test_candidate_index_prunes_and_ranks_candidates():
+    from agents.candidate_index import CandidateIndex
+
+    tickets, ambassadors, _ = make_dataset(seed=5, n_tickets=50, n_ambassadors=40)
+    agent = MatchingAgent()
+    profiles = agent.profiling_agent.analyze_conversation_history(ambassadors)
+    index = CandidateIndex(profiles, agent._score_match)
+
+    for ticket in tickets:
+        candidates = index.candidates(ticket)
+        both = [a.id for a in ambassadors
+                if ticket.language in a.languages and ticket.line_of_business in a.line_of_business]
+        if both:
+            assert candidates == both
+
+        top = index.top_k(ticket, 3)
+        expected = sorted(((a, agent._score_match(ticket, profiles[a])) for a in candidates),
+                          key=lambda item: item[1], reverse=True)[:3]
+        assert top == expected
+
+    # Widening: nobody speaks the language, so line of business alone decides
+    ticket = tickets[0]
+    ticket.language = "Klingon"
+    assert index.candidates(ticket) == [a.id for a in ambassadors if ticket.line_of_business in a.line_of_business]
+    assert index.candidates(ticket, available={ambassadors[0].id}) == [ambassadors[0].id]
+
+
+def test_matching_with_candidate_index_only_assigns_candidates():
+    tickets, ambassadors, shifts = make_dataset(seed=6)
+    agent = MatchingAgent()
+    agent.use_candidate_index = True
+    assigned = agent.process_tickets(tickets, ambassadors, shifts, current_time=NOW)
+
+    by_id = {a.id: a for a in ambassadors}
+    for ticket in tickets:
+        ambassador_id, _ = assigned[ticket.case_number]
+        if ambassador_id and any(ticket.language in a.languages and ticket.line_of_business in a.line_of_business
+                                 for a in ambassadors):
+            # A full-match candidate existed at some point; the winner shares at least one of the two
+            winner = by_id[ambassador_id]
+            assert ticket.language in winner.languages or ticket.line_of_business in winner.line_of_business
+
+
+def test_profiles_are_cached_across_calls_and_updated_incrementally():
+    tickets, ambassadors, shifts = make_dataset(seed=8, n_tickets=20, n_ambassadors=10)
+    agent = MatchingAgent()
+    for ticket in tickets:
+        agent.process_tickets([ticket], ambassadors, shifts, current_time=NOW)
+
+    profiling = agent.profiling_agent
+    assert profiling.cache_stats()["misses"] == len(ambassadors)
+    assert profiling.cache_stats()["hits"] == len(ambassadors) * (len(tickets) - 1)
+
+    # Workload changes from assignments are reflected without rebuilding
+    for ambassador in ambassadors:
+        assert profiling.get_ambassador_profile(ambassador.id)["current_tickets"] == ambassador.current_tickets
+
+    target = ambassadors[0]
+    profiling.update_csat(target.id, 1.0)
+    profiling.record_case(target.id, "TCKT99999")
+    profile = profiling.get_ambassador_profile(target.id)
+    assert profile["performance_metrics"]["customer_satisfaction"] == 1.0
+    assert profile["case_history"][-1] == "TCKT99999"
+
+    target.languages = ["Klingon"]
+    profiling.update_ambassador(target)
+    assert profiling.cache_stats()["misses"] == len(ambassadors) + 1
+    assert agent.top_k(Ticket("T", "X", "Y", "F", "D", None, None, "S", "Weak", "D", "Low", "Klingon"), 1)[0][0] == target.id
+
+    # Swapping an ambassador for another keeps the list length but must not keep the old profile
+    removed = ambassadors[1].id
+    ambassadors[1] = dataclasses.replace(ambassadors[1], id="AMB-NEW")
+    profiles = profiling.analyze_conversation_history(ambassadors)
+    assert set(profiles) == {ambassador.id for ambassador in ambassadors}
+    assert removed not in profiles
+
+
+TOPICS = {
+    "Teams": "teams meeting audio drops video call freezes",
+    "Outlook": "outlook calendar invite mailbox sync rules",
+    "SharePoint": "sharepoint site permissions document library upload",
+    "Excel": "excel formula pivot table workbook macro",
+}
+
+
+def make_semantic_dataset(seed=11, n_history=400, n_tickets=120, n_ambassadors=20):
+    """make_dataset, with ticket text about the product and case histories from past tickets."""
+    rng = random.Random(seed)
+    history, _, _ = make_dataset(seed, n_history, 1)
+    tickets, ambassadors, shifts = make_dataset(seed + 1, n_tickets, n_ambassadors)
+    for i, ticket in enumerate(history + tickets):
+        words = TOPICS[ticket.primary_product].split()
+        ticket.case_number = f"{'HIST' if i < n_history else 'TCKT'}{i:05d}"
+        ticket.issue_summary = " ".join(rng.sample(words, 3))
+        ticket.detailed_description = " ".join(rng.sample(words, 4) + [f"user{rng.randrange(50)}"])
+    for ambassador in ambassadors:
+        # Each ambassador mostly handled one product
+        product = rng.choice(PRODUCTS)
+        ambassador.case_history = [t.case_number for t in history if t.primary_product == product][:20]
+    return history, tickets, ambassadors, shifts
+
+
+def test_semantic_index_ranks_ambassadors_by_past_cases():
+    from core.semantic_index import SemanticIndex
+
+    history, tickets, ambassadors, _ = make_semantic_dataset()
+    index = SemanticIndex.build(history, ambassadors, n_features=1 << 12)
+    product_of = {t.case_number: t.primary_product for t in history}
+    specialty = {a.id: product_of[a.case_history[0]] for a in ambassadors}
+
+    similarity = index.similarity_matrix(tickets, [a.id for a in ambassadors] + ["UNKNOWN"])
+    assert similarity.shape == (len(tickets), len(ambassadors) + 1)
+    assert np.all(similarity[:, -1] == 0.0)
+    assert np.all((similarity >= 0.0) & (similarity <= 1.0 + 1e-12))
+
+    for ticket, neighbours in zip(tickets, index.nearest(tickets, k=3)):
+        assert specialty[neighbours[0][0]] == ticket.primary_product
+        assert [score for _, score in neighbours] == sorted((score for _, score in neighbours), reverse=True)
+
+
+def test_semantic_similarity_term_is_identical_across_modes():
+    from core.semantic_index import SemanticIndex
+
+    results = {}
+    for mode in ("scalar", "vectorized"):
+        history, tickets, ambassadors, shifts = make_semantic_dataset()
+        agent = MatchingAgent()
+        agent.chunk_size = 32
+        agent.semantic_index = SemanticIndex.build(history, ambassadors, n_features=1 << 12)
+        agent.similarity_weight = 0.3
+        results[mode] = agent.process_tickets(tickets, ambassadors, shifts, current_time=NOW, mode=mode)
+    assert results["vectorized"] == results["scalar"]
+    assert any("Similar past cases" in explanation for _, explanation in results["scalar"].values())
+
+    # A zero weight leaves matching exactly as without an index
+    history, tickets, ambassadors, shifts = make_semantic_dataset()
+    agent = MatchingAgent()
+    agent.semantic_index = SemanticIndex.build(history, ambassadors, n_features=1 << 12)
+    baseline = MatchingAgent().process_tickets(*make_semantic_dataset()[1:], current_time=NOW)
+    assert agent.process_tickets(tickets, ambassadors, shifts, current_time=NOW) == baseline
@@ -0,0 +1,100 @@
+import http.client
+import json
+import os
+import sys
+import threading
+from collections import Counter
+
+import pytest
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from service import MatchingService, create_server
+from tests.test_data_loader import EXCEL_PATH
+from tests.test_scoring import NOW
+
+
+@pytest.fixture
+def server():
+    httpd = create_server(MatchingService(EXCEL_PATH, current_time=NOW), port=0)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def call(httpd, method, path, body=None):
+    connection = http.client.HTTPConnection(*httpd.server_address[:2], timeout=30)
+    try:
+        connection.request(method, path, None if body is None else json.dumps(body).encode(),
+                           {"Content-Type": "application/json"})
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+def ticket(case_number, language="English"):
+    return {"case_number": case_number, "line_of_business": "CoPilot Welcome", "primary_product": "Outlook",
+            "language": language, "urgency": "High", "technical_proficiency": "Expert"}
+
+
+def test_match_endpoints_and_errors(server):
+    status, result = call(server, "POST", "/match", ticket("S1"))
+    assert status == 200 and result["case_number"] == "S1" and result["ambassador_id"]
+
+    status, results = call(server, "POST", "/match/batch", [ticket("S2"), ticket("S3"), {"urgency": "High"}])
+    assert status == 200
+    assert [result["case_number"] for result in results] == ["S2", "S3", None]
+    assert results[2]["ambassador_id"] is None
+
+    assert call(server, "POST", "/match", [ticket("S4")])[0] == 400
+    assert call(server, "POST", "/nowhere", {})[0] == 404
+
+    status, health = call(server, "GET", "/health")
+    assert status == 200 and health["tickets"] == 4 and health["assigned"] == 3
+
+
+def test_oversized_body_is_rejected_and_the_connection_closed(server, monkeypatch):
+    import service
+    monkeypatch.setattr(service, "MAX_BODY_BYTES", 64)
+    connection = http.client.HTTPConnection(*server.server_address[:2], timeout=30)
+    try:
+        connection.request("POST", "/match", json.dumps(ticket("S" * 100)).encode(), {"Content-Type": "application/json"})
+        response = connection.getresponse()
+        assert response.status == 400 and json.loads(response.read())["error"] == "Request body too large"
+        assert response.getheader("Connection") == "close"
+    finally:
+        connection.close()
+    monkeypatch.undo()
+    assert call(server, "POST", "/match", ticket("S5"))[0] == 200
+
+
+def test_concurrent_requests_never_exceed_capacity_and_reload_resets(server):
+    service = server.service
+    capacity = sum(a.max_active_tickets - a.current_tickets for a in service.matcher.ambassadors)
+    results = []
+
+    def client(number):
+        for i in range(10):
+            results.append(call(server, "POST", "/match", ticket(f"C{number}-{i}"))[1])
+
+    threads = [threading.Thread(target=client, args=(number,)) for number in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assigned = Counter(result["ambassador_id"] for result in results if result["ambassador_id"])
+    assert len(results) == 60
+    assert sum(assigned.values()) <= capacity
+    for ambassador in service.matcher.ambassadors:
+        assert assigned[ambassador.id] == ambassador.current_tickets <= ambassador.max_active_tickets
+
+    status, reload = call(server, "POST", "/reload")
+    assert status == 200 and reload["ambassadors"] == len(service.matcher.ambassadors)
+    assert all(ambassador.current_tickets == 0 for ambassador in service.matcher.ambassadors)
+    assert call(server, "GET", "/health")[1]["reloads"] == 2
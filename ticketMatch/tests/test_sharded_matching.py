@@ -0,0 +1,60 @@
+import os
+import sys
+from collections import Counter
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from agents.matching_agent import MatchingAgent
+from agents.sharded_matching import plan_shards
+from tests.test_scoring import make_dataset, NOW
+
+
+def test_shards_partition_tickets_and_never_overbook_capacity():
+    tickets, ambassadors, _ = make_dataset(seed=5, n_tickets=600, n_ambassadors=40)
+    tickets[0].line_of_business = "Nobody Works This"
+    shards = plan_shards(tickets, ambassadors, shard_size=100)
+
+    positions = sorted(position for shard_positions, _ in shards for position in shard_positions)
+    assert positions == list(range(len(tickets)))
+    assert len(shards) >= len(tickets) // 100  # Lines larger than shard_size are split
+
+    booked = Counter()
+    for shard_positions, capacity in shards:
+        booked.update(capacity)
+        lines = {tickets[position].line_of_business for position in shard_positions}
+        if lines != {"Nobody Works This"}:
+            # Only ambassadors working the shard's line of business take part
+            assert len(lines) == 1
+            assert all(lines <= set(ambassador.line_of_business)
+                       for ambassador in ambassadors if ambassador.id in capacity)
+    for ambassador in ambassadors:
+        assert booked[ambassador.id] <= ambassador.max_active_tickets - ambassador.current_tickets
+
+    assert plan_shards(tickets, ambassadors, shard_size=100) == shards
+
+
+def test_sharded_mode_is_deterministic_across_worker_counts():
+    results = []
+    for workers in (1, 3):
+        tickets, ambassadors, shifts = make_dataset(seed=9, n_tickets=400, n_ambassadors=30)
+        for ambassador in ambassadors:
+            ambassador.max_active_tickets = 20
+        agent = MatchingAgent()
+        agent.workers = workers
+        agent.shard_size = 60
+        try:
+            assigned = agent.process_tickets(tickets, ambassadors, shifts, NOW, mode='sharded')
+        finally:
+            agent.close()
+
+        assert list(assigned) == [ticket.case_number for ticket in tickets]
+        counts = Counter(ambassador_id for ambassador_id, _ in assigned.values() if ambassador_id)
+        for ambassador in ambassadors:
+            assert ambassador.current_tickets <= ambassador.max_active_tickets
+            assert agent.workload.ambassador(ambassador.id).current_tickets == ambassador.current_tickets
+        assert sum(counts.values()) == sum(ticket.assigned for ticket in tickets)
+        results.append(assigned)
+
+    assert results[0] == results[1]
@@ -0,0 +1,67 @@
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from agents.matching_agent import MatchingAgent
+from core.stores import AmbassadorStore, ProfileView, TicketStore
+from tests.test_scoring import NOW, make_dataset
+
+
+def test_ticket_store_round_trips_rows():
+    tickets, _, _ = make_dataset(n_tickets=50)
+    tickets[3].assigned = True
+    tickets[3].assigned_ambassador_id = "AMB0001"
+    tickets[3].assignment_datetime = datetime(2025, 6, 4, 10, 30, 15, 250)
+    store = TicketStore(tickets)
+
+    assert len(store) == len(tickets)
+    assert [store.materialize(row) for row in range(len(store))] == tickets
+    assert store[3].assignment_datetime == tickets[3].assignment_datetime
+    assert store[-1].case_number == tickets[-1].case_number
+    # Repeated categories are stored once
+    assert len(store.columns['language'].values) <= 4
+
+    view = store[0]
+    view.assigned = True
+    view.urgency = "Critical"
+    assert store.materialize(0).assigned is True
+    assert store[0].urgency == "Critical"
+    with pytest.raises(IndexError):
+        store[len(store)]
+
+
+def test_profiles_are_views_over_the_ambassador_store():
+    _, ambassadors, _ = make_dataset(n_ambassadors=5)
+    store = AmbassadorStore(ambassadors)
+    agent = MatchingAgent()
+
+    profiles = agent.profiling_agent.analyze_conversation_history(store)
+    profile = profiles["AMB0002"]
+    assert isinstance(profile, ProfileView)
+    assert profile['languages'] == ambassadors[2].languages
+    assert 'performance_metrics' in profile
+
+    agent.profiling_agent.update_workload("AMB0002", 4)
+    assert store[2].current_tickets == 4
+    agent.profiling_agent.update_csat("AMB0002", 4.5)
+    assert profile['performance_metrics']['customer_satisfaction'] == 4.5
+
+
+@pytest.mark.parametrize("mode", ["scalar", "vectorized", "optimal"])
+def test_matching_on_stores_matches_matching_on_lists(mode):
+    tickets, ambassadors, shifts = make_dataset(n_tickets=150, n_ambassadors=20)
+    ticket_store = TicketStore(tickets)
+    ambassador_store = AmbassadorStore(ambassadors)
+
+    expected = MatchingAgent().process_tickets(tickets, ambassadors, shifts, current_time=NOW, mode=mode)
+    result = MatchingAgent().process_tickets(ticket_store, ambassador_store, shifts, current_time=NOW, mode=mode)
+
+    assert result == expected
+    assert [ticket_store.materialize(row) for row in range(len(ticket_store))] == tickets
+    assert [ambassador_store.materialize(row) for row in range(len(ambassador_store))] == ambassadors
@@ -0,0 +1,73 @@
+import io
+import json
+import os
+import sys
+import time
+from dataclasses import asdict
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from agents.matching_agent import MatchingAgent
+from agents.stream_matcher import StreamMatcher
+from core.ticket_stream import MicroBatcher, read_lines
+from tests.test_scoring import make_dataset, NOW
+
+
+def ticket_lines(tickets):
+    fields = ('case_number', 'line_of_business', 'primary_product', 'primary_feature', 'specific_primary_driver',
+              'issue_summary', 'technical_proficiency', 'detailed_description', 'urgency', 'language')
+    return [json.dumps({name: asdict(ticket)[name] for name in fields}) for ticket in tickets]
+
+
+def test_micro_batches_close_on_size_and_time():
+    def slow_source():
+        yield from ['{"case_number": "A"}', '{"case_number": "B"}', 'not json', '{"case_number": "C"}']
+        time.sleep(0.3)
+        yield '{"case_number": "D"}'
+
+    batcher = MicroBatcher(slow_source(), batch_size=2, max_wait=0.1, max_pending=2)
+    batches = [[record['case_number'] for _, record in batch] for batch in batcher]
+
+    assert batches == [['A', 'B'], ['C'], ['D']]
+    assert batcher.invalid == 1
+
+
+def test_stream_matches_like_a_batch(tmp_path):
+    tickets, ambassadors, shifts = make_dataset(seed=11, n_tickets=120, n_ambassadors=30)
+    source = tmp_path / "tickets.jsonl"
+    source.write_text("\n".join(ticket_lines(tickets)) + '\n{"event": "close", "case_number": "TCKT00000"}\n')
+
+    batch_tickets, batch_ambassadors, batch_shifts = make_dataset(seed=11, n_tickets=120, n_ambassadors=30)
+    expected = MatchingAgent().process_tickets(batch_tickets, batch_ambassadors, batch_shifts, NOW, mode='vectorized')
+
+    matcher = StreamMatcher(ambassadors, shifts, mode='vectorized')
+    output = io.StringIO()
+    stats = matcher.run(MicroBatcher(read_lines(str(source)), batch_size=1000, max_wait=5.0), output, NOW)
+
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [result['case_number'] for result in results] == [ticket.case_number for ticket in tickets]
+    assert {result['case_number']: (result['ambassador_id'], result['explanation']) for result in results} == expected
+    assert all(result['latency_ms'] >= 0 for result in results)
+    assert stats['tickets'] == len(tickets) and stats['batches'] == 1
+    assert stats['assigned'] == sum(ambassador_id is not None for ambassador_id, _ in expected.values())
+    assert matcher.matching_agent.assigned_tickets == {}  # Results are not retained
+    if expected['TCKT00000'][0] is not None:
+        assert stats['released'] == 1
+
+
+def test_duplicate_case_numbers_in_a_batch_are_matched_once():
+    tickets, ambassadors, shifts = make_dataset(seed=12, n_tickets=3, n_ambassadors=10)
+    lines = ticket_lines(tickets)
+    batch = [(time.monotonic(), json.loads(line)) for line in lines + lines[:1]]
+    load_before = sum(ambassador.current_tickets for ambassador in ambassadors)
+
+    matcher = StreamMatcher(ambassadors, shifts, mode='vectorized')
+    results = matcher.match_batch(batch, NOW)
+
+    assert [result['case_number'] for result in results] == [ticket.case_number for ticket in tickets + tickets[:1]]
+    assert results[0]['ambassador_id'] is not None
+    assert (results[-1]['ambassador_id'], results[-1]['explanation']) == (None, "Duplicate case number in batch")
+    matched = sum(result['ambassador_id'] is not None for result in results)
+    assert sum(ambassador.current_tickets for ambassador in ambassadors) == load_before + matched
@@ -0,0 +1,196 @@
+import asyncio
+import logging
+import os
+import sys
+import time
+
+import pytest
+from openai import APIStatusError
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from agents.ticket_analysis_agent import TicketAnalysisAgent
+from core.azure_connection import AzureConnection
+from core.llm_cache import AnalysisCache
+from core.rate_limiter import RateLimiter, backoff_delay
+from tests.fake_completion_server import FakeCompletionServer, analysis_for
+
+
+@pytest.fixture
+def fake_server():
+    with FakeCompletionServer(latency=0.02, slow_latency=2.0) as server:
+        yield server
+
+
+@pytest.fixture
+def connection(fake_server, monkeypatch):
+    monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", fake_server.url)
+    monkeypatch.setenv("AZURE_OPENAI_KEY", "test-key")
+    return AzureConnection()
+
+
+def test_async_analysis_is_bounded_and_keeps_input_order(fake_server, connection):
+    texts = [f"Topic{i} {'urgent' if i % 3 == 0 else 'routine'} request" for i in range(40)]
+    agent = TicketAnalysisAgent(connection)
+
+    results = asyncio.run(agent.analyze_tickets_async(texts, max_concurrency=5))
+
+    assert results == [analysis_for(text) for text in texts]
+    assert fake_server.requests == len(texts)
+    assert 1 < fake_server.max_in_flight <= 5
+    assert agent.last_async_stats['tickets'] == len(texts)
+    assert agent.last_async_stats['tickets_per_second'] > 0
+
+
+def test_async_analysis_falls_back_per_ticket_on_timeout_and_bad_output(connection):
+    texts = ["Outlook sync broken", "Teams [slow] crash", "Excel [garbled] formula"]
+    agent = TicketAnalysisAgent(connection)
+
+    results = asyncio.run(agent.analyze_tickets_async(texts, max_concurrency=3, timeout=0.5))
+
+    assert results[0] == analysis_for(texts[0])
+    assert results[1]['topic'] == "unknown" and "timed out" in results[1]['error']
+    assert results[2]['topic'] == "unknown" and "Could not parse" in results[2]['error']
+    assert agent.last_async_stats['timeouts'] == 1
+
+
+def test_cached_analyses_skip_the_model_and_persist_on_disk(fake_server, connection, tmp_path):
+    path = str(tmp_path / "analysis.sqlite")
+    texts = ["Outlook sync broken", "Teams urgent crash", "Outlook sync broken"]
+    agent = TicketAnalysisAgent(connection, cache=AnalysisCache(path))
+
+    first = asyncio.run(agent.analyze_tickets_async(texts))
+    assert first == [analysis_for(text) for text in texts]
+    assert fake_server.requests == 2  # The duplicate ticket is sent once
+
+    # A new cache on the same file answers from disk, ignoring case and whitespace
+    agent = TicketAnalysisAgent(connection, cache=AnalysisCache(path))
+    again = asyncio.run(agent.analyze_tickets_async(["  outlook SYNC   broken", "Teams urgent crash"]))
+    assert again == first[:2]
+    assert fake_server.requests == 2
+    stats = agent.cache.stats()
+    assert stats['disk_hits'] == 2 and stats['misses'] == 0
+    assert stats['latency_saved'] > 0
+
+
+def test_analysis_cache_expires_and_evicts_entries(tmp_path):
+    cache = AnalysisCache(str(tmp_path / "analysis.sqlite"), ttl_seconds=0.05,
+                          max_memory_entries=2, max_disk_entries=2)
+    keys = [AnalysisCache.make_key([{"role": "user", "content": f"Ticket {i}"}], "gpt-4o-mini", 0.2, 200)
+            for i in range(3)]
+    assert keys[0] != AnalysisCache.make_key([{"role": "user", "content": "Ticket 0"}], "gpt-4o", 0.2, 200)
+
+    for i, key in enumerate(keys):
+        cache.put(key, {"topic": str(i)}, latency=0.5)
+    assert cache.get(keys[0]) is None  # Evicted by size from both layers
+    assert cache.get(keys[2]) == {"topic": "2"}
+    time.sleep(0.1)
+    assert cache.get(keys[2]) is None
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 2
+
+
+def test_analysis_cache_counts_rows_without_scanning_the_table(tmp_path):
+    path = str(tmp_path / "analysis.sqlite")
+    cache = AnalysisCache(path, max_memory_entries=1, max_disk_entries=20)
+    for i in range(50):
+        cache.put(f"key{i}", {"topic": str(i)})
+        cache.put(f"key{i}", {"topic": str(i)})  # Overwrites are not counted twice
+        assert cache._rows == cache._count() <= 20
+    assert cache.get("key49") == {"topic": "49"}
+    assert cache.get("key0") is None  # Least recently used, evicted in a batch
+    cache.close()
+    assert AnalysisCache(path)._rows == cache._rows
+
+
+def test_batched_analysis_packs_tickets_and_falls_back_per_ticket(fake_server, connection):
+    connection.initialize()
+    fake_server.reset_counters()
+    tickets = {f"CASE{i:04d}": f"Topic{i} {'urgent' if i % 4 == 0 else 'routine'} issue with sign-in"
+               for i in range(120)}
+    tickets["CASE0007"] = "Teams [dropped] meeting"
+    tickets["CASE0042"] = "Outlook [invalid] rules"
+    agent = TicketAnalysisAgent(connection)
+
+    results = agent.analyze_tickets_batched(tickets, token_budget=1000)
+
+    assert list(results) == list(tickets)
+    for case_number, text in tickets.items():
+        if case_number in ("CASE0007", "CASE0042"):
+            assert results[case_number]['topic'] == "unknown" and 'error' in results[case_number]
+        else:
+            assert results[case_number] == analysis_for(text)
+    stats = agent.last_batch_stats
+    assert stats['fallbacks'] == 2
+    assert 1 < stats['requests'] == fake_server.requests < len(tickets) / 10
+
+
+def test_batches_are_sized_to_the_token_budget():
+    agent = TicketAnalysisAgent()
+    tickets = {f"CASE{i:05d}": "Cannot open shared mailbox after migration " * (1 + i % 5) for i in range(10_000)}
+
+    batches = agent.plan_batches(tickets, token_budget=8000)
+
+    assert [case_number for batch in batches for case_number in batch] == list(tickets)
+    assert len(batches) < 500
+    single = agent.plan_batches({"BIG": "x" * 100_000}, token_budget=1000)
+    assert single == [["BIG"]]
+
+
+def test_connection_is_lazy_shared_and_health_check_is_cheap(fake_server, connection, monkeypatch, caplog):
+    assert connection.initialize()
+    assert connection._client is None
+    assert fake_server.requests == 0 and fake_server.health_checks == 0
+
+    checked = AzureConnection(health_check=True)
+    assert checked.initialize()
+    assert fake_server.health_checks == 1 and fake_server.requests == 0
+    # Connections to the same endpoint share one client and its connection pool
+    assert checked.client is connection.client
+    # ... and one rate limit budget per deployment
+    assert checked.rate_limiter is connection.rate_limiter
+    with caplog.at_level(logging.WARNING, logger="core.azure_connection"):
+        assert AzureConnection(requests_per_minute=1).rate_limiter is connection.rate_limiter
+    assert "already rate limited" in caplog.text
+    monkeypatch.setenv("AZURE_OPENAI_DEPLOYMENT", "other-deployment")
+    assert AzureConnection().rate_limiter is not connection.rate_limiter
+
+    monkeypatch.delenv("AZURE_OPENAI_KEY")
+    assert not AzureConnection().initialize()
+
+
+def test_retryable_errors_are_retried_with_backoff(fake_server, monkeypatch):
+    monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", fake_server.url)
+    monkeypatch.setenv("AZURE_OPENAI_KEY", "test-key")
+    connection = AzureConnection(max_retries=3, backoff_base=0.01)
+    agent = TicketAnalysisAgent(connection)
+
+    fake_server.fail_next(429, 503)
+    assert agent.analyze_ticket("Outlook sync broken") == analysis_for("Outlook sync broken")
+    assert fake_server.requests == 3 and connection.retries == 2
+
+    fake_server.fail_next(429, 500)
+    assert asyncio.run(agent.analyze_tickets_async(["Teams crash"])) == [analysis_for("Teams crash")]
+    assert connection.retries == 4
+
+    fake_server.fail_next(400)
+    with pytest.raises(APIStatusError):
+        agent.analyze_ticket("Excel formula")
+    assert connection.retries == 4
+
+
+def test_rate_limiter_spaces_out_requests_and_tokens():
+    limiter = RateLimiter(requests_per_minute=600, request_burst=1)
+    start = time.perf_counter()
+    for _ in range(6):
+        limiter.acquire()
+    assert time.perf_counter() - start >= 0.45  # 10 requests/s after the first
+
+    limiter = RateLimiter(tokens_per_minute=6000, token_burst=100)
+    assert limiter.reserve(100) == 0
+    assert limiter.reserve(50) == pytest.approx(0.5, abs=0.05)
+
+    delays = [backoff_delay(attempt, base=1.0, cap=8.0) for attempt in range(10)]
+    assert all(0 <= delay <= 8.0 for delay in delays)
+    assert backoff_delay(0, base=1.0, retry_after=3.0) >= 3.0